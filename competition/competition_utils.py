@@ -386,9 +386,11 @@ def draw_trajectory(initial_info,
                     ref_y,
                     ref_z
                     ):
-    """Draw a trajectory in PyBullet's GUI.
+    """Draw a trajectory in PyBullet's GUI (nothing is drawn if the environment is headless).
 
     """
+    if initial_info.get("headless", False):
+        return
     for point in waypoints:
         p.loadURDF(os.path.join(initial_info["urdf_dir"], "sphere.urdf"),
                    [point[0], point[1], point[2]],
@@ -105,7 +105,8 @@ def run(test=False):
     collided_objects = set()
     violations_count = 0
     episode_start_iter = 0
-    time_label_id = p.addUserDebugText("", textPosition=[0, 0, 1],physicsClientId=env.PYB_CLIENT)
+    if not env.HEADLESS:
+        time_label_id = p.addUserDebugText("", textPosition=[0, 0, 1],physicsClientId=env.PYB_CLIENT)
     num_of_gates = len(config.quadrotor_config.gates)
     stats = []
 
@@ -166,15 +167,16 @@ def run(test=False):
         curr_time = (i-episode_start_iter)*CTRL_DT
 
         # Print episode time in seconds on the GUI.
-        time_label_id = p.addUserDebugText("Ep. time: {:.2f}s".format(curr_time),
-                                           textPosition=[0, 0, 1.5],
-                                           textColorRGB=[1, 0, 0],
-                                           lifeTime=3*CTRL_DT,
-                                           textSize=1.5,
-                                           parentObjectUniqueId=0,
-                                           parentLinkIndex=-1,
-                                           replaceItemUniqueId=time_label_id,
-                                           physicsClientId=env.PYB_CLIENT)
+        if not env.HEADLESS:
+            time_label_id = p.addUserDebugText("Ep. time: {:.2f}s".format(curr_time),
+                                               textPosition=[0, 0, 1.5],
+                                               textColorRGB=[1, 0, 0],
+                                               lifeTime=3*CTRL_DT,
+                                               textSize=1.5,
+                                               parentObjectUniqueId=0,
+                                               parentLinkIndex=-1,
+                                               replaceItemUniqueId=time_label_id,
+                                               physicsClientId=env.PYB_CLIENT)
 
         # Compute control input.
         if config.use_firmware:
@@ -50,7 +50,7 @@ class FirmwareWrapper(BaseController):
             KF = (float): motor force factor 
             MIN_PWM (int): minimum PWM command
             MAX_PWM (int): maximum pwm command 
-            verbose (bool): displays additional information 
+            verbose (bool): displays additional information (and the setpoint, unless the env is headless)
             **kwargs: to be passed to BaseController
 
         Attributes: 
@@ -71,6 +71,8 @@ class FirmwareWrapper(BaseController):
         self.verbose = verbose
 
         self.env = env_func()
+        self.pyb_client = None
+        self.last_visualized_setpoint = None
 
 
     def __repr__(self):
@@ -188,8 +190,10 @@ class FirmwareWrapper(BaseController):
         
         # Initialize visualization tools 
         self.first_motor_killed_print = True
+        # With fast_reset, the world (and the setpoint marker in it) is kept, the marker is moved by the next step.
+        if not self.env.FAST_RESET or init_info['pyb_client'] != self.pyb_client:
+            self.last_visualized_setpoint = None
         self.pyb_client = init_info['pyb_client']
-        self.last_visualized_setpoint = None
 
         self.results_dict = { 'obs': [],
                         'reward': [],
@@ -220,16 +224,21 @@ class FirmwareWrapper(BaseController):
         self._process_command_queue(sim_time)
         
         
-        # Draws setpoint for debugging purposes 
-        if self.verbose:
-            if self.last_visualized_setpoint is not None:
-                p.removeBody(self.last_visualized_setpoint)
-            SPHERE_URDF = str(os.path.dirname(os.path.abspath(__file__))) + "/../../envs/gym_pybullet_drones/assets/sphere.urdf"
-            self.last_visualized_setpoint = p.loadURDF(
-                    SPHERE_URDF,
-                    [self.setpoint.position.x, self.setpoint.position.y, self.setpoint.position.z],
-                    p.getQuaternionFromEuler([0,0,0]),
-                    physicsClientId=self.pyb_client)
+        # Draws setpoint for debugging purposes, moving a single marker body loaded on the first call
+        if self.verbose and not self.env.HEADLESS:
+            setpoint_pos = [self.setpoint.position.x, self.setpoint.position.y, self.setpoint.position.z]
+            if self.last_visualized_setpoint is None:
+                SPHERE_URDF = str(os.path.dirname(os.path.abspath(__file__))) + "/../../envs/gym_pybullet_drones/assets/sphere.urdf"
+                self.last_visualized_setpoint = p.loadURDF(
+                        SPHERE_URDF,
+                        setpoint_pos,
+                        p.getQuaternionFromEuler([0,0,0]),
+                        physicsClientId=self.pyb_client)
+            else:
+                p.resetBasePositionAndOrientation(self.last_visualized_setpoint,
+                                                  setpoint_pos,
+                                                  p.getQuaternionFromEuler([0,0,0]),
+                                                  physicsClientId=self.pyb_client)
 
         while self.tick / self.firmware_freq < sim_time + self.ctrl_dt:
             # Step the environment and print all returned information.
@@ -147,12 +147,13 @@ class iLQR(BaseController):
         self.env.close()
         self.logger.close()
 
-    def run_ilqr(self, render=False, logging=False):
+    def run_ilqr(self, render=False, logging=False, video_recorder=None):
         """Run iLQR to iteratively update policy for each time step k
 
         Args:
             render (bool): Flag to save frames for visualization.
             logging (bool): Flag to log results.
+            video_recorder (VideoRecorder): Recorder to stream the frames to, instead of saving them.
 
         Returns:
             ilqr_eval_results (dict): Dictionary containing the results from
@@ -221,7 +222,9 @@ class iLQR(BaseController):
                 print("action: " + get_arr_str(self.env.state) + "\n")
 
             # Save frame for visualization.
-            if render:
+            if video_recorder is not None:
+                video_recorder.capture(self.env)
+            elif render:
                 self.env.render()
                 frames_k.append(self.env.render("rgb_array"))
 
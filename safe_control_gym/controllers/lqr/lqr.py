@@ -201,12 +201,13 @@ class LQR(BaseController):
 
         return gain
 
-    def run(self, n_episodes=1, render=False, logging=False, verbose=False, use_adv=False):
+    def run(self, n_episodes=1, render=False, logging=False, verbose=False, use_adv=False, video_recorder=None):
         """Runs evaluation with current policy.
 
         Args:
             render (bool): if to render during the runs.
             logging (bool): if to log using logger during the runs.
+            video_recorder (VideoRecorder): if given, frames are streamed to it instead of returned.
 
         Returns:
             dict: evaluation results
@@ -270,7 +271,9 @@ class LQR(BaseController):
                 print("obs: " + get_arr_str(obs))
                 print("action: " + get_arr_str(action) + "\n")
 
-            if render:
+            if video_recorder is not None:
+                video_recorder.capture(self.env)
+            elif render:
                 self.env.render()
                 frames.append(self.env.render("rgb_array"))
 
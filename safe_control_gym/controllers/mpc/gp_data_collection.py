@@ -0,0 +1,192 @@
+"""Pooled collection of GP-MPC training data.
+
+The samples are single steps of the prior controller from given initial states. Instead of constructing a new
+environment for each sample, a pool of warm environments (each with its own prior controller, in a worker
+process) is re-initialized with `reset(init_state=...)`.
+
+"""
+import traceback
+import numpy as np
+import multiprocessing as mp
+
+from safe_control_gym.envs.env_wrappers.vectorized_env.vec_env_utils import CloudpickleWrapper, clear_mpi_env_vars
+
+
+def run_prior_step(ctrl,
+                   env,
+                   init_state,
+                   seed
+                   ):
+    """Runs one step of a controller from an initial state, as `ctrl.run(env=env, max_steps=1)` in a new environment.
+
+    Args:
+        ctrl (MPC): the (prior) controller.
+        env (BenchmarkEnv): the (warm) environment, whose `reset()` accepts `init_state`.
+        init_state (ndarray/dict): the initial state of the sample.
+        seed (int): the seed of the environment for the sample.
+
+    Returns:
+        ndarray: The (nx,) initial observation.
+        ndarray: The (nu,) action of the controller.
+        ndarray: The (nx,) observation after the step.
+
+    """
+    # Re-seed as a new environment would be.
+    env.RND_SEED = seed
+    env.seed(seed)
+    if not env.initial_reset:
+        env.set_cost_function_param(ctrl.Q, ctrl.R)
+    ctrl.x_prev = None
+    ctrl.u_prev = None
+    if ctrl.mode == "tracking":
+        # Each sample starts at the beginning of the reference, as in a new environment.
+        ctrl.traj_step = 0
+    obs = env.reset(init_state=init_state)
+    if env.INFO_IN_RESET:
+        obs = obs[0]
+    action = ctrl.select_action(obs)
+    next_obs = env.step(action)[0]
+    return np.array(obs), np.array(action), np.array(next_obs)
+
+
+def make_prior_ctrl(ctrl_func):
+    """Creates a prior controller ready for data collection (without its additional constraints).
+
+    """
+    ctrl = ctrl_func()
+    ctrl.remove_constraints(ctrl.additional_constraints)
+    ctrl.reset()
+    return ctrl
+
+
+class PriorDataCollector:
+    """Collects single-step samples of a prior controller with a pool of warm environments.
+
+    With `num_workers=0`, the samples are collected in the current process, with a single environment
+    (and `ctrl`, if given). Otherwise, each of the `num_workers` processes creates its environment and
+    controller once, and the samples are split in contiguous chunks across the processes.
+
+    """
+
+    def __init__(self,
+                 env_func,
+                 ctrl_func,
+                 num_workers=0,
+                 ctrl=None,
+                 context="spawn"
+                 ):
+        """Creates the pool.
+
+        Args:
+            env_func (Callable): function to instantiate the environments of the samples.
+            ctrl_func (Callable): function to instantiate the prior controller.
+            num_workers (int): the number of worker processes, 0 to collect in the current process.
+            ctrl (MPC, optional): the prior controller to use in the current process (num_workers=0),
+                                  `ctrl_func` is used if None.
+            context (str): the multiprocessing context of the workers.
+
+        """
+        if num_workers < 0:
+            raise ValueError("[ERROR] in PriorDataCollector.__init__(), num_workers must be non-negative.")
+        self.env_func = env_func
+        self.ctrl_func = ctrl_func
+        self.num_workers = num_workers
+        self.ctrl = ctrl
+        self.env = None
+        self.closed = False
+        self.remotes = []
+        self.ps = []
+        if num_workers > 0:
+            ctx = mp.get_context(context)
+            self.remotes, work_remotes = zip(*[ctx.Pipe() for _ in range(num_workers)])
+            self.ps = [ctx.Process(target=worker,
+                                   args=(work_remote, remote, CloudpickleWrapper((env_func, ctrl_func))))
+                       for work_remote, remote in zip(work_remotes, self.remotes)]
+            for p in self.ps:
+                p.daemon = True  # If the main process crashes, we should not cause things to hang.
+                with clear_mpi_env_vars():
+                    p.start()
+            for remote in work_remotes:
+                remote.close()
+
+    def collect(self,
+                init_states,
+                seeds
+                ):
+        """Collects one sample per initial state.
+
+        Args:
+            init_states (list): the initial states of the samples.
+            seeds (list): the seeds of the samples' environments.
+
+        Returns:
+            ndarray: The (N, nx) initial observations.
+            ndarray: The (N, nu) actions.
+            ndarray: The (N, nx) observations after the steps.
+
+        """
+        if self.closed:
+            raise RuntimeError("[ERROR] in PriorDataCollector.collect(), the collector is closed.")
+        if len(init_states) != len(seeds):
+            raise ValueError("[ERROR] in PriorDataCollector.collect(), init_states and seeds must have the same length.")
+        jobs = [(init_state, int(seed)) for init_state, seed in zip(init_states, seeds)]
+        if self.num_workers == 0:
+            if self.ctrl is None:
+                self.ctrl = make_prior_ctrl(self.ctrl_func)
+            if self.env is None:
+                self.env = self.env_func()
+            results = [run_prior_step(self.ctrl, self.env, init_state, seed) for init_state, seed in jobs]
+        else:
+            chunks = np.array_split(np.arange(len(jobs)), self.num_workers)
+            for remote, chunk in zip(self.remotes, chunks):
+                remote.send(("collect", [jobs[i] for i in chunk]))
+            replies = [remote.recv() for remote in self.remotes]
+            results = []
+            for status, data in replies:
+                if status == "error":
+                    raise RuntimeError("[ERROR] in PriorDataCollector.collect(), a worker failed:\n" + data)
+                results.extend(data)
+        x_seq, u_seq, x_next_seq = zip(*results)
+        return np.vstack(x_seq), np.vstack(u_seq), np.vstack(x_next_seq)
+
+    def close(self):
+        """Closes the environments and the workers.
+
+        """
+        if self.closed:
+            return
+        if self.env is not None:
+            self.env.close()
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for p in self.ps:
+            p.join()
+        self.closed = True
+
+
+def worker(remote, parent_remote, fns_wrapper):
+    """Worker func collecting samples with its own environment and prior controller.
+
+    """
+    parent_remote.close()
+    env_func, ctrl_func = fns_wrapper.x
+    ctrl = make_prior_ctrl(ctrl_func)
+    env = env_func()
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == "collect":
+                try:
+                    remote.send(("ok", [run_prior_step(ctrl, env, init_state, seed) for init_state, seed in data]))
+                except Exception:
+                    remote.send(("error", traceback.format_exc()))
+            elif cmd == "close":
+                remote.close()
+                break
+            else:
+                raise NotImplementedError
+    except KeyboardInterrupt:
+        print("PriorDataCollector worker: got KeyboardInterrupt")
+    finally:
+        env.close()
+        ctrl.close()
@@ -31,6 +31,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import pairwise_distances_argmin_min
 
 from safe_control_gym.controllers.mpc.linear_mpc import LinearMPC, MPC
+from safe_control_gym.controllers.mpc.gp_data_collection import PriorDataCollector
 from safe_control_gym.controllers.mpc.mpc_utils import discretize_linear_system
 from safe_control_gym.controllers.mpc.gp_utils import GaussianProcessCollection, ZeroMeanIndependentGPModel, covSEard, kmeans_centriods
 from safe_control_gym.envs.benchmark_env import Task
@@ -73,6 +74,7 @@ class GPMPC(MPC):
             inertial_prop: list = [1.0],
             prior_param_coeff: float = 1.0,
             terminate_run_on_done: bool = True,
+            collection_workers: int = 0,
             output_dir: str = "results/temp",
             **kwargs
             ):
@@ -106,6 +108,8 @@ class GPMPC(MPC):
             recalc_inducing_points_at_every_step (bool): True to recompute the gp approx at every time step.
             online_learning (bool): if true, GP kernel values will be updated using past trajectory values.
             additional_constraints (list): list of Constraint objects defining additional constraints to be used.
+            collection_workers (int): number of worker processes (each with a warm environment and prior controller)
+                collecting the training data, 0 to collect it in this process.
 
         """
         if type(inertial_prop) is list:
@@ -127,7 +131,8 @@ class GPMPC(MPC):
             self.soft_constraints_params = soft_constraints
 
         # Initialize the method using linear MPC.
-        self.prior_ctrl = LinearMPC(
+        self.prior_ctrl_func = partial(
+            LinearMPC,
             self.prior_env_func,
             horizon=horizon,
             q_mpc=q_mpc,
@@ -140,6 +145,7 @@ class GPMPC(MPC):
             output_dir=output_dir,
             additional_constraints=additional_constraints,
         )
+        self.prior_ctrl = self.prior_ctrl_func()
         self.prior_ctrl.reset()
         super().__init__(
             self.prior_env_func,
@@ -177,6 +183,7 @@ class GPMPC(MPC):
         self.normalize_training_data = normalize_training_data
         self.use_gpu = use_gpu and torch.cuda.is_available()
         self.seed = seed
+        self.collection_workers = collection_workers
         self.prob = prob
         self.sparse_gp = sparse_gp
         if input_mask is None:
@@ -699,8 +706,6 @@ class GPMPC(MPC):
             # If no input data is provided, we will generate self.train_iterations
             # + (1+self.test_ratio)* self.train_iterations number of training points. This will ensure the specified
             # number of train iterations are run, and the correct train-test data spilt is achieved.
-            train_inputs = []
-            train_targets = []
             train_info = []
 
             ############
@@ -732,24 +737,19 @@ class GPMPC(MPC):
                                                  random_state=self.seed)
             input_samples = np.array(input_samples) # not being used currently
             seeds = self.env.np_random.randint(0,99999, size=self.train_iterations + validation_iterations)
-            for i in range(self.train_iterations + validation_iterations):
-                # For random initial state training.
-                #init_state = init_state_samples[i,:]
-                init_state = dict(zip(self.env.INIT_STATE_RAND_INFO.keys(), init_state_samples[i, :]))
-                # Collect data with prior controller.
-                run_env = self.env_func(init_state=init_state, randomized_init=False, seed=int(seeds[i]))
-                episode_results = self.prior_ctrl.run(env=run_env, max_steps=1)
-                run_env.close()
-                x_obs = episode_results['obs'][-3:,:]
-                u_seq = episode_results['action'][-1:,:]
-                run_env.close()
-                x_seq = x_obs[:-1,:]
-                x_next_seq = x_obs[1:,:]
-                train_inputs_i, train_targets_i = self.preprocess_training_data(x_seq, u_seq, x_next_seq)
-                train_inputs.append(train_inputs_i)
-                train_targets.append(train_targets_i)
-            train_inputs = np.vstack(train_inputs)
-            train_targets = np.vstack(train_targets)
+            # For random initial state training.
+            init_states = [dict(zip(self.env.INIT_STATE_RAND_INFO.keys(), init_state_samples[i, :]))
+                           for i in range(self.train_iterations + validation_iterations)]
+            # Collect data with prior controller, the (persistent world) environments are reused across the samples.
+            collector = PriorDataCollector(partial(self.env_func, randomized_init=False, fast_reset=True),
+                                           self.prior_ctrl_func,
+                                           num_workers=self.collection_workers,
+                                           ctrl=self.prior_ctrl)
+            try:
+                x_seq, u_seq, x_next_seq = collector.collect(init_states, seeds)
+            finally:
+                collector.close()
+            train_inputs, train_targets = self.preprocess_training_data(x_seq, u_seq, x_next_seq)
             self.data_inputs = train_inputs
             self.data_targets = train_targets
         elif input_data is not None and target_data is not None:
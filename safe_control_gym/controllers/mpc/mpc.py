@@ -113,7 +113,7 @@ class MPC(BaseController):
             constraints (list): list of constraints to be removed.
 
         """
-        old_constraints_list = self.constraints.constraints
+        old_constraints_list = list(self.constraints.constraints)
         for constraint in constraints:
             assert constraint in self.constraints.constraints,\
                 ValueError("This constraint is not in the current list of constraints")
@@ -368,13 +368,15 @@ class MPC(BaseController):
             render=False,
             logging=False,
             max_steps=None,
-            terminate_run_on_done=None
+            terminate_run_on_done=None,
+            video_recorder=None
             ):
         """Runs evaluation with current policy.
         
         Args:
             render (bool): if to do real-time rendering. 
             logging (bool): if to log on terminal.
+            video_recorder (VideoRecorder): if given, frames are streamed to it instead of returned.
             
         Returns:
             dict: evaluation statisitcs, rendered frames. 
@@ -438,7 +440,9 @@ class MPC(BaseController):
             print(done)
             print(info)
             print()
-            if render:
+            if video_recorder is not None:
+                video_recorder.capture(env)
+            elif render:
                 env.render()
                 frames.append(env.render("rgb_array"))
             i += 1
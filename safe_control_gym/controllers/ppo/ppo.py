@@ -20,6 +20,7 @@ from collections import defaultdict
 
 from safe_control_gym.utils.logging import ExperimentLogger
 from safe_control_gym.utils.utils import get_random_state, set_random_state, is_wrapped
+from safe_control_gym.utils.video import make_eval_video_recorder
 from safe_control_gym.envs.env_wrappers.vectorized_env import make_vec_envs
 from safe_control_gym.envs.env_wrappers.record_episode_statistics import RecordEpisodeStatistics, VecRecordEpisodeStatistics
 from safe_control_gym.math_and_models.normalization import BaseNormalizer, MeanStdNormalizer, RewardStdNormalizer
@@ -45,7 +46,10 @@ class PPO(BaseController):
         # Task.
         if self.training:
             # Training and testing.
-            self.env = make_vec_envs(env_func, None, self.rollout_batch_size, self.num_workers, seed)
+            self.env = make_vec_envs(env_func, None, self.rollout_batch_size, self.num_workers, seed,
+                                     lockstep=self.lockstep_envs,
+                                     shared_memory=self.shared_memory_envs,
+                                     shared_info={"TimeLimit.truncated": (), "constraint_violation": ()})
             self.env = VecRecordEpisodeStatistics(self.env, self.deque_size)
             self.eval_env = env_func(seed=seed * 111)
             self.eval_env = RecordEpisodeStatistics(self.eval_env, self.deque_size)
@@ -174,7 +178,9 @@ class PPO(BaseController):
                 self.save(path)
             # Evaluation.
             if self.eval_interval and self.total_steps % self.eval_interval == 0:
-                eval_results = self.run(env=self.eval_env, n_episodes=self.eval_batch_size)
+                video_path = os.path.join(self.output_dir, "videos", "eval_{}.mp4".format(self.total_steps))
+                with make_eval_video_recorder(self.eval_video, video_path) as video_recorder:
+                    eval_results = self.run(env=self.eval_env, n_episodes=self.eval_batch_size, video_recorder=video_recorder)
                 results["eval"] = eval_results
                 self.logger.info("Eval | ep_lengths {:.2f} +/- {:.2f} | ep_return {:.3f} +/- {:.3f}".format(eval_results["ep_lengths"].mean(),
                                                                                                             eval_results["ep_lengths"].std(),
@@ -195,10 +201,13 @@ class PPO(BaseController):
             render=False,
             n_episodes=10,
             verbose=False,
+            video_recorder=None,
             **kwargs
             ):
         """Runs evaluation with current policy.
 
+        If a `VideoRecorder` is given, frames are streamed to it instead of returned.
+
         """
         self.agent.eval()
         self.obs_normalizer.set_read_only()
@@ -221,7 +230,9 @@ class PPO(BaseController):
                 obs = torch.FloatTensor(obs).to(self.device)
                 action = self.agent.ac.act(obs)
             obs, reward, done, info = env.step(action)
-            if render:
+            if video_recorder is not None:
+                video_recorder.capture(env)
+            elif render:
                 env.render()
                 frames.append(env.render("rgb_array"))
             if verbose:
@@ -24,6 +24,7 @@ from collections import defaultdict
 
 from safe_control_gym.utils.logging import ExperimentLogger
 from safe_control_gym.utils.utils import get_random_state, set_random_state, is_wrapped
+from safe_control_gym.utils.video import make_eval_video_recorder
 from safe_control_gym.envs.env_wrappers.vectorized_env import make_vec_envs
 from safe_control_gym.envs.env_wrappers.record_episode_statistics import RecordEpisodeStatistics, VecRecordEpisodeStatistics
 from safe_control_gym.math_and_models.normalization import BaseNormalizer, MeanStdNormalizer, RewardStdNormalizer
@@ -181,7 +182,9 @@ class RARL(BaseController):
 
             # eval
             if self.eval_interval and self.total_steps % self.eval_interval == 0:
-                eval_results = self.run(env=self.eval_env, n_episodes=self.eval_batch_size)
+                video_path = os.path.join(self.output_dir, "videos", "eval_{}.mp4".format(self.total_steps))
+                with make_eval_video_recorder(self.eval_video, video_path) as video_recorder:
+                    eval_results = self.run(env=self.eval_env, n_episodes=self.eval_batch_size, video_recorder=video_recorder)
                 results["eval"] = eval_results
                 self.logger.info("Eval | ep_lengths {:.2f} +/- {:.2f} | ep_return {:.3f} +/- {:.3f}".format(eval_results["ep_lengths"].mean(),
                                                                                                             eval_results["ep_lengths"].std(),
@@ -198,8 +201,8 @@ class RARL(BaseController):
             if self.log_interval and self.total_steps % self.log_interval == 0:
                 self.log_step(results)
 
-    def run(self, env=None, render=False, n_episodes=10, verbose=False, use_adv=False, **kwargs):
-        """Runs evaluation with current policy."""
+    def run(self, env=None, render=False, n_episodes=10, verbose=False, use_adv=False, video_recorder=None, **kwargs):
+        """Runs evaluation with current policy, streaming the frames to `video_recorder` (if given) instead of returning them."""
         self.agent.eval()
         self.adversary.eval()
         self.obs_normalizer.set_read_only()
@@ -231,7 +234,9 @@ class RARL(BaseController):
             env.set_adversary_control(action_adv)
 
             obs, reward, done, info = env.step(action)
-            if render:
+            if video_recorder is not None:
+                video_recorder.capture(env)
+            elif render:
                 env.render()
                 frames.append(env.render("rgb_array"))
             if verbose:
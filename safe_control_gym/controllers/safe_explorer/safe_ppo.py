@@ -9,6 +9,7 @@ from collections import defaultdict
 
 from safe_control_gym.utils.logging import ExperimentLogger
 from safe_control_gym.utils.utils import get_random_state, set_random_state, is_wrapped
+from safe_control_gym.utils.video import make_eval_video_recorder
 from safe_control_gym.envs.env_wrappers.vectorized_env import make_vec_envs
 from safe_control_gym.envs.env_wrappers.vectorized_env.vec_env_utils import _flatten_obs
 from safe_control_gym.envs.env_wrappers.record_episode_statistics import RecordEpisodeStatistics, VecRecordEpisodeStatistics
@@ -207,7 +208,9 @@ class SafeExplorerPPO(BaseController):
                     eval_results = self.eval_constraint_models()
                     results["eval"] = eval_results
                 else:
-                    eval_results = self.run(env=self.eval_env, n_episodes=self.eval_batch_size)
+                    video_path = os.path.join(self.output_dir, "videos", "eval_{}.mp4".format(self.total_steps))
+                    with make_eval_video_recorder(self.eval_video, video_path) as video_recorder:
+                        eval_results = self.run(env=self.eval_env, n_episodes=self.eval_batch_size, video_recorder=video_recorder)
                     results["eval"] = eval_results
                     self.logger.info("Eval | ep_lengths {:.2f} +/- {:.2f} | ep_return {:.3f} +/- {:.3f}".format(eval_results["ep_lengths"].mean(),
                                                                                                                 eval_results["ep_lengths"].std(),
@@ -228,10 +231,13 @@ class SafeExplorerPPO(BaseController):
             render=False,
             n_episodes=10,
             verbose=False,
+            video_recorder=None,
             **kwargs
             ):
         """Runs evaluation with current policy.
 
+        If a `VideoRecorder` is given, frames are streamed to it instead of returned.
+
         """
         self.agent.eval()
         self.obs_normalizer.set_read_only()
@@ -254,7 +260,9 @@ class SafeExplorerPPO(BaseController):
                 c = torch.FloatTensor(c).to(self.device)
                 action = self.agent.ac.act(obs, c=c)
             obs, reward, done, info = env.step(action)
-            if render:
+            if video_recorder is not None:
+                video_recorder.capture(env)
+            elif render:
                 env.render()
                 frames.append(env.render("rgb_array"))
             if verbose:
@@ -5,16 +5,20 @@ This module also contains enumerations for cost functions, tasks, disturbances,
 """
 import os
 from enum import Enum
-from matplotlib import pyplot as plt
 import numpy as np
 import gymnasium as gym
 from gymnasium import spaces
 from gymnasium.utils import seeding
 import copy
+from collections import OrderedDict
 
 from safe_control_gym.envs.constraints import create_constraint_list
 from safe_control_gym.envs.disturbances import create_disturbance_list
 
+# Least recently used cache of the reference trajectories generated by `BenchmarkEnv._generate_trajectory()`.
+TRAJECTORY_CACHE_SIZE = 32
+_TRAJECTORY_CACHE = OrderedDict()
+
 
 class Cost(str, Enum):
     """Reward/cost functions enumeration class.
@@ -65,6 +69,7 @@ class BenchmarkEnv(gym.Env):
                  seed=None,
                  info_in_reset: bool = False,
                  gui: bool = False,
+                 headless=None,
                  verbose: bool = False,
                  normalized_rl_action_space: bool = False,
                  # Task.
@@ -103,6 +108,8 @@ class BenchmarkEnv(gym.Env):
             info_in_reset (bool, optional): Whether .reset() returns a dictionary with the
                                             environment's symbolic model.
             gui (bool, optional): Whether to show PyBullet's GUI.
+            headless (bool, optional): Whether to skip all debug drawing (labels, lines, markers),
+                                       defaults to `not gui`.
             verbose (bool, optional): If to suppress environment print statetments.
             normalized_rl_action_space (bool, optional): Whether to normalize the action space.
             task: (Task, optional): The environment's task (stabilization or traj. tracking).
@@ -143,6 +150,7 @@ class BenchmarkEnv(gym.Env):
             output_dir = os.getcwd()
         self.output_dir = output_dir
         self.GUI = gui
+        self.HEADLESS = not gui if headless is None else headless
         self.VERBOSE = verbose
         # Task.
         self.TASK = Task(task)
@@ -164,12 +172,17 @@ class BenchmarkEnv(gym.Env):
         self.RANDOMIZED_INIT = randomized_init
         if init_state_randomization_info is not None:
             self.INIT_STATE_RAND_INFO = init_state_randomization_info
+        else:
+            # Instance copy of the class defaults, which subclasses may prune (e.g. by quadrotor type).
+            self.INIT_STATE_RAND_INFO = copy.deepcopy(self.INIT_STATE_RAND_INFO)
         # Domain randomization on parameters.
         self.PRIOR_PROP = prior_prop
         self.INERTIAL_PROP = inertial_prop
         self.RANDOMIZED_INERTIAL_PROP = randomized_inertial_prop
         if inertial_prop_randomization_info is not None:
             self.INERTIAL_PROP_RAND_INFO = inertial_prop_randomization_info
+        else:
+            self.INERTIAL_PROP_RAND_INFO = copy.deepcopy(self.INERTIAL_PROP_RAND_INFO)
         # Set up action and observation space.
         self.NORMALIZED_RL_ACTION_SPACE = normalized_rl_action_space
         # Define cost-related quantities.
@@ -180,16 +193,17 @@ class BenchmarkEnv(gym.Env):
         # Store action (input) and observation spaces dimensions.
         # if observation is not the same as state, env should also have a `state_space`
         # and `state_dim` is queried from it.
-        self.action_dim = self.action_space.shape[0]
-        self.obs_dim = self.observation_space.shape[0]
+        # The dimensions are per agent (last axis), envs with multiple agents add a leading dimension.
+        self.action_dim = self.action_space.shape[-1]
+        self.obs_dim = self.observation_space.shape[-1]
         if hasattr(self, "state_space"):
-            self.state_dim = self.state_space.shape[0]
+            self.state_dim = self.state_space.shape[-1]
         else:
             self.state_dim = self.obs_dim
         # Default Q and R matrices for quadratic cost.
         if self.COST == Cost.QUADRATIC or self.COST == Cost.COMPETITION:
-            self.Q = np.eye(self.observation_space.shape[0])
-            self.R = np.eye(self.action_space.shape[0])
+            self.Q = np.eye(self.obs_dim)
+            self.R = np.eye(self.action_dim)
         # Set constraint info.
         self.CONSTRAINTS = constraints
         self.DONE_ON_VIOLATION = done_on_violation
@@ -230,8 +244,9 @@ class BenchmarkEnv(gym.Env):
         """
         self.np_random, seed = seeding.np_random(seed)
         self.action_space.seed(seed)
-        for _, disturbs in self.disturbances.items():
-            disturbs.seed(self)
+        for index, disturbs in enumerate(self.disturbances.values()):
+            # Block-sampled disturbances draw from their own generators, seeded by (seed, index, position).
+            disturbs.seed(self, [seed, index])
         return [seed]
 
     def set_cost_function_param(self,
@@ -246,13 +261,41 @@ class BenchmarkEnv(gym.Env):
 
         """
         if not self.initial_reset:
-            self.Q = Q
-            self.R = R
+            self.Q = np.array(Q, dtype=float)
+            self.R = np.array(R, dtype=float)
         else:
             raise RuntimeError(
                 '[ERROR] env.set_cost_function_param() cannot be called after the first reset of the environment.'
             )
 
+    def quadratic_cost(self,
+                       x,
+                       u,
+                       Xr,
+                       Ur
+                       ):
+        """Evaluates the quadratic cost 0.5 (x-Xr)^T Q (x-Xr) + 0.5 (u-Ur)^T R (u-Ur) in NumPy.
+
+        Equals `self.symbolic.loss(x=x, u=u, Xr=Xr, Ur=Ur, Q=self.Q, R=self.R)["l"]`, without
+        evaluating the derivatives, and supports batches of states and inputs.
+
+        Args:
+            x (ndarray): State(s), of shape (nx,) or (N, nx).
+            u (ndarray): Input(s), of shape (nu,) or (N, nu).
+            Xr (ndarray): Reference state(s), broadcastable to the shape of x.
+            Ur (ndarray): Reference input(s), broadcastable to the shape of u.
+
+        Returns:
+            float or ndarray: The cost, or the (N,) costs of a batch.
+
+        """
+        state_error = np.asarray(x) - Xr
+        act_error = np.asarray(u) - Ur
+        if state_error.ndim == 1 and act_error.ndim == 1:
+            return 0.5 * (state_error @ self.Q @ state_error) + 0.5 * (act_error @ self.R @ act_error)
+        return 0.5 * np.sum((state_error @ self.Q) * state_error, axis=-1) \
+               + 0.5 * np.sum((act_error @ self.R) * act_error, axis=-1)
+
     def set_adversary_control(self, action):
         """Sets disturbance by an adversary controller, called before (each) step().
 
@@ -486,6 +529,10 @@ class BenchmarkEnv(gym.Env):
             ndarray: The velocities in x, y, z of the trajectory sampled for its entire duration.
             ndarray: The scalar speed of the trajectory sampled for its entire duration.
 
+        Note:
+            The last `TRAJECTORY_CACHE_SIZE` trajectories are cached and shared between environments,
+            the returned arrays are read-only (copy them before modifying them).
+
         """
         # Get trajectory type.
         valid_traj_type = ["circle", "square", "figure8"]
@@ -500,23 +547,32 @@ class BenchmarkEnv(gym.Env):
             coord_index_b = direction_list.index(traj_plane[1])
         else:
             raise ValueError("Trajectory plane should be in form of ab, where a and b can be {x, y, z}.")
+        # Reuse the trajectory if it was already generated with the same arguments.
+        key = (type(self), traj_type, float(traj_length), num_cycles, traj_plane,
+               tuple(float(offset) for offset in position_offset[:2]), float(scaling), float(sample_time))
+        if key in _TRAJECTORY_CACHE:
+            _TRAJECTORY_CACHE.move_to_end(key)
+            return _TRAJECTORY_CACHE[key]
         # Generate time stamps.
         times = np.arange(0, traj_length, sample_time)
-        pos_ref_traj = np.zeros((len(times), 3))
-        vel_ref_traj = np.zeros((len(times), 3))
-        speed_traj = np.zeros((len(times), 1))
         # Compute trajectory points.
-        for t in enumerate(times):
-            pos_ref_traj[t[0]], vel_ref_traj[t[0]] = self._get_coordinates(t[1],
-                                                                           traj_type,
-                                                                           traj_period,
-                                                                           coord_index_a,
-                                                                           coord_index_b,
-                                                                           position_offset[0],
-                                                                           position_offset[1],
-                                                                           scaling)
-            speed_traj[t[0]] = np.linalg.norm(vel_ref_traj[t[0]])
-        return pos_ref_traj, vel_ref_traj, speed_traj
+        pos_ref_traj, vel_ref_traj = self._get_coordinates(times,
+                                                           traj_type,
+                                                           traj_period,
+                                                           coord_index_a,
+                                                           coord_index_b,
+                                                           position_offset[0],
+                                                           position_offset[1],
+                                                           scaling)
+        speed_traj = np.linalg.norm(vel_ref_traj, axis=-1, keepdims=True)
+        # The cached arrays are shared by all the environments using them.
+        trajectory = (pos_ref_traj, vel_ref_traj, speed_traj)
+        for array in trajectory:
+            array.setflags(write=False)
+        _TRAJECTORY_CACHE[key] = trajectory
+        if len(_TRAJECTORY_CACHE) > TRAJECTORY_CACHE_SIZE:
+            _TRAJECTORY_CACHE.popitem(last=False)
+        return trajectory
 
     def _get_coordinates(self,
                          t,
@@ -528,10 +584,10 @@ class BenchmarkEnv(gym.Env):
                          position_offset_b,
                          scaling
                          ):
-        """Computes the coordinates of a specified trajectory at time t.
+        """Computes the coordinates of a specified trajectory at time(s) t.
 
         Args:
-            t (float): The time at which we want to sample one trajectory point.
+            t (float or ndarray): The time(s) at which we want to sample trajectory points.
             traj_type (str, optional): The type of trajectory (circle, square, figure8).
             traj_period (float): The period of the trajectory in seconds.
             coord_index_a (int): The index of the first coordinate of the trajectory plane.
@@ -541,10 +597,11 @@ class BenchmarkEnv(gym.Env):
             scaling (float, optional): Scaling factor for the trajectory.
 
         Returns:
-            ndarray: The position in x, y, z, at time t.
-            ndarray: The velocity in x, y, z, at time t.
+            ndarray: The position in x, y, z, at time(s) t, with shape (3,) or (T,3).
+            ndarray: The velocity in x, y, z, at time(s) t, with shape (3,) or (T,3).
 
         """
+        t = np.asarray(t, dtype=float)
         # Get coordinates for the trajectory chosen.
         if traj_type == "figure8":
             coords_a, coords_b, coords_a_dot, coords_b_dot = self._figure8(
@@ -556,13 +613,13 @@ class BenchmarkEnv(gym.Env):
             coords_a, coords_b, coords_a_dot, coords_b_dot = self._square(
                 t, traj_period, scaling)
         # Initialize position and velocity references.
-        pos_ref = np.zeros((3,))
-        vel_ref = np.zeros((3,))
+        pos_ref = np.zeros(t.shape + (3,))
+        vel_ref = np.zeros(t.shape + (3,))
         # Set position and velocity references based on the plane of the trajectory chosen.
-        pos_ref[coord_index_a] = coords_a + position_offset_a
-        vel_ref[coord_index_a] = coords_a_dot
-        pos_ref[coord_index_b] = coords_b + position_offset_b
-        vel_ref[coord_index_b] = coords_b_dot
+        pos_ref[..., coord_index_a] = coords_a + position_offset_a
+        vel_ref[..., coord_index_a] = coords_a_dot
+        pos_ref[..., coord_index_b] = coords_b + position_offset_b
+        vel_ref[..., coord_index_b] = coords_b_dot
         return pos_ref, vel_ref
 
     def _figure8(self,
@@ -570,25 +627,27 @@ class BenchmarkEnv(gym.Env):
                  traj_period,
                  scaling
                  ):
-        """Computes the coordinates of a figure8 trajectory at time t.
+        """Computes the coordinates of a figure8 trajectory at time(s) t.
 
         Args:
-            t (float): The time at which we want to sample one trajectory point.
+            t (float or ndarray): The time(s) at which we want to sample trajectory points.
             traj_period (float): The period of the trajectory in seconds.
             scaling (float, optional): Scaling factor for the trajectory.
 
         Returns:
-            float: The position in the first coordinate. 
-            float: The position in the second coordinate. 
-            float: The velocity in the first coordinate. 
-            float: The velocity in the second coordinate. 
+            float or ndarray: The position in the first coordinate. 
+            float or ndarray: The position in the second coordinate. 
+            float or ndarray: The velocity in the first coordinate. 
+            float or ndarray: The velocity in the second coordinate. 
 
         """
         traj_freq = 2.0 * np.pi / traj_period
-        coords_a = scaling * np.sin(traj_freq * t)
-        coords_b = scaling * np.sin(traj_freq * t) * np.cos(traj_freq * t)
-        coords_a_dot = scaling * traj_freq * np.cos(traj_freq * t)
-        coords_b_dot = scaling * traj_freq * (np.cos(traj_freq * t)**2 - np.sin(traj_freq * t)**2)
+        sin = np.sin(traj_freq * t)
+        cos = np.cos(traj_freq * t)
+        coords_a = scaling * sin
+        coords_b = scaling * sin * cos
+        coords_a_dot = scaling * traj_freq * cos
+        coords_b_dot = scaling * traj_freq * (cos**2 - sin**2)
         return coords_a, coords_b, coords_a_dot, coords_b_dot
 
     def _circle(self,
@@ -596,25 +655,27 @@ class BenchmarkEnv(gym.Env):
                 traj_period,
                 scaling
                 ):
-        """Computes the coordinates of a circle trajectory at time t.
+        """Computes the coordinates of a circle trajectory at time(s) t.
 
         Args:
-            t (float): The time at which we want to sample one trajectory point.
+            t (float or ndarray): The time(s) at which we want to sample trajectory points.
             traj_period (float): The period of the trajectory in seconds.
             scaling (float, optional): Scaling factor for the trajectory.
 
         Returns:
-            float: The position in the first coordinate. 
-            float: The position in the second coordinate. 
-            float: The velocity in the first coordinate. 
-            float: The velocity in the second coordinate. 
+            float or ndarray: The position in the first coordinate. 
+            float or ndarray: The position in the second coordinate. 
+            float or ndarray: The velocity in the first coordinate. 
+            float or ndarray: The velocity in the second coordinate. 
 
         """
         traj_freq = 2.0 * np.pi / traj_period
-        coords_a = scaling * np.cos(traj_freq * t)
-        coords_b = scaling * np.sin(traj_freq * t)
-        coords_a_dot = -scaling * traj_freq * np.sin(traj_freq * t)
-        coords_b_dot = scaling * traj_freq * np.cos(traj_freq * t)
+        sin = np.sin(traj_freq * t)
+        cos = np.cos(traj_freq * t)
+        coords_a = scaling * cos
+        coords_b = scaling * sin
+        coords_a_dot = -scaling * traj_freq * sin
+        coords_b_dot = scaling * traj_freq * cos
         return coords_a, coords_b, coords_a_dot, coords_b_dot
 
     def _square(self,
@@ -622,55 +683,38 @@ class BenchmarkEnv(gym.Env):
                 traj_period,
                 scaling
                 ):
-        """Computes the coordinates of a square trajectory at time t.
+        """Computes the coordinates of a square trajectory at time(s) t.
 
         Args:
-            t (float): The time at which we want to sample one trajectory point.
+            t (float or ndarray): The time(s) at which we want to sample trajectory points.
             traj_period (float): The period of the trajectory in seconds.
             scaling (float, optional): Scaling factor for the trajectory.
 
         Returns:
-            float: The position in the first coordinate. 
-            float: The position in the second coordinate. 
-            float: The velocity in the first coordinate. 
-            float: The velocity in the second coordinate. 
+            float or ndarray: The position in the first coordinate. 
+            float or ndarray: The position in the second coordinate. 
+            float or ndarray: The velocity in the first coordinate. 
+            float or ndarray: The velocity in the second coordinate. 
 
         """
         # Compute time for each segment to complete.
         segment_period = traj_period / 4.0
         traverse_speed = scaling / segment_period
         # Compute time for the cycle.
-        cycle_time = t % traj_period
+        cycle_time = np.asarray(t) % traj_period
         # Check time along the current segment and ratio of completion.
         segment_time = cycle_time % segment_period
         # Check current segment index.
-        segment_index = int(np.floor(cycle_time / segment_period))
+        segment_index = np.floor(cycle_time / segment_period)
+        segments = [segment_index == index for index in range(4)]
         # Position along segment
         segment_position = traverse_speed * segment_time
-        if segment_index == 0:
-            # Moving up along second axis from (0, 0).
-            coords_a = 0.0
-            coords_b = segment_position
-            coords_a_dot = 0.0
-            coords_b_dot = traverse_speed
-        elif segment_index == 1:
-            # Moving left along first axis from (0, 1).
-            coords_a = -segment_position
-            coords_b = scaling
-            coords_a_dot = -traverse_speed
-            coords_b_dot = 0.0
-        elif segment_index == 2:
-            # Moving down along second axis from (-1, 1).
-            coords_a = -scaling
-            coords_b = scaling - segment_position
-            coords_a_dot = 0.0
-            coords_b_dot = -traverse_speed
-        elif segment_index == 3:
-            # Moving right along second axis from (-1, 0).
-            coords_a = -scaling + segment_position
-            coords_b = 0.0
-            coords_a_dot = traverse_speed
-            coords_b_dot = 0.0
+        # Segments: up along the second axis from (0, 0), left along the first axis from (0, 1),
+        # down along the second axis from (-1, 1) and right along the first axis from (-1, 0).
+        coords_a = np.select(segments, [0.0, -segment_position, -scaling, -scaling + segment_position])
+        coords_b = np.select(segments, [segment_position, scaling, scaling - segment_position, 0.0])
+        coords_a_dot = np.select(segments, [0.0, -traverse_speed, 0.0, traverse_speed])
+        coords_b_dot = np.select(segments, [traverse_speed, 0.0, -traverse_speed, 0.0])
         return coords_a, coords_b, coords_a_dot, coords_b_dot
 
     def _plot_trajectory(self,
@@ -713,7 +757,8 @@ class BenchmarkEnv(gym.Env):
                min(vel_ref_traj[:, 2]), max(vel_ref_traj[:, 2])))
         print("Speed: min %.2f m/s max %.2f m/s mean %.2f" %
               (min(speed_traj), max(speed_traj), np.mean(speed_traj)))
-        # Plot in x, y, z.
+        # Plot in x, y, z (matplotlib is only imported when plotting, it slows down the environments' import).
+        from matplotlib import pyplot as plt
         fig, axs = plt.subplots(3, 2)
         t = np.arange(0, traj_length, traj_length / pos_ref_traj.shape[0])
         axs[0, 0].plot(t, pos_ref_traj[:, 0])
@@ -347,17 +347,19 @@ class DefaultConstraint(BoundedConstraint):
         else:
             raise NotImplementedError('[ERROR] DefaultConstraint can only be of type STATE or INPUT')
         # extract bounds from the space
+        # (the spaces of multi-agent envs have a leading dimension, with the same bounds for all agents)
+        space_dim = default_constraint_space.shape[-1]
         if upper_bounds is None:
-            upper_bounds = default_constraint_space.high
+            upper_bounds = np.reshape(default_constraint_space.high, (-1, space_dim))[0]
         else:
             upper_bounds = np.array(upper_bounds, ndmin=1)
-            assert len(upper_bounds) == default_constraint_space.shape[0],\
+            assert len(upper_bounds) == space_dim,\
                 ValueError("[ERROR]: Upper bound must have length equal to space dimension.")
         if lower_bounds is None:
-            lower_bounds = default_constraint_space.low
+            lower_bounds = np.reshape(default_constraint_space.low, (-1, space_dim))[0]
         else:
             lower_bounds = np.array(lower_bounds, ndmin=1)
-            assert len(lower_bounds) == default_constraint_space.shape[0],\
+            assert len(lower_bounds) == space_dim,\
                 ValueError("[ERROR]: Lower bound must have length equal to space dimension.")
         super().__init__(env,
                          lower_bounds=lower_bounds.astype(np.float64),
@@ -423,9 +425,51 @@ def get_symbolic_constraint_models(constraint_list):
     return symbolic_models
 
 
+def is_stackable_constraint(constraint):
+    """Whether the values of a constraint are A @ x - b, with A and b fixed, i.e. can be stacked with others.
+
+    """
+    return isinstance(constraint, LinearConstraint) and type(constraint).get_value is Constraint.get_value
+
+
+def stack_constraints(constraints):
+    """Precomputes the vectorized evaluation of an (ordered) list of constraints.
+
+    The linear (incl. bounded and default) constraints acting on the same variable(s) and with
+    the same rounding are stacked into a single A @ x - b, the others are evaluated one by one.
+
+    Args:
+        constraints (list): The list of constraints.
+
+    Returns:
+        list: (variable type, rounding, rows, A, b) tuples of the stacked constraints.
+        list: (rows, constraint) tuples of the other constraints.
+        int: The total number of scalar constraints.
+
+    """
+    stacked = {}
+    others = []
+    start = 0
+    for con in constraints:
+        rows = np.arange(start, start + con.num_constraints)
+        start += con.num_constraints
+        if is_stackable_constraint(con):
+            group = stacked.setdefault((con.constrained_variable, con.rounding), ([], [], []))
+            group[0].append(rows)
+            group[1].append(con.A @ con.constraint_filter)
+            group[2].append(con.b)
+        else:
+            others.append((rows, con))
+    stacked = [(var, rounding, np.concatenate(rows), np.vstack(A), np.concatenate(b))
+               for (var, rounding), (rows, A, b) in stacked.items()]
+    return stacked, others, start
+
+
 class ConstraintList:
     """Collates a (ordered) list of constraints.
 
+    The linear constraints are evaluated together, with matrices stacked at construction (see `stack_constraints()`).
+
     """
 
     def __init__(self,
@@ -437,7 +481,8 @@ class ConstraintList:
             constraints: The list of constraints.
 
         """
-        self.constraints = constraints
+        # Own copy, the list is not modified afterwards (the cached functions depend on it).
+        self.constraints = list(constraints)
         self.constraint_lengths = [con.num_constraints for con in self.constraints]
         # 1st constraint is always index 0, hence ignored 
         self.constraint_indices = np.cumsum(self.constraint_lengths[:-1])
@@ -449,6 +494,16 @@ class ConstraintList:
         self.num_input_constraints = sum([con.num_constraints for con in self.input_constraints])
         self.input_state_constraints = [con for con in self.constraints if con.constrained_variable == ConstrainedVariableType.INPUT_AND_STATE]
         self.num_input_state_constraints = sum([con.num_constraints for con in self.input_state_constraints])
+        # Vectorized evaluation.
+        self.stacked_constraints, self.other_constraints, _ = stack_constraints(self.constraints)
+        self.stacked_state_constraints, self.other_state_constraints, _ = stack_constraints(self.state_constraints)
+        self.strict_rows = np.repeat([con.strict for con in self.constraints], self.constraint_lengths)
+        tolerances = [np.broadcast_to(con.tolerance if getattr(con, "tolerance", None) is not None else np.nan, con.num_constraints)
+                      for con in self.constraints]
+        self.tolerance_rows = np.concatenate(tolerances).astype(float) if self.constraints else np.zeros(0)
+        self.has_tolerance = not np.all(np.isnan(self.tolerance_rows))
+        # Stacked symbolic functions, see `get_stacked_symbolic_model()`.
+        self.stacked_symbolic_models = {}
 
     def __len__(self):
         """Gets the constraint list length.
@@ -483,21 +538,43 @@ class ConstraintList:
         """
         return get_symbolic_constraint_models(self.input_state_constraints)
 
-    def get_stacked_symbolic_model(self, env):
-        """Gets the symbolic form of all constraints.
+    def get_stacked_symbolic_model(self,
+                                   env,
+                                   constrained_variable=None,
+                                   horizon=None
+                                   ):
+        """Gets the symbolic form of all constraints, built once per symbolic model and cached.
 
         Args:
             env: The environment to constrain.
+            constrained_variable (ConstrainedVariableType, optional): Only stack the constraints on the
+                                                                      STATE or only those on the INPUT.
+            horizon (int, optional): Map the function over `horizon` columns of X and U.
 
         Returns:
-            obj: The symbolic form of the constraint.
+            cs.Function: The stacked constraint values, c = F(X, U), (num_constraints, horizon)-shaped if mapped.
 
         """
-        symbolic_models = [con.get_symbolic_model() for con in self.constraints]
-        X = env.symbolic.x_sym
-        U = env.symbolic.u_sym
-        stack_c_sym = cs.vertcat(*[func(X, U) for func in symbolic_models])
-        sym_func = cs.Function("constraints", [X, U], [stack_c_sym])
+        if constrained_variable is not None:
+            constrained_variable = ConstrainedVariableType(constrained_variable)
+        key = (constrained_variable, horizon)
+        cached = self.stacked_symbolic_models.get(key)
+        if cached is not None and cached[0] is env.symbolic:
+            return cached[1]
+        if horizon is not None:
+            sym_func = self.get_stacked_symbolic_model(env, constrained_variable).map(horizon)
+        else:
+            X = env.symbolic.x_sym
+            U = env.symbolic.u_sym
+            variables = {ConstrainedVariableType.STATE: X,
+                         ConstrainedVariableType.INPUT: U,
+                         ConstrainedVariableType.INPUT_AND_STATE: cs.vertcat(X, U)}
+            constraints = [con for con in self.constraints
+                           if constrained_variable is None or con.constrained_variable == constrained_variable]
+            stack_c_sym = cs.vertcat(*[con.get_symbolic_model()(variables[con.constrained_variable])
+                                       for con in constraints])
+            sym_func = cs.Function("constraints", [X, U], [stack_c_sym], ["x", "u"], ["c"])
+        self.stacked_symbolic_models[key] = (env.symbolic, sym_func)
         return sym_func
 
     def get_values(self,
@@ -506,17 +583,80 @@ class ConstraintList:
                    ):
         """Gets all constraint function values.
 
+        With multiple agents (e.g. drones), whose states and inputs have a leading (num_agents,) dimension,
+        the constraints are evaluated for each agent.
+
         Args:
             env: The environment to constrain.
 
         Returns:
-            ndarray: An array with the evaluation of each constraint.
+            ndarray: An array with the evaluation of each constraint, (num_agents, num_constraints)-shaped
+                     with multiple agents.
 
         """
+        if np.ndim(env.state) > 1:
+            inputs = None if only_state else env.current_raw_input_action
+            return self.get_values_batch(env.state, inputs, only_state=only_state)
         if only_state:
-            con_values = np.concatenate([con.get_value(env) for con in self.state_constraints])
+            return self._evaluate(env, self.stacked_state_constraints, self.other_state_constraints, self.num_state_constraints)
+        return self._evaluate(env, self.stacked_constraints, self.other_constraints, self.num_constraints)
+
+    def get_values_batch(self,
+                         states,
+                         inputs=None,
+                         only_state=False
+                         ):
+        """Gets all constraint function values for a batch (e.g. a logged trajectory) of states and inputs.
+
+        Args:
+            states (ndarray): (N, state_dim)-shaped array of states.
+            inputs (ndarray, optional): (N, action_dim)-shaped array of inputs, not needed if `only_state`.
+            only_state (bool): Whether to only evaluate the constraints that act on the state.
+
+        Returns:
+            ndarray: (N, num_constraints)-shaped array with the evaluation of each constraint for each sample.
+
+        """
+        states = np.atleast_2d(states)
+        if only_state:
+            stacked, others, num_constraints = self.stacked_state_constraints, self.other_state_constraints, self.num_state_constraints
         else:
-            con_values = np.concatenate([con.get_value(env) for con in self.constraints])
+            stacked, others, num_constraints = self.stacked_constraints, self.other_constraints, self.num_constraints
+            if inputs is None and num_constraints > self.num_state_constraints:
+                raise ValueError("[ERROR] in ConstraintList.get_values_batch(), inputs are required by the input constraints.")
+        variables = {ConstrainedVariableType.STATE: states}
+        if inputs is not None:
+            inputs = np.atleast_2d(inputs)
+            variables[ConstrainedVariableType.INPUT] = inputs
+            variables[ConstrainedVariableType.INPUT_AND_STATE] = np.hstack([states, inputs])
+        con_values = np.empty((states.shape[0], num_constraints))
+        for var, rounding, rows, A, b in stacked:
+            con_values[:, rows] = np.round(variables[var] @ A.T - b, decimals=rounding)
+        for rows, con in others:
+            for i, x in enumerate(variables[con.constrained_variable]):
+                con_values[i, rows] = np.round(np.atleast_1d(np.squeeze(con.sym_func(x))), decimals=con.rounding)
+        return con_values
+
+    def _evaluate(self,
+                  env,
+                  stacked,
+                  others,
+                  num_constraints
+                  ):
+        """Evaluates stacked and other constraints (see `stack_constraints()`) on the current env variables.
+
+        """
+        con_values = np.empty(num_constraints)
+        for var, rounding, rows, A, b in stacked:
+            if var == ConstrainedVariableType.STATE:
+                x = env.state
+            elif var == ConstrainedVariableType.INPUT:
+                x = env.current_raw_input_action
+            else:
+                x = np.concatenate([env.state, env.current_raw_input_action])
+            con_values[rows] = np.round(A @ x - b, decimals=rounding)
+        for rows, con in others:
+            con_values[rows] = con.get_value(env)
         return con_values
 
     def get_violations(self,
@@ -529,14 +669,17 @@ class ConstraintList:
             env: The environment to constrain.
 
         Returns:
-            list: A list of booleans saying whether each constraint was violated.
+            list: A list of booleans saying whether each constraint was violated (by any agent).
 
         """
-        if only_state:
-            flags = [con.is_violated(env) for con in self.state_constraints]
-        else:
-            flags = [con.is_violated(env) for con in self.constraints]
-        return flags
+        if only_state and np.ndim(env.state) == 1:
+            return [con.is_violated(env) for con in self.state_constraints]
+        constraints = self.state_constraints if only_state else self.constraints
+        lengths = [con.num_constraints for con in constraints]
+        c_value = np.atleast_2d(self.get_values(env, only_state=only_state))
+        strict_rows = np.repeat([con.strict for con in constraints], lengths).astype(bool)
+        row_flags = np.any(np.where(strict_rows, c_value >= 0., c_value > 0.), axis=0)
+        return [bool(np.any(flags)) for flags in np.split(row_flags, np.cumsum(lengths)[:-1])] if constraints else []
 
     def is_violated(self,
                     env,
@@ -552,15 +695,9 @@ class ConstraintList:
             bool: A boolean flag if any constraint is violeted. 
 
         """
-        if c_value is not None:
-            c_value_splits = np.split(c_value, self.constraint_indices)
-            flag = any([
-                con.is_violated(env, c_value=c_value_split) 
-                for con, c_value_split in zip(self.constraints, c_value_splits)
-            ])
-        else:
-            flag = any([con.is_violated(env) for con in self.constraints])
-        return flag
+        if c_value is None:
+            c_value = self.get_values(env)
+        return bool(np.any(np.where(self.strict_rows, c_value >= 0., c_value > 0.)))
 
     def is_almost_active(self,
                          env,
@@ -572,15 +709,12 @@ class ConstraintList:
         for reward shaping/constraint penalty in RL methods.
 
         """
-        if c_value is not None:
-            c_value_splits = np.split(c_value, self.constraint_indices)
-            flag = any([
-                con.is_almost_active(env, c_value=c_value_split) 
-                for con, c_value_split in zip(self.constraints, c_value_splits)
-            ])
-        else:
-            flag = any([con.is_almost_active(env) for con in self.constraints])
-        return flag
+        if not self.has_tolerance:
+            return False
+        if c_value is None:
+            c_value = self.get_values(env)
+        # Rows without tolerance are NaN, hence never almost active.
+        return bool(np.any(c_value + self.tolerance_rows > 0.))
 
 
 GENERAL_CONSTRAINTS = {
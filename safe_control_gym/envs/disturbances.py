@@ -8,12 +8,21 @@ import numpy as np
 class Disturbance:
     """Base class for disturbance or noise applied to inputs or dyanmics.
 
+    Random disturbances can be block-sampled (`block_size`): their random draws are made `block_size`
+    steps at a time, whenever the pre-drawn block is used up, instead of once per step. The unused
+    draws are kept across resets, and only dropped when seeding. The blocks are drawn by a generator of
+    their own, seeded with the env seed and the disturbance's position, so the env's `np_random` stream
+    (e.g. the initial state randomization) does not depend on `block_size`, and the sequences are
+    reproducible and the same for any block size (though different from those drawn per step from the
+    env's `np_random`).
+
     """
 
     def __init__(self,
                  env,
                  dim,
                  mask=None,
+                 block_size=None,
                  **kwargs
                  ):
         self.dim = dim
@@ -21,6 +30,11 @@ class Disturbance:
         if mask is not None:
             self.mask = np.asarray(mask)
             assert self.dim == len(self.mask)
+        if block_size is not None and block_size < 1:
+            raise ValueError("[ERROR] in Disturbance.__init__(), block_size must be a positive integer.")
+        self.block_size = block_size
+        self.block = None
+        self.block_index = 0
 
     def reset(self,
               env
@@ -35,12 +49,62 @@ class Disturbance:
 
         """
         return target
+
+    def apply_batch(self,
+                    targets,
+                    env
+                    ):
+        """Applies the disturbance independently to each row of `targets` (e.g. the drones or envs of a batch).
+
+        Default is to apply it row by row.
+
+        """
+        return np.stack([self.apply(target, env) for target in targets])
     
-    def seed(self, env):
+    def seed(self, env, seed=None):
         """Reset seed from env.
-        
+
+        Args:
+            env (BenchmarkEnv): the env, whose `np_random` is used for the draws made per step.
+            seed (int/list, optional): the seed of the generator of the blocks, the env's `np_random`
+                                       is used if None.
+
+        """
+        if self.block_size is not None and seed is not None:
+            self.np_random = np.random.default_rng(seed)
+        else:
+            self.np_random = env.np_random
+        self.block = None
+        self.block_index = 0
+
+    def _sample(self,
+                num
+                ):
+        """Draws `num` steps of the random variables of the disturbance, as a (num, dim)-shaped array.
+
         """
-        self.np_random = env.np_random
+        raise NotImplementedError
+
+    def _draw(self,
+              num=None
+              ):
+        """Draws the random variables for one step ((dim,)-shaped) or for `num` rows ((num, dim)-shaped).
+
+        Block-sampled disturbances read them from the pre-drawn block, refilled when used up.
+
+        """
+        if self.block_size is None:
+            return self._sample(1)[0] if num is None else self._sample(num)
+        count = 1 if num is None else num
+        end = self.block_index + count
+        if self.block is None or end > len(self.block):
+            # Keep the unused draws, so that the sequence does not depend on the block size.
+            unused = self.block[self.block_index:] if self.block is not None else np.zeros((0, self.dim))
+            self.block = np.concatenate([unused, self._sample(max(self.block_size, count))])
+            self.block_index, end = 0, count
+        draws = self.block[self.block_index:end]
+        self.block_index = end
+        return draws[0] if num is None else draws
         
 
 
@@ -77,13 +141,31 @@ class DisturbanceList:
         for disturb in self.disturbances:
             disturbed = disturb.apply(disturbed, env)
         return disturbed
+
+    def apply_batch(self,
+                    targets,
+                    env
+                    ):
+        """Sequentially apply disturbances, each one to all the rows of `targets` at once.
+
+        With several random disturbances, the draws are ordered by disturbance (then row) instead of by row.
+
+        """
+        disturbed = targets
+        for disturb in self.disturbances:
+            disturbed = disturb.apply_batch(disturbed, env)
+        return disturbed
     
-    def seed(self, env):
+    def seed(self, env, seed=None):
         """Reset seed from env.
-        
+
+        Args:
+            env (BenchmarkEnv): the env.
+            seed (list, optional): the seed of the list, extended with the index of each disturbance.
+
         """
-        for disturb in self.disturbances:
-            disturb.seed(env)
+        for i, disturb in enumerate(self.disturbances):
+            disturb.seed(env, None if seed is None else list(seed) + [i])
 
 
 class ImpulseDisturbance(Disturbance):
@@ -142,6 +224,13 @@ class ImpulseDisturbance(Disturbance):
         disturbed = target + noise
         return disturbed
 
+    def apply_batch(self,
+                    targets,
+                    env
+                    ):
+        # Same noise for all rows.
+        return self.apply(targets, env)
+
 
 class StepDisturbance(Disturbance):
     """Constant disturbance at all time steps (but after offset).
@@ -183,11 +272,19 @@ class StepDisturbance(Disturbance):
         disturbed = target + noise
         return disturbed
 
+    def apply_batch(self,
+                    targets,
+                    env
+                    ):
+        # Same noise for all rows.
+        return self.apply(targets, env)
+
+
 class UniformNoise(Disturbance):
     """i.i.d uniform noise ~ U(low, high) per time step."""
 
-    def __init__(self, env, dim, mask=None, low=0.0, high=1.0, **kwargs):
-        super().__init__(env, dim, mask)
+    def __init__(self, env, dim, mask=None, low=0.0, high=1.0, block_size=None, **kwargs):
+        super().__init__(env, dim, mask, block_size)
 
         # uniform distribution bounds
         if isinstance(low, float):
@@ -205,12 +302,21 @@ class UniformNoise(Disturbance):
             raise ValueError("[ERROR] UniformNoise.__init__(): high must be specified as a float or list.")
 
     def apply(self, target, env):
-        noise = self.np_random.uniform(self.low, self.high, size=self.dim)
+        noise = self._draw()
         if self.mask is not None:
-            noise *= self.mask
+            noise = noise * self.mask
         disturbed = target + noise
         return disturbed
 
+    def apply_batch(self, targets, env):
+        noise = self._draw(len(targets))
+        if self.mask is not None:
+            noise = noise * self.mask
+        return targets + noise
+
+    def _sample(self, num):
+        return self.np_random.uniform(self.low, self.high, size=(num, self.dim))
+
 
 class WhiteNoise(Disturbance):
     """I.i.d Gaussian noise per time step.
@@ -222,9 +328,10 @@ class WhiteNoise(Disturbance):
                  dim,
                  mask=None,
                  std=1.0,
+                 block_size=None,
                  **kwargs
                  ):
-        super().__init__(env, dim, mask)
+        super().__init__(env, dim, mask, block_size)
         # I.i.d gaussian variance.
         if isinstance(std, float):
             self.std = np.asarray([std] * self.dim)
@@ -238,15 +345,29 @@ class WhiteNoise(Disturbance):
               target,
               env
               ):
-        noise = self.np_random.normal(0, self.std, size=self.dim)
+        noise = self._draw()
         # # TODO: hack for debug 
         # noise = np.clip(noise, -self.std, self.std)
 
         if self.mask is not None:
-            noise *= self.mask
+            noise = noise * self.mask
         disturbed = target + noise
         return disturbed
 
+    def apply_batch(self,
+                    targets,
+                    env
+                    ):
+        noise = self._draw(len(targets))
+        if self.mask is not None:
+            noise = noise * self.mask
+        return targets + noise
+
+    def _sample(self,
+                num
+                ):
+        return self.np_random.normal(0, self.std, size=(num, self.dim))
+
 
 class BrownianNoise(Disturbance):
     """Simple random walk noise.
@@ -268,9 +389,10 @@ class PeriodicNoise(Disturbance):
                  mask=None,
                  scale=1.0,
                  frequency=1.0,
+                 block_size=None,
                  **kwargs
                  ):
-        super().__init__(env, dim)
+        super().__init__(env, dim, block_size=block_size)
         # Sine function parameters.
         self.scale = scale
         self.frequency = frequency
@@ -279,7 +401,7 @@ class PeriodicNoise(Disturbance):
               target,
               env
               ):
-        phase = self.np_random.uniform(low=-np.pi, high=np.pi, size=self.dim)
+        phase = self._draw()
         t = env.pyb_step_counter * env.PYB_TIMESTEP
         noise = self.scale * np.sin(2 * np.pi * self.frequency * t + phase)
         if self.mask is not None:
@@ -287,6 +409,22 @@ class PeriodicNoise(Disturbance):
         disturbed = target + noise
         return disturbed
 
+    def apply_batch(self,
+                    targets,
+                    env
+                    ):
+        phase = self._draw(len(targets))
+        t = env.pyb_step_counter * env.PYB_TIMESTEP
+        noise = self.scale * np.sin(2 * np.pi * self.frequency * t + phase)
+        if self.mask is not None:
+            noise *= self.mask
+        return targets + noise
+
+    def _sample(self,
+                num
+                ):
+        return self.np_random.uniform(low=-np.pi, high=np.pi, size=(num, self.dim))
+
 
 class StateDependentDisturbance(Disturbance):
     """Time varying and state varying, e.g. friction.
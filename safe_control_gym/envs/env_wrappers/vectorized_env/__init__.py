@@ -41,7 +41,10 @@ def make_vec_envs(env_func,
                   env_configs=None,
                   batch_size=1,
                   n_processes=1,
-                  seed=None):
+                  seed=None,
+                  lockstep=False,
+                  shared_memory=False,
+                  shared_info=None):
     """Produce envs with parallel rollout abilities. 
 
     Args:
@@ -50,16 +53,24 @@ def make_vec_envs(env_func,
         batch_size (int): total num of parallel envs. 
         n_processes (int): num of parallel workers to run envs.
         seed (int): base seed for the run. 
+        lockstep (bool): if to host the (quadrotor) envs in a single PyBullet client, stepped in lockstep.
+        shared_memory (bool): if the worker processes return the step results through shared memory.
+        shared_info (dict): shapes of the info values returned through shared memory, by key.
 
     Returns:
         VecEnv: (wrapped) parallel envs.
 
     """
+    if lockstep:
+        if n_processes > 1:
+            raise ValueError("[ERROR] in make_vec_envs(), lockstep envs run in a single process.")
+        from safe_control_gym.envs.gym_pybullet_drones.lockstep_vec_env import LockstepVecEnv
+        return LockstepVecEnv(env_func, env_configs, batch_size, seed)
     if env_configs is None:
         env_configs = [{}] * batch_size
     env_fns = [make_env_fn(env_func, env_configs[i], seed, i) for i in range(batch_size)]
     if n_processes > 1:
-        return SubprocVecEnv(env_fns, n_workers=n_processes)
+        return SubprocVecEnv(env_fns, n_workers=n_processes, shared_memory=shared_memory, shared_info=shared_info)
     else:
         # E.g. can use in evaluation (with seed -1).
         return DummyVecEnv(env_fns)
@@ -11,15 +11,21 @@ import multiprocessing as mp
 
 from safe_control_gym.utils.utils import get_random_state, set_random_state
 from safe_control_gym.envs.env_wrappers.vectorized_env.vec_env import VecEnv
-from safe_control_gym.envs.env_wrappers.vectorized_env.vec_env_utils import _flatten_list, _flatten_obs, CloudpickleWrapper, clear_mpi_env_vars
+from safe_control_gym.envs.env_wrappers.vectorized_env.vec_env_utils import _flatten_list, _flatten_obs, CloudpickleWrapper, SharedStepBuffers, \
+    clear_mpi_env_vars
 
 
 class SubprocVecEnv(VecEnv):
     """Multiprocess envs.
 
+    With `shared_memory=True`, the workers write the observations, rewards, dones and the `shared_info`
+    subset of the infos of `step()`/`reset()` into shared arrays (`SharedStepBuffers`), and only a
+    notification crosses the pipes. The infos are then restricted to the keys of `shared_info` (values
+    as float arrays), under "terminal_info" for done envs, with "terminal_observation".
+
     """
 
-    def __init__(self, env_fns, spaces=None, context="spawn", n_workers=1):
+    def __init__(self, env_fns, spaces=None, context="spawn", n_workers=1, shared_memory=False, shared_info=None):
         self.waiting = False
         self.closed = False
         nenvs = len(env_fns)
@@ -46,16 +52,33 @@ class SubprocVecEnv(VecEnv):
         observation_space, action_space = self.remotes[0].recv().x
         self.viewer = None
         VecEnv.__init__(self, nenvs, observation_space, action_space)
+        self.buffers = None
+        if shared_memory:
+            if observation_space.shape is None or len(observation_space.shape) == 0:
+                raise ValueError("[ERROR] in SubprocVecEnv.__init__(), shared memory requires array observations.")
+            # Float observations are stored in double precision, as returned by the envs.
+            obs_dtype = np.float64 if np.issubdtype(observation_space.dtype, np.floating) else observation_space.dtype
+            self.buffers = SharedStepBuffers(nenvs, observation_space.shape, obs_dtype, shared_info)
+            first_env_idx = np.cumsum([0] + [len(fns) for fns in env_fns[:-1]])
+            for remote, env_idx in zip(self.remotes, first_env_idx):
+                remote.send(('attach_buffers', (self.buffers.spec, int(env_idx))))
+            [remote.recv() for remote in self.remotes]
 
     def step_async(self, actions):
         self._assert_not_closed()
         actions = np.array_split(actions, self.n_workers)
+        cmd = 'step' if self.buffers is None else 'step_shared'
         for remote, action in zip(self.remotes, actions):
-            remote.send(('step', action))
+            remote.send((cmd, action))
         self.waiting = True
 
     def step_wait(self):
         self._assert_not_closed()
+        if self.buffers is not None:
+            [remote.recv() for remote in self.remotes]
+            self.waiting = False
+            obs, rews, dones, infos = self.buffers.read()
+            return obs, rews, dones, {"n": infos}
         results = [remote.recv() for remote in self.remotes]
         results = _flatten_list(results)
         self.waiting = False
@@ -64,6 +87,12 @@ class SubprocVecEnv(VecEnv):
 
     def reset(self):
         self._assert_not_closed()
+        if self.buffers is not None:
+            for remote in self.remotes:
+                remote.send(('reset_shared', None))
+            [remote.recv() for remote in self.remotes]
+            obs, _, _, infos = self.buffers.read()
+            return obs, {"n": infos}
         for remote in self.remotes:
             remote.send(('reset', None))
         results = [remote.recv() for remote in self.remotes]
@@ -94,6 +123,8 @@ class SubprocVecEnv(VecEnv):
             remote.send(('close', None))
         for p in self.ps:
             p.join()
+        if self.buffers is not None:
+            self.buffers.close()
         self.closed = True
 
     def _assert_not_closed(self):
@@ -205,8 +236,19 @@ def worker(remote, parent_remote, env_fn_wrappers):
             info["terminal_observation"] = end_obs
             info["terminal_info"] = end_info
         return ob, reward, done, info
+    def step_env_shared(idx, env, action):
+        ob, reward, done, info = env.step(action)
+        end_obs = None
+        if done:
+            # The env may reuse its observation and info buffers (`inplace_step`) in the reset.
+            end_obs = copy.deepcopy(ob)
+            info = copy.deepcopy(info)
+            ob, _ = env.reset()
+        buffers.write(idx, ob, reward, done, info, terminal_obs=end_obs)
     parent_remote.close()
     envs = [env_fn_wrapper() for env_fn_wrapper in env_fn_wrappers.x]
+    buffers = None
+    first_env_idx = 0
     try:
         while True:
             cmd, data = remote.recv()
@@ -214,8 +256,22 @@ def worker(remote, parent_remote, env_fn_wrappers):
             if cmd == 'step':
                 remote.send(
                     [step_env(env, action) for env, action in zip(envs, data)])
+            elif cmd == 'step_shared':
+                for i, (env, action) in enumerate(zip(envs, data)):
+                    step_env_shared(first_env_idx + i, env, action)
+                # Notify that the buffers are written.
+                remote.send(True)
             elif cmd == 'reset':
                 remote.send([env.reset() for env in envs])
+            elif cmd == 'reset_shared':
+                for i, env in enumerate(envs):
+                    ob, info = env.reset()
+                    buffers.write(first_env_idx + i, ob, 0., False, info)
+                remote.send(True)
+            elif cmd == 'attach_buffers':
+                spec, first_env_idx = data
+                buffers = SharedStepBuffers(**spec)
+                remote.send(True)
             elif cmd == 'render':
                 remote.send([env.render(mode='rgb_array') for env in envs])
             elif cmd == 'close':
@@ -260,3 +316,5 @@ def worker(remote, parent_remote, env_fn_wrappers):
     finally:
         for env in envs:
             env.close()
+        if buffers is not None:
+            buffers.close()
@@ -1,6 +1,7 @@
 import os
 import contextlib
 import numpy as np
+from multiprocessing import shared_memory
 
 
 class CloudpickleWrapper(object):
@@ -107,3 +108,124 @@ def _flatten_list(l):
     assert len(l) > 0
     assert all([len(l_) > 0 for l_ in l])
     return [l__ for l_ in l for l__ in l_]
+
+
+class SharedStepBuffers:
+    """Arrays of the step results of vectorized envs, in `multiprocessing.shared_memory` blocks.
+
+    For N envs, holds the observations, terminal observations, rewards and dones, and, for each key of
+    the info schema, the values and a flag of whether the env's info had the key.
+    Created by the main process, and attached by the workers with the picklable `spec`.
+
+    """
+
+    def __init__(self,
+                 num_envs,
+                 obs_shape,
+                 obs_dtype,
+                 info_schema=None,
+                 spec=None
+                 ):
+        """Creates (or attaches, if `spec` is given) the shared arrays.
+
+        Args:
+            num_envs (int): number of envs.
+            obs_shape (tuple): shape of an env's observation.
+            obs_dtype (np.dtype): dtype of the observations.
+            info_schema (dict): the shapes of the (float) info values in the buffers, by info key.
+            spec (dict): the block names of existing buffers, to attach to.
+
+        """
+        self.num_envs = num_envs
+        self.obs_shape = tuple(obs_shape)
+        self.obs_dtype = np.dtype(obs_dtype)
+        self.info_schema = {key: tuple(shape) for key, shape in (info_schema or {}).items()}
+        self.owner = spec is None
+        layout = {
+            "obs": (self.obs_shape, self.obs_dtype),
+            "terminal_obs": (self.obs_shape, self.obs_dtype),
+            "rew": ((), np.dtype(np.float64)),
+            "done": ((), np.dtype(bool))
+        }
+        for key, shape in self.info_schema.items():
+            layout["info/" + key] = (shape, np.dtype(np.float64))
+            layout["has/" + key] = ((), np.dtype(bool))
+        self.blocks = {}
+        self.arrays = {}
+        for name, (shape, dtype) in layout.items():
+            shape = (num_envs,) + shape
+            if self.owner:
+                nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+                block = shared_memory.SharedMemory(create=True, size=nbytes)
+            else:
+                block = shared_memory.SharedMemory(name=spec[name])
+            self.blocks[name] = block
+            self.arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        if self.owner:
+            for array in self.arrays.values():
+                array.fill(0)
+
+    @property
+    def spec(self):
+        """The arguments to attach to the buffers in another process.
+
+        """
+        return {"num_envs": self.num_envs,
+                "obs_shape": self.obs_shape,
+                "obs_dtype": self.obs_dtype.str,
+                "info_schema": self.info_schema,
+                "spec": {name: block.name for name, block in self.blocks.items()}}
+
+    def write(self,
+              idx,
+              obs,
+              rew,
+              done,
+              info,
+              terminal_obs=None
+              ):
+        """Writes the step results of the env at index `idx`, `info` is the info of the step.
+
+        """
+        self.arrays["obs"][idx] = obs
+        self.arrays["rew"][idx] = rew
+        self.arrays["done"][idx] = done
+        if terminal_obs is not None:
+            self.arrays["terminal_obs"][idx] = terminal_obs
+        for key in self.info_schema:
+            has_key = key in info
+            self.arrays["has/" + key][idx] = has_key
+            if has_key:
+                self.arrays["info/" + key][idx] = info[key]
+
+    def read(self):
+        """Copies the step results of all the envs.
+
+        Returns:
+            ndarray: The (N, ...) observations.
+            ndarray: The (N,) rewards.
+            ndarray: The (N,) dones.
+            list: The infos, the schema subset of the step's info, under "terminal_info" for done envs (with
+                  "terminal_observation"), as the infos of `SubprocVecEnv` with automatic resets.
+
+        """
+        dones = self.arrays["done"].copy()
+        infos = []
+        for i in range(self.num_envs):
+            info = {key: self.arrays["info/" + key][i].copy()
+                    for key in self.info_schema if self.arrays["has/" + key][i]}
+            if dones[i]:
+                info = {"terminal_observation": self.arrays["terminal_obs"][i].copy(), "terminal_info": info}
+            infos.append(info)
+        return self.arrays["obs"].copy(), self.arrays["rew"].copy(), dones, infos
+
+    def close(self):
+        """Releases the buffers (and unlinks them, in the creating process).
+
+        """
+        self.arrays = {}
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self.blocks = {}
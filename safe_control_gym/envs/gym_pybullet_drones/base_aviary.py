@@ -20,6 +20,8 @@ import pybullet as p
 import pybullet_data
 
 from safe_control_gym.envs.benchmark_env import BenchmarkEnv
+from safe_control_gym.math_and_models.transformations import quat_multiply, quat_to_euler, quat_to_rot
+from safe_control_gym.utils.timers import PhaseTimers
 
 egl = pkgutil.get_loader('eglRenderer')
 
@@ -45,6 +47,21 @@ class Physics(str, Enum):
     PYB_GND_DRAG_DW = "pyb_gnd_drag_dw"  # PyBullet physics update with ground effect, drag, and downwash.
 
 
+class DynIntegrator(str, Enum):
+    """Integration schemes of the explicit dynamics (Physics.DYN) enumeration class.
+
+    Note that EULER is the legacy model, not just a lower-order scheme: it integrates the Euler angles with the
+    body rates (rpy += dt * body_rates), which is only exact near hover. SEMI_IMPLICIT and RK4 integrate the
+    quaternion attitude with the body rates (the rigid body kinematics), so EULER does not converge to their
+    solution as the timestep decreases.
+
+    """
+
+    EULER = "euler"  # Legacy explicit Euler on position, velocity, rpy (small angle model) and body rates, state round-tripped through PyBullet.
+    SEMI_IMPLICIT = "semi_implicit"  # Semi-implicit (symplectic) Euler with quaternion attitude, state kept in NumPy.
+    RK4 = "rk4"  # Runge-Kutta 4 with quaternion attitude, state kept in NumPy.
+
+
 class ImageType(int, Enum):
     """Camera capture image type enumeration class.
 
@@ -62,6 +79,13 @@ class BaseAviary(BenchmarkEnv):
     """
     NAME = "base_aviary"
     URDF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+    # Methods timed when `step_timers` is True (nested phases are included in their callers' durations).
+    STEP_TIMED_PHASES = [
+        "step", "before_step", "_preprocess_control", "_advance_simulation",
+        "_physics", "_dynamics", "_ground_effect", "_drag", "_downwash", "_step_simulation",
+        "_update_and_store_kinematic_information", "_get_observation", "_get_info",
+        "_get_reward", "_get_done", "after_step"
+    ]
 
     def __init__(self,
                  drone_model: DroneModel = DroneModel.CF2X,
@@ -71,6 +95,11 @@ class BaseAviary(BenchmarkEnv):
                  gui=False,
                  verbose=False,
                  camera_view = [5, -40, -55, 1.5, 2, 0.5],
+                 fast_reset=False,
+                 step_timers=False,
+                 dyn_integrator: DynIntegrator = DynIntegrator.EULER,
+                 egl_render=False,
+                 shared_world=None,
                  **kwargs):
         """Initialization of a generic aviary environment.
 
@@ -84,6 +113,25 @@ class BaseAviary(BenchmarkEnv):
                                      `files/videos/`.
             gui (bool, optional): Whether to use PyBullet's GUI.
             verbose (bool, optional): If to suppress environment print statetments.
+            fast_reset (bool, optional): Whether to keep the PyBullet world (and its loaded bodies)
+                                         across resets, only restoring the bodies' poses and velocities,
+                                         instead of calling `resetSimulation` and reloading all URDFs.
+            step_timers (bool, optional): Whether to time the phases of `step()` (see `STEP_TIMED_PHASES`),
+                                          aggregated in histograms returned by `get_step_timers()`.
+            dyn_integrator (DynIntegrator, optional): The integration scheme of Physics.DYN. With the higher-order
+                                                      schemes, the drones' state is only written to PyBullet
+                                                      when needed (GUI, collision queries, rendering). The legacy
+                                                      EULER also uses a different (small angle) attitude model,
+                                                      see DynIntegrator.
+            egl_render (bool, optional): Whether to load PyBullet's EGL plugin to render offscreen frames
+                                         (`capture_frame()`) on the GPU instead of with TinyRenderer
+                                         (only without GUI, on Linux).
+            shared_world (dict, optional): To host the environment in a PyBullet client shared with other
+                                           environments (see `LockstepVecEnv`), with keys `pyb_client`, `offset`
+                                           (the position of the world's origin) and `collision_group` (the
+                                           collision group and mask of the world's bodies, including its plane).
+                                           The world is then persistent (`fast_reset`) and the client is not
+                                           disconnected by `close()`.
 
         """
         # Constants.
@@ -95,7 +143,19 @@ class BaseAviary(BenchmarkEnv):
         self.URDF_PATH = os.path.join(self.URDF_DIR, self.DRONE_MODEL.value + ".urdf")
         self.NUM_DRONES = num_drones
         self.PHYSICS = Physics(physics)
+        self.DYN_INTEGRATOR = DynIntegrator(dyn_integrator)
+        # With a higher-order explicit dynamics, the drones' state lives in NumPy (self.pos, self.quat, etc.).
+        self.NUMPY_DYN = self.PHYSICS == Physics.DYN and self.DYN_INTEGRATOR != DynIntegrator.EULER
         self.RECORD = record
+        self.SHARED_WORLD = shared_world
+        # Position of the world's origin in PyBullet, the drones' state (self.pos, etc.) is relative to it.
+        self.WORLD_OFFSET = np.zeros(3)
+        if shared_world is not None:
+            self.WORLD_OFFSET = np.array(shared_world.get("offset", [0, 0, 0]), dtype=float)
+            # Resetting the simulation would remove the other worlds' bodies.
+            fast_reset = True
+        self.FAST_RESET = fast_reset
+        self.WORLD_LOADED = False
         # Load the drone properties from the .urdf file.
         self.MASS, \
         self.L, \
@@ -117,7 +177,8 @@ class BaseAviary(BenchmarkEnv):
         self.PWM2RPM_SCALE, \
         self.PWM2RPM_CONST, \
         self.MIN_PWM, \
-        self.MAX_PWM = self._parse_urdf_parameters(self.URDF_PATH)
+        self.MAX_PWM, \
+        self.PROP_OFFSETS = self._parse_urdf_parameters(self.URDF_PATH)
         self.GROUND_PLANE_Z = 0 # -0.05
         if verbose:
             print(
@@ -145,11 +206,17 @@ class BaseAviary(BenchmarkEnv):
         self.GND_EFF_H_CLIP = 0.25 * self.PROP_RADIUS * np.sqrt(
             (15 * self.MAX_RPM**2 * self.KF * self.GND_EFF_COEFF)
             / self.MAX_THRUST)
+        self.GND_EFF_QUAT_WEIGHTS = self._ground_effect_quaternion_weights()
+        # Resultant z-force and x, y torques (in the base frame) of unit z-forces at the propellers.
+        self.PROP_WRENCH_ARMS = np.column_stack([np.ones(4), self.PROP_OFFSETS[:, 1], -self.PROP_OFFSETS[:, 0]])
         # BenchmarkEnv constructor.
         super().__init__(gui=gui, verbose=verbose, **kwargs)
         # Connect to PyBullet.
         self.PYB_CLIENT = -1
-        if gui:
+        if shared_world is not None:
+            # Client (with or without GUI) owned by the vectorized environment.
+            self.PYB_CLIENT = shared_world["pyb_client"]
+        elif gui:
             # With debug GUI.
             self.PYB_CLIENT = p.connect(p.GUI)  # p.connect(p.GUI, options="--opengl2")
             p.resetDebugVisualizerCamera(cameraDistance=camera_view[0],
@@ -164,12 +231,12 @@ class BaseAviary(BenchmarkEnv):
         else:
             # Without debug GUI.
             self.PYB_CLIENT = p.connect(p.DIRECT)
-            # Uncomment the following line to use EGL Render Plugin #
-            # Instead of TinyRender (CPU-based) in PYB's Direct mode
-            # if platform == "linux":
-            #     p.setAdditionalSearchPath(pybullet_data.getDataPath())
-            #     plugin = p.loadPlugin(egl.get_filename(), "_eglRendererPlugin")
-            #     print("plugin=", plugin)
+        # EGL Render Plugin, instead of TinyRender (CPU-based) in PYB's Direct mode.
+        self.EGL_PLUGIN = -1
+        if egl_render and not gui and shared_world is None and platform == "linux" and egl is not None:
+            self.EGL_PLUGIN = p.loadPlugin(egl.get_filename(), "_eglRendererPlugin", physicsClientId=self.PYB_CLIENT)
+            if self.EGL_PLUGIN < 0:
+                print("[WARNING] BaseAviary.__init__(), could not load the EGL plugin, frames are rendered with TinyRenderer.")
         self.RENDER_WIDTH = int(640)
         self.RENDER_HEIGHT = int(480)
         self.FRAME_PER_SEC = 24
@@ -179,7 +246,7 @@ class BaseAviary(BenchmarkEnv):
             yaw=-30,
             pitch=-30,
             roll=0,
-            cameraTargetPosition=[0, 0, 0],
+            cameraTargetPosition=self.WORLD_OFFSET.tolist(),
             upAxisIndex=2,
             physicsClientId=self.PYB_CLIENT)
         self.CAM_PRO = p.computeProjectionMatrixFOV(fov=60.0,
@@ -194,6 +261,42 @@ class BaseAviary(BenchmarkEnv):
                                     np.ones(self.NUM_DRONES) * (self.COLLISION_H/2-self.COLLISION_Z_OFFSET)
                                     ]).transpose().reshape(self.NUM_DRONES, 3)
         self.INIT_RPYS = np.zeros((self.NUM_DRONES, 3))
+        # Optional instrumentation of the step's phases.
+        self.STEP_TIMERS = None
+        if step_timers:
+            self._setup_step_timers()
+
+    def _setup_step_timers(self):
+        """Replaces the methods in `STEP_TIMED_PHASES` with timed versions (as instance attributes).
+
+        When timers are disabled, the methods are not wrapped and `step()` has no instrumentation overhead.
+
+        """
+        self.STEP_TIMERS = PhaseTimers()
+        for phase in self.STEP_TIMED_PHASES:
+            if hasattr(self, phase):
+                setattr(self, phase, self.STEP_TIMERS.wrap(phase, getattr(self, phase)))
+        if self.constraints is not None:
+            self.constraints.get_values = self.STEP_TIMERS.wrap("constraints.get_values", self.constraints.get_values)
+
+    def get_step_timers(self):
+        """Aggregated durations of the phases of `step()`, if the environment was created with `step_timers=True`.
+
+        Returns:
+            dict: The count, total, mean, min, max durations and histogram (in nanoseconds) of each timed phase,
+                  see `PhaseTimers.summary()`.
+
+        """
+        if self.STEP_TIMERS is None:
+            return {}
+        return self.STEP_TIMERS.summary()
+
+    def reset_step_timers(self):
+        """Discards the durations recorded so far.
+
+        """
+        if self.STEP_TIMERS is not None:
+            self.STEP_TIMERS.reset()
 
     def close(self):
         """Terminates the environment.
@@ -201,9 +304,13 @@ class BaseAviary(BenchmarkEnv):
         """
         if self.RECORD and self.GUI:
             p.stopStateLogging(self.VIDEO_ID, physicsClientId=self.PYB_CLIENT)
-        if self.PYB_CLIENT >= 0:
+        if self.PYB_CLIENT >= 0 and self.SHARED_WORLD is None:
+            if self.EGL_PLUGIN >= 0:
+                p.unloadPlugin(self.EGL_PLUGIN, physicsClientId=self.PYB_CLIENT)
+                self.EGL_PLUGIN = -1
             p.disconnect(physicsClientId=self.PYB_CLIENT)
         self.PYB_CLIENT = -1
+        self.WORLD_LOADED = False
         
     def _reset_simulation(self):
         """Housekeeping function.
@@ -211,6 +318,10 @@ class BaseAviary(BenchmarkEnv):
         Allocation and zero-ing of the variables and PyBullet's parameters/objects
         in the `reset()` function.
 
+        Returns:
+            bool: Whether the PyBullet world of the previous episode was kept (`fast_reset`),
+                  i.e. bodies loaded by subclasses still exist and can be re-positioned.
+
         """
         # Initialize/reset counters and zero-valued variables.
         self.RESET_TIME = time.time()
@@ -231,29 +342,47 @@ class BaseAviary(BenchmarkEnv):
         self.ang_v = np.zeros((self.NUM_DRONES, 3))
         if self.PHYSICS == Physics.DYN:
             self.rpy_rates = np.zeros((self.NUM_DRONES, 3))
-        # Set PyBullet's parameters.
-        p.resetSimulation(physicsClientId=self.PYB_CLIENT)
-        p.setGravity(0, 0, -self.GRAVITY_ACC, physicsClientId=self.PYB_CLIENT)
-        p.setRealTimeSimulation(0, physicsClientId=self.PYB_CLIENT)
-        p.setTimeStep(self.PYB_TIMESTEP, physicsClientId=self.PYB_CLIENT)
-        p.setAdditionalSearchPath(pybullet_data.getDataPath(),
-                                  physicsClientId=self.PYB_CLIENT)
-        # Load ground plane, drone and obstacles models.
-        self.PLANE_ID = p.loadURDF("plane.urdf", [0, 0, self.GROUND_PLANE_Z],
-                                   physicsClientId=self.PYB_CLIENT)
-        self.DRONE_IDS = np.array([
-            p.loadURDF(self.URDF_PATH,
-                       self.INIT_XYZS[i, :],
-                       p.getQuaternionFromEuler(self.INIT_RPYS[i, :]),
-                       flags = p.URDF_USE_INERTIA_FROM_FILE, # Use URDF inertia tensor.
-                       physicsClientId=self.PYB_CLIENT)
-            for i in range(self.NUM_DRONES)
-        ])
-        # for i in range(self.NUM_DRONES):
-         #     p.changeDynamics(self.DRONE_IDS[i], -1, linearDamping=0, angularDamping=0)
-        # Remove default damping.
-        for i in range(self.NUM_DRONES):
-            p.changeDynamics(self.DRONE_IDS[i], -1, linearDamping=0, angularDamping=0)
+        self.pyb_state_stale = False
+        self.lagged_base_poses = None
+        world_reused = self.FAST_RESET and self.WORLD_LOADED
+        if world_reused:
+            # Persistent world, only restore the drones' initial poses and zero their velocities.
+            for i in range(self.NUM_DRONES):
+                p.resetBasePositionAndOrientation(self.DRONE_IDS[i],
+                                                  self.INIT_XYZS[i, :] + self.WORLD_OFFSET,
+                                                  p.getQuaternionFromEuler(self.INIT_RPYS[i, :]),
+                                                  physicsClientId=self.PYB_CLIENT)
+                p.resetBaseVelocity(self.DRONE_IDS[i], [0, 0, 0], [0, 0, 0],
+                                    physicsClientId=self.PYB_CLIENT)
+        else:
+            # Set PyBullet's parameters.
+            if self.SHARED_WORLD is None:
+                p.resetSimulation(physicsClientId=self.PYB_CLIENT)
+            p.setGravity(0, 0, -self.GRAVITY_ACC, physicsClientId=self.PYB_CLIENT)
+            p.setRealTimeSimulation(0, physicsClientId=self.PYB_CLIENT)
+            p.setTimeStep(self.PYB_TIMESTEP, physicsClientId=self.PYB_CLIENT)
+            p.setAdditionalSearchPath(pybullet_data.getDataPath(),
+                                      physicsClientId=self.PYB_CLIENT)
+            # Load ground plane, drone and obstacles models.
+            self.PLANE_ID = p.loadURDF("plane.urdf", [0, 0, self.GROUND_PLANE_Z] + self.WORLD_OFFSET,
+                                       physicsClientId=self.PYB_CLIENT)
+            self._set_world_collision_group(self.PLANE_ID)
+            self.DRONE_IDS = np.array([
+                p.loadURDF(self.URDF_PATH,
+                           self.INIT_XYZS[i, :] + self.WORLD_OFFSET,
+                           p.getQuaternionFromEuler(self.INIT_RPYS[i, :]),
+                           flags = p.URDF_USE_INERTIA_FROM_FILE, # Use URDF inertia tensor.
+                           physicsClientId=self.PYB_CLIENT)
+                for i in range(self.NUM_DRONES)
+            ])
+            # for i in range(self.NUM_DRONES):
+             #     p.changeDynamics(self.DRONE_IDS[i], -1, linearDamping=0, angularDamping=0)
+            # Remove default damping.
+            for i in range(self.NUM_DRONES):
+                p.changeDynamics(self.DRONE_IDS[i], -1, linearDamping=0, angularDamping=0,
+                                 physicsClientId=self.PYB_CLIENT)
+                self._set_world_collision_group(self.DRONE_IDS[i])
+            self.WORLD_LOADED = True
         # Update and store the drones kinematic information.
         self._update_and_store_kinematic_information()
         # Start video recording.
@@ -262,6 +391,7 @@ class BaseAviary(BenchmarkEnv):
         # for i in range(self.NUM_DRONES):
         # if gui:
         #     self._show_drone_local_axes(i)
+        return world_reused
         
     def _advance_simulation(self, clipped_action, disturbance_force=None):
         """Advances the environment by one simulation step.
@@ -276,50 +406,138 @@ class BaseAviary(BenchmarkEnv):
         clipped_action = np.reshape(clipped_action, (self.NUM_DRONES, 4))
         # Repeat for as many as the aggregate physics steps.
         for _ in range(self.PYB_STEPS_PER_CTRL):
-            # Update and store the drones kinematic info for certain
-            # Between aggregate steps for certain types of update.
-            if self.PYB_STEPS_PER_CTRL > 1 and self.PHYSICS in [
-                    Physics.DYN, Physics.PYB_GND, Physics.PYB_DRAG,
-                    Physics.PYB_DW, Physics.PYB_GND_DRAG_DW
-            ]:
-                self._update_and_store_kinematic_information()
-            # Step the simulation using the desired physics update.
-            for i in range(self.NUM_DRONES):
-                if self.PHYSICS == Physics.PYB:
-                    self._physics(clipped_action[i, :], i)
-                elif self.PHYSICS == Physics.DYN:
-                    self._dynamics(clipped_action[i, :], i)
-                elif self.PHYSICS == Physics.PYB_GND:
-                    self._physics(clipped_action[i, :], i)
-                    self._ground_effect(clipped_action[i, :], i)
-                elif self.PHYSICS == Physics.PYB_DRAG:
-                    self._physics(clipped_action[i, :], i)
-                    self._drag(self.last_clipped_action[i, :], i)
-                elif self.PHYSICS == Physics.PYB_DW:
-                    self._physics(clipped_action[i, :], i)
-                    self._downwash(i)
-                elif self.PHYSICS == Physics.PYB_GND_DRAG_DW:
-                    self._physics(clipped_action[i, :], i)
-                    self._ground_effect(clipped_action[i, :], i)
-                    self._drag(self.last_clipped_action[i, :], i)
-                    self._downwash(i)
-                # Apply disturbance
-                if disturbance_force is not None:
-                    pos = self._get_drone_state_vector(i)[:3]
-                    p.applyExternalForce(
-                        self.DRONE_IDS[i],
-                        linkIndex=4,  # Link attached to the quadrotor's center of mass.
-                        forceObj=disturbance_force,
-                        posObj=pos,
-                        flags=p.WORLD_FRAME,
-                        physicsClientId=self.PYB_CLIENT)
+            self._apply_physics_step(clipped_action, disturbance_force)
             # PyBullet computes the new state, unless Physics.DYN.
             if self.PHYSICS != Physics.DYN:
-                p.stepSimulation(physicsClientId=self.PYB_CLIENT)
-            # Save the last applied action (e.g. to compute drag).
-            self.last_clipped_action = clipped_action
-        # Update and store the drones kinematic information.
-        self._update_and_store_kinematic_information()
+                self._step_simulation()
+        self._finish_physics_steps()
+
+    def _apply_physics_step(self, clipped_action, disturbance_force=None):
+        """Applies the forces (or, with Physics.DYN, the new state) of one physics step, before `stepSimulation`.
+
+        Split from `_advance_simulation()` so that several worlds sharing a PyBullet client can be advanced
+        by a single `stepSimulation` call per physics step (see `LockstepVecEnv`).
+
+        Args:
+            clipped_action (ndarray): The (NUM_DRONES, 4)-shaped RPMs of the drones.
+            disturbance_force (ndarray, optional): Disturbance force, applied to all drones.
+
+        """
+        # Update and store the drones kinematic info for certain
+        # Between aggregate steps for certain types of update.
+        if self.PYB_STEPS_PER_CTRL > 1 and not self.NUMPY_DYN and self.PHYSICS in [
+                Physics.DYN, Physics.PYB_GND, Physics.PYB_DRAG,
+                Physics.PYB_DW, Physics.PYB_GND_DRAG_DW
+        ]:
+            self._update_and_store_kinematic_information()
+        # After a state snapshot restore, Bullet's cached link transforms (used to apply the forces in the links'
+        # frames) are moved back to the base poses of the previous physics step, as they lag while stepping.
+        lagged_base_poses, self.lagged_base_poses = self.lagged_base_poses, None
+        if lagged_base_poses is not None:
+            base_states = [(p.getBasePositionAndOrientation(drone_id, physicsClientId=self.PYB_CLIENT),
+                            p.getBaseVelocity(drone_id, physicsClientId=self.PYB_CLIENT)) for drone_id in self.DRONE_IDS]
+            for drone_id, (pos, quat) in zip(self.DRONE_IDS, lagged_base_poses):
+                p.resetBasePositionAndOrientation(drone_id, pos, quat, physicsClientId=self.PYB_CLIENT)
+        # Step the simulation using the desired physics update, vectorized over the drones.
+        if self.PHYSICS == Physics.DYN:
+            self._dynamics(clipped_action)
+        else:
+            self._physics(clipped_action)
+            if self.PHYSICS in [Physics.PYB_GND, Physics.PYB_GND_DRAG_DW]:
+                self._ground_effect(clipped_action)
+            if self.PHYSICS in [Physics.PYB_DRAG, Physics.PYB_GND_DRAG_DW]:
+                self._drag(self.last_clipped_action)
+            if self.PHYSICS in [Physics.PYB_DW, Physics.PYB_GND_DRAG_DW]:
+                self._downwash()
+        # Apply disturbance
+        if disturbance_force is not None:
+            for i in range(self.NUM_DRONES):
+                pos = self._get_drone_state_vector(i)[:3] + self.WORLD_OFFSET
+                p.applyExternalForce(
+                    self.DRONE_IDS[i],
+                    linkIndex=4,  # Link attached to the quadrotor's center of mass.
+                    forceObj=disturbance_force,
+                    posObj=pos,
+                    flags=p.WORLD_FRAME,
+                    physicsClientId=self.PYB_CLIENT)
+        if lagged_base_poses is not None:
+            for drone_id, ((pos, quat), (vel, ang_v)) in zip(self.DRONE_IDS, base_states):
+                p.resetBasePositionAndOrientation(drone_id, pos, quat, physicsClientId=self.PYB_CLIENT)
+                p.resetBaseVelocity(drone_id, vel, ang_v, physicsClientId=self.PYB_CLIENT)
+        # Save the last applied action (e.g. to compute drag).
+        self.last_clipped_action = clipped_action
+
+    def _finish_physics_steps(self):
+        """Updates the drones' kinematic information after the physics steps of a control step.
+
+        """
+        if self.NUMPY_DYN:
+            # The kinematic information is already up to date, PyBullet is only synced for the GUI/video.
+            self.pyb_state_stale = True
+            if self.GUI or self.RECORD:
+                self._sync_pybullet_state()
+        else:
+            # Update and store the drones kinematic information.
+            self._update_and_store_kinematic_information()
+
+    def _sync_pybullet_state(self):
+        """Writes the drones' NumPy state to PyBullet, if it changed since the last sync (`NUMPY_DYN`).
+
+        To call before PyBullet queries depending on the drones' poses (e.g. contacts, closest points, camera images).
+
+        """
+        if not self.pyb_state_stale:
+            return
+        for i in range(self.NUM_DRONES):
+            p.resetBasePositionAndOrientation(self.DRONE_IDS[i],
+                                              self.pos[i] + self.WORLD_OFFSET,
+                                              self.quat[i],
+                                              physicsClientId=self.PYB_CLIENT)
+            p.resetBaseVelocity(self.DRONE_IDS[i],
+                                self.vel[i],
+                                self.ang_v[i],
+                                physicsClientId=self.PYB_CLIENT)
+        self.pyb_state_stale = False
+
+    def _step_simulation(self):
+        """Advances PyBullet's simulation by one physics step.
+
+        """
+        p.stepSimulation(physicsClientId=self.PYB_CLIENT)
+
+    def capture_frame(self,
+                      width=None,
+                      height=None,
+                      flags=0
+                      ):
+        """Renders a frame with the offscreen camera (`CAM_VIEW`), using the EGL plugin if loaded.
+
+        Args:
+            width (int, optional): The width of the frame, defaults to `RENDER_WIDTH`.
+            height (int, optional): The height of the frame, defaults to `RENDER_HEIGHT`.
+            flags (int, optional): PyBullet's `getCameraImage()` flags.
+
+        Returns:
+            ndarray: The (height, width, 4)-shaped RGBA frame.
+
+        """
+        width = self.RENDER_WIDTH if width is None else int(width)
+        height = self.RENDER_HEIGHT if height is None else int(height)
+        if width * self.RENDER_HEIGHT == height * self.RENDER_WIDTH:
+            projection = self.CAM_PRO
+        else:
+            projection = p.computeProjectionMatrixFOV(fov=60.0, aspect=width / height, nearVal=0.1, farVal=1000.0)
+        renderer = p.ER_BULLET_HARDWARE_OPENGL if self.EGL_PLUGIN >= 0 else p.ER_TINY_RENDERER
+        self._sync_pybullet_state()
+        [w, h, rgb, dep, seg] = p.getCameraImage(width=width,
+                                                 height=height,
+                                                 shadow=1,
+                                                 viewMatrix=self.CAM_VIEW,
+                                                 projectionMatrix=projection,
+                                                 renderer=renderer,
+                                                 flags=flags,
+                                                 physicsClientId=self.PYB_CLIENT)
+        return np.reshape(rgb, (h, w, 4))
 
     def render(self, mode='human', close=False):
         """Prints a textual output of the environment.
@@ -367,12 +585,26 @@ class BaseAviary(BenchmarkEnv):
 
         """
         for i in range(self.NUM_DRONES):
-            self.pos[i], self.quat[i] = p.getBasePositionAndOrientation(
+            pos, self.quat[i] = p.getBasePositionAndOrientation(
                 self.DRONE_IDS[i], physicsClientId=self.PYB_CLIENT)
+            self.pos[i] = np.subtract(pos, self.WORLD_OFFSET)
             self.rpy[i] = p.getEulerFromQuaternion(self.quat[i])
             self.vel[i], self.ang_v[i] = p.getBaseVelocity(
                 self.DRONE_IDS[i], physicsClientId=self.PYB_CLIENT)
 
+    def _set_world_collision_group(self, body_id):
+        """Restricts the collisions of a body to the bodies of its world, in a shared PyBullet client.
+
+        Args:
+            body_id (int): The PyBullet id of the body (all its links are included).
+
+        """
+        if self.SHARED_WORLD is None:
+            return
+        group = self.SHARED_WORLD["collision_group"]
+        for link in range(-1, p.getNumJoints(body_id, physicsClientId=self.PYB_CLIENT)):
+            p.setCollisionFilterGroupMask(body_id, link, group, group, physicsClientId=self.PYB_CLIENT)
+
     def _start_video_recording(self):
         """Starts the recording of a video output.
 
@@ -409,171 +641,279 @@ class BaseAviary(BenchmarkEnv):
         ])
         return state.reshape(20,)
 
-    def _physics(self, rpm, nth_drone):
-        """Base PyBullet physics implementation.
+    def _physics(self, rpm):
+        """Base PyBullet physics implementation, for all drones.
 
         Args:
-            rpm (ndarray): (4)-shaped array of ints containing the RPMs values of the 4 motors.
-            nth_drone (int): The ordinal number/position of the desired drone in list self.DRONE_IDS.
+            rpm (ndarray): (NUM_DRONES, 4)-shaped array of ints containing the RPMs values of the 4 motors of each drone.
 
         """
         forces = np.array(rpm**2) * self.KF
         torques = np.array(rpm**2) * self.KM
-        # z_torque = (-torques[0] + torques[1] - torques[2] + torques[3])
-        z_torque = (torques[0] - torques[1] + torques[2] - torques[3])
-        for i in range(4):
-            p.applyExternalForce(self.DRONE_IDS[nth_drone],
-                                 i,
-                                 forceObj=[0, 0, forces[i]],
-                                 posObj=[0, 0, 0],
-                                 flags=p.LINK_FRAME,
-                                 physicsClientId=self.PYB_CLIENT)
-        p.applyExternalTorque(self.DRONE_IDS[nth_drone],
-                              4,
-                              torqueObj=[0, 0, z_torque],
-                              flags=p.LINK_FRAME,
-                              physicsClientId=self.PYB_CLIENT)
+        # z_torques = (-torques[:, 0] + torques[:, 1] - torques[:, 2] + torques[:, 3])
+        z_torques = (torques[:, 0] - torques[:, 1] + torques[:, 2] - torques[:, 3])
+        for n in range(self.NUM_DRONES):
+            for i in range(4):
+                p.applyExternalForce(self.DRONE_IDS[n],
+                                     i,
+                                     forceObj=[0, 0, forces[n, i]],
+                                     posObj=[0, 0, 0],
+                                     flags=p.LINK_FRAME,
+                                     physicsClientId=self.PYB_CLIENT)
+            p.applyExternalTorque(self.DRONE_IDS[n],
+                                  4,
+                                  torqueObj=[0, 0, z_torques[n]],
+                                  flags=p.LINK_FRAME,
+                                  physicsClientId=self.PYB_CLIENT)
 
-    def _ground_effect(self, rpm, nth_drone):
-        """PyBullet implementation of a ground effect model.
+    def _ground_effect(self, rpm):
+        """PyBullet implementation of a ground effect model, for all drones.
 
         Inspired by the analytical model used for comparison in (Shi et al., 2019).
+        The propellers' heights are computed from the stored base poses and the propellers' fixed
+        positions in the base frame (no link state query), and the 4 per-propeller forces are applied
+        as their resultant force and torque at the center of mass.
 
         Args:
-            rpm (ndarray): (4)-shaped array of ints containing the RPMs values of the 4 motors.
-            nth_drone (int): The ordinal number/position of the desired drone in list self.DRONE_IDS.
+            rpm (ndarray): (NUM_DRONES, 4)-shaped array of ints containing the RPMs values of the 4 motors of each drone.
 
         """
-        # Kin. info of all links (propellers and center of mass)
-        link_states = np.array(
-            p.getLinkStates(self.DRONE_IDS[nth_drone],
-                            linkIndices=[0, 1, 2, 3, 4],
-                            computeLinkVelocity=1,
-                            computeForwardKinematics=1,
-                            physicsClientId=self.PYB_CLIENT))
+        # Heights of the propellers and world z-component of the base z-axis, from the quaternions.
+        quat_outer = (self.quat[:, :, None] * self.quat[:, None, :]).reshape((self.NUM_DRONES, 16))
+        quat_forms = quat_outer @ self.GND_EFF_QUAT_WEIGHTS
+        prop_heights = self.pos[:, 2:3] + quat_forms[:, 0:4]
         # Simple, per-propeller ground effects.
-        prop_heights = np.array([
-            link_states[0, 0][2], link_states[1, 0][2], link_states[2, 0][2],
-            link_states[3, 0][2]
-        ])
-        prop_heights = np.clip(prop_heights, self.GND_EFF_H_CLIP, np.inf)
-        gnd_effects = np.array(rpm**2) * self.KF * self.GND_EFF_COEFF \
-                      * (self.PROP_RADIUS / (4 * prop_heights))**2
-        if np.abs(self.rpy[nth_drone, 0]) < np.pi / 2 and np.abs(
-                self.rpy[nth_drone, 1]) < np.pi / 2:
-            for i in range(4):
-                p.applyExternalForce(self.DRONE_IDS[nth_drone],
-                                     i,
-                                     forceObj=[0, 0, gnd_effects[i]],
+        prop_heights = np.maximum(prop_heights, self.GND_EFF_H_CLIP)
+        gnd_effects = np.array(rpm**2) * (self.KF * self.GND_EFF_COEFF * (self.PROP_RADIUS / 4)**2 / prop_heights**2)
+        # Resultant force and torque in the base frame of the propellers' forces [0, 0, gnd_effect].
+        wrenches = gnd_effects @ self.PROP_WRENCH_ARMS
+        for n, drone_id in enumerate(self.DRONE_IDS):
+            # Only if abs(roll) and abs(pitch) are smaller than pi/2, i.e. the base z-axis points upwards.
+            if quat_forms[n, 4] > 0:
+                p.applyExternalForce(drone_id,
+                                     4,
+                                     forceObj=[0, 0, wrenches[n, 0]],
                                      posObj=[0, 0, 0],
                                      flags=p.LINK_FRAME,
                                      physicsClientId=self.PYB_CLIENT)
+                p.applyExternalTorque(drone_id,
+                                      4,
+                                      torqueObj=[wrenches[n, 1], wrenches[n, 2], 0],
+                                      flags=p.LINK_FRAME,
+                                      physicsClientId=self.PYB_CLIENT)
         # TODO: a more realistic model accounting for the drone's
         # Attitude and its z-axis velocity in the world frame.
 
-    def _drag(self, rpm, nth_drone):
-        """PyBullet implementation of a drag model.
+    def _ground_effect_quaternion_weights(self):
+        """Weights of the quaternion's outer product giving the quantities needed by `_ground_effect()`.
+
+        The last row of the rotation matrix of a unit quaternion (x, y, z, w), [2(xz - wy), 2(yz + wx), ww - xx - yy + zz],
+        is a quadratic form of the quaternion, and so are the propellers' height offsets (its products with PROP_OFFSETS).
+
+        Returns:
+            ndarray: (16, 5)-shaped weights, the products with the flattened outer product are the 4 propellers' height
+                     offsets and the world z-component of the base z-axis.
+
+        """
+        x, y, z, w = range(4)
+        z_row_forms = np.zeros((3, 4, 4))
+        z_row_forms[0, x, z] = z_row_forms[0, z, x] = 1
+        z_row_forms[0, w, y] = z_row_forms[0, y, w] = -1
+        z_row_forms[1, y, z] = z_row_forms[1, z, y] = 1
+        z_row_forms[1, w, x] = z_row_forms[1, x, w] = 1
+        z_row_forms[2, w, w] = z_row_forms[2, z, z] = 1
+        z_row_forms[2, x, x] = z_row_forms[2, y, y] = -1
+        z_row_forms = z_row_forms.reshape((3, 16))
+        return np.column_stack([z_row_forms.T @ self.PROP_OFFSETS.T, z_row_forms[2]])
+
+    def _drag(self, rpm):
+        """PyBullet implementation of a drag model, for all drones.
 
         Based on the the system identification in (Forster, 2015).
 
         Args:
-            rpm (ndarray): (4)-shaped array of ints containing the RPMs values of the 4 motors.
-            nth_drone (int): The ordinal number/position of the desired drone in list self.DRONE_IDS.
+            rpm (ndarray): (NUM_DRONES, 4)-shaped array of ints containing the RPMs values of the 4 motors of each drone.
 
         """
-        # Rotation matrix of the base.
-        base_rot = np.array(p.getMatrixFromQuaternion(
-            self.quat[nth_drone, :])).reshape(3, 3)
+        # Rotation matrices of the bases.
+        base_rot = quat_to_rot(self.quat)
         # Simple draft model applied to the base/center of mass #
         drag_factors = -1 * self.DRAG_COEFF * np.sum(
-            np.array(2 * np.pi * rpm / 60))
-        drag = np.dot(base_rot, drag_factors * np.array(self.vel[nth_drone, :]))
-        p.applyExternalForce(self.DRONE_IDS[nth_drone],
-                             4,
-                             forceObj=drag,
-                             posObj=[0, 0, 0],
-                             flags=p.LINK_FRAME,
-                             physicsClientId=self.PYB_CLIENT)
-
-    def _downwash(self, nth_drone):
-        """PyBullet implementation of a ground effect model.
+            np.array(2 * np.pi * rpm / 60), axis=1, keepdims=True)
+        drag = np.einsum("nij,nj->ni", base_rot, drag_factors * self.vel)
+        for n in range(self.NUM_DRONES):
+            p.applyExternalForce(self.DRONE_IDS[n],
+                                 4,
+                                 forceObj=drag[n],
+                                 posObj=[0, 0, 0],
+                                 flags=p.LINK_FRAME,
+                                 physicsClientId=self.PYB_CLIENT)
 
-        Based on experiments conducted at the Dynamic Systems Lab by SiQi Zhou.
+    def _downwash(self):
+        """PyBullet implementation of a downwash model, for all drones.
 
-        Args:
-            nth_drone (int): The ordinal number/position of the desired drone in list self.DRONE_IDS.
+        Based on experiments conducted at the Dynamic Systems Lab by SiQi Zhou.
+        The position differences of all pairs of drones are computed at once with NumPy.
 
         """
-        for i in range(self.NUM_DRONES):
-            delta_z = self.pos[i, 2] - self.pos[nth_drone, 2]
-            delta_xy = np.linalg.norm(
-                np.array(self.pos[i, 0:2]) - np.array(self.pos[nth_drone, 0:2]))
-            if delta_z > 0 and delta_xy < 10:  # Ignore drones more than 10 meters away
-                alpha = self.DW_COEFF_1 * (self.PROP_RADIUS / (4 * delta_z))**2
-                beta = self.DW_COEFF_2 * delta_z + self.DW_COEFF_3
-                downwash = [0, 0, -alpha * np.exp(-.5 * (delta_xy / beta)**2)]
-                p.applyExternalForce(self.DRONE_IDS[nth_drone],
-                                     4,
-                                     forceObj=downwash,
-                                     posObj=[0, 0, 0],
-                                     flags=p.LINK_FRAME,
-                                     physicsClientId=self.PYB_CLIENT)
+        if self.NUM_DRONES < 2:
+            return
+        DW_RANGE = 10  # Ignore drones more than 10 meters away.
+        # delta[n, m] is the position of drone m relative to drone n.
+        delta = self.pos[np.newaxis, :, :] - self.pos[:, np.newaxis, :]
+        delta_z = delta[:, :, 2]
+        delta_xy = np.linalg.norm(delta[:, :, 0:2], axis=2)
+        pairs = np.logical_and(delta_z > 0, delta_xy < DW_RANGE)
+        if not np.any(pairs):
+            return
+        below, _ = np.nonzero(pairs)
+        delta_z, delta_xy = delta_z[pairs], delta_xy[pairs]
+        alpha = self.DW_COEFF_1 * (self.PROP_RADIUS / (4 * delta_z))**2
+        beta = self.DW_COEFF_2 * delta_z + self.DW_COEFF_3
+        downwash = np.zeros(self.NUM_DRONES)
+        np.add.at(downwash, below, -alpha * np.exp(-.5 * (delta_xy / beta)**2))
+        for n in np.unique(below):
+            p.applyExternalForce(self.DRONE_IDS[n],
+                                 4,
+                                 forceObj=[0, 0, downwash[n]],
+                                 posObj=[0, 0, 0],
+                                 flags=p.LINK_FRAME,
+                                 physicsClientId=self.PYB_CLIENT)
 
-    def _dynamics(self, rpm, nth_drone):
-        """Explicit dynamics implementation.
+    def _dynamics(self, rpm):
+        """Explicit dynamics implementation, for all drones.
 
         Based on code written at the Dynamic Systems Lab by James Xu.
+        Dispatches to `_integrate_dynamics()` for the higher-order schemes in DynIntegrator.
 
         Args:
-            rpm (ndarray): (4)-shaped array of ints containing the RPMs values of the 4 motors.
-            nth_drone (int): The ordinal number/position of the desired drone in list self.DRONE_IDS.
+            rpm (ndarray): (NUM_DRONES, 4)-shaped array of ints containing the RPMs values of the 4 motors of each drone.
 
         """
+        if self.NUMPY_DYN:
+            self._integrate_dynamics(rpm)
+            return
         # Current state.
-        pos = self.pos[nth_drone, :]
-        quat = self.quat[nth_drone, :]
-        rpy = self.rpy[nth_drone, :]
-        vel = self.vel[nth_drone, :]
-        rpy_rates = self.rpy_rates[nth_drone, :]
-        rotation = np.array(p.getMatrixFromQuaternion(quat)).reshape(3, 3)
+        pos = self.pos
+        rpy = self.rpy
+        vel = self.vel
+        rpy_rates = self.rpy_rates
+        rotation = quat_to_rot(self.quat)
         # Compute forces and torques.
-        forces = np.array(rpm**2) * self.KF
-        thrust = np.array([0, 0, np.sum(forces)])
-        thrust_world_frame = np.dot(rotation, thrust)
+        thrust, torques = self._motor_thrusts_and_torques(rpm)
+        thrust_world_frame = rotation[:, :, 2] * thrust[:, None]
         force_world_frame = thrust_world_frame - np.array([0, 0, self.GRAVITY])
-        z_torques = np.array(rpm**2) * self.KM
-        # z_torque = (-z_torques[0] + z_torques[1] - z_torques[2] + z_torques[3])
-        z_torque = (z_torques[0] - z_torques[1] + z_torques[2] - z_torques[3])
-        if self.DRONE_MODEL == DroneModel.CF2X:
-            x_torque = (forces[0] + forces[1] - forces[2]
-                        - forces[3]) * (self.L / np.sqrt(2))
-            y_torque = (-forces[0] + forces[1] + forces[2]
-                        - forces[3]) * (self.L / np.sqrt(2))
-        elif self.DRONE_MODEL == DroneModel.CF2P:
-            x_torque = (forces[1] - forces[3]) * self.L
-            y_torque = (-forces[0] + forces[2]) * self.L
-        torques = np.array([x_torque, y_torque, z_torque])
-        torques = torques - np.cross(rpy_rates, np.dot(self.J, rpy_rates))
-        rpy_rates_deriv = np.dot(self.J_INV, torques)
+        torques = torques - np.cross(rpy_rates, rpy_rates @ self.J.T)
+        rpy_rates_deriv = torques @ self.J_INV.T
         no_pybullet_dyn_accs = force_world_frame / self.MASS
         # Update state.
-        vel = vel + self.TIMESTEP * no_pybullet_dyn_accs
-        rpy_rates = rpy_rates + self.TIMESTEP * rpy_rates_deriv
-        pos = pos + self.TIMESTEP * vel
-        rpy = rpy + self.TIMESTEP * rpy_rates
+        vel = vel + self.PYB_TIMESTEP * no_pybullet_dyn_accs
+        rpy_rates = rpy_rates + self.PYB_TIMESTEP * rpy_rates_deriv
+        pos = pos + self.PYB_TIMESTEP * vel
+        rpy = rpy + self.PYB_TIMESTEP * rpy_rates
         # Set PyBullet's state.
-        p.resetBasePositionAndOrientation(self.DRONE_IDS[nth_drone],
-                                          pos,
-                                          p.getQuaternionFromEuler(rpy),
-                                          physicsClientId=self.PYB_CLIENT)
-        # Note: the base's velocity only stored and not used #
-        p.resetBaseVelocity(
-            self.DRONE_IDS[nth_drone],
-            vel,
-            rpy_rates,  # ang_vel not computed by DYN
-            physicsClientId=self.PYB_CLIENT)
+        for n in range(self.NUM_DRONES):
+            p.resetBasePositionAndOrientation(self.DRONE_IDS[n],
+                                              pos[n] + self.WORLD_OFFSET,
+                                              p.getQuaternionFromEuler(rpy[n]),
+                                              physicsClientId=self.PYB_CLIENT)
+            # Note: the base's velocity only stored and not used #
+            p.resetBaseVelocity(
+                self.DRONE_IDS[n],
+                vel[n],
+                rpy_rates[n],  # ang_vel not computed by DYN
+                physicsClientId=self.PYB_CLIENT)
         # Store the roll, pitch, yaw rates for the next step #
-        self.rpy_rates[nth_drone, :] = rpy_rates
+        self.rpy_rates[:, :] = rpy_rates
+
+    def _motor_thrusts_and_torques(self, rpm):
+        """Collective thrusts and body frame torques produced by the motors, for all drones.
+
+        Args:
+            rpm (ndarray): (NUM_DRONES, 4)-shaped array of ints containing the RPMs values of the 4 motors of each drone.
+
+        Returns:
+            ndarray: (NUM_DRONES,)-shaped array of thrusts along the drones' z-axes.
+            ndarray: (NUM_DRONES, 3)-shaped array of torques in the drones' body frames.
+
+        """
+        forces = np.array(rpm**2) * self.KF
+        z_torques = np.array(rpm**2) * self.KM
+        # z_torque = (-z_torques[:, 0] + z_torques[:, 1] - z_torques[:, 2] + z_torques[:, 3])
+        z_torque = (z_torques[:, 0] - z_torques[:, 1] + z_torques[:, 2] - z_torques[:, 3])
+        if self.DRONE_MODEL == DroneModel.CF2X:
+            x_torque = (forces[:, 0] + forces[:, 1] - forces[:, 2]
+                        - forces[:, 3]) * (self.L / np.sqrt(2))
+            y_torque = (-forces[:, 0] + forces[:, 1] + forces[:, 2]
+                        - forces[:, 3]) * (self.L / np.sqrt(2))
+        elif self.DRONE_MODEL == DroneModel.CF2P:
+            x_torque = (forces[:, 1] - forces[:, 3]) * self.L
+            y_torque = (-forces[:, 0] + forces[:, 2]) * self.L
+        return np.sum(forces, axis=1), np.stack([x_torque, y_torque, z_torque], axis=1)
+
+    def _rigid_body_derivatives(self, vel, quat, body_rates, thrust, torques):
+        """Time derivatives of the drones' rigid body state, under constant thrusts and torques.
+
+        Args:
+            vel (ndarray): (NUM_DRONES, 3)-shaped array of velocities in the world frame.
+            quat (ndarray): (NUM_DRONES, 4)-shaped array of (x, y, z, w) attitude quaternions.
+            body_rates (ndarray): (NUM_DRONES, 3)-shaped array of angular velocities in the body frames.
+            thrust (ndarray): (NUM_DRONES,)-shaped array of thrusts along the drones' z-axes.
+            torques (ndarray): (NUM_DRONES, 3)-shaped array of torques in the body frames.
+
+        Returns:
+            tuple: The derivatives of the position, velocity, quaternion and body rates.
+
+        """
+        # Thrust along the third column of the rotation matrix, see `quat_to_rot()`.
+        x, y, z, w = quat.T
+        scale = 2. * thrust / (self.MASS * np.sum(quat * quat, axis=1))
+        acc = np.stack([(x * z + w * y) * scale,
+                        (y * z - w * x) * scale,
+                        thrust / self.MASS - (x * x + y * y) * scale - self.GRAVITY_ACC], axis=1)
+        quat_deriv = 0.5 * quat_multiply(quat, np.hstack([body_rates, np.zeros((self.NUM_DRONES, 1))]))
+        body_rates_deriv = (torques - np.cross(body_rates, body_rates @ self.J.T)) @ self.J_INV.T
+        return vel, acc, quat_deriv, body_rates_deriv
+
+    def _integrate_dynamics(self, rpm):
+        """Explicit dynamics with the semi-implicit Euler or RK4 scheme and quaternion attitude, for all drones.
+
+        The motors' thrusts and torques are held constant over the PyBullet timestep. The state is read from
+        and written to the stored kinematic information, PyBullet is only updated by `_sync_pybullet_state()`.
+
+        Args:
+            rpm (ndarray): (NUM_DRONES, 4)-shaped array of ints containing the RPMs values of the 4 motors of each drone.
+
+        """
+        dt = self.PYB_TIMESTEP
+        thrust, torques = self._motor_thrusts_and_torques(rpm)
+        # Body rates from the world frame angular velocities.
+        body_rates = np.einsum("nji,nj->ni", quat_to_rot(self.quat), self.ang_v)
+        state = (self.pos, self.vel, self.quat, body_rates)
+        if self.DYN_INTEGRATOR == DynIntegrator.SEMI_IMPLICIT:
+            _, acc, _, body_rates_deriv = self._rigid_body_derivatives(*state[1:], thrust, torques)
+            vel = self.vel + dt * acc
+            body_rates = body_rates + dt * body_rates_deriv
+            pos = self.pos + dt * vel
+            # Exact rotation by the updated body rates over the timestep.
+            half_angle = 0.5 * dt * np.linalg.norm(body_rates, axis=1, keepdims=True)
+            delta_quat = np.hstack([0.5 * dt * np.sinc(half_angle / np.pi) * body_rates, np.cos(half_angle)])
+            quat = quat_multiply(self.quat, delta_quat)
+        elif self.DYN_INTEGRATOR == DynIntegrator.RK4:
+            k1 = self._rigid_body_derivatives(*state[1:], thrust, torques)
+            k2 = self._rigid_body_derivatives(*[x + 0.5 * dt * k for x, k in zip(state, k1)][1:], thrust, torques)
+            k3 = self._rigid_body_derivatives(*[x + 0.5 * dt * k for x, k in zip(state, k2)][1:], thrust, torques)
+            k4 = self._rigid_body_derivatives(*[x + dt * k for x, k in zip(state, k3)][1:], thrust, torques)
+            pos, vel, quat, body_rates = [x + dt / 6 * (a + 2 * b + 2 * c + d) for x, a, b, c, d in zip(state, k1, k2, k3, k4)]
+        quat = quat / np.linalg.norm(quat, axis=1, keepdims=True)
+        # Store the new state.
+        self.pos[:, :] = pos
+        self.quat[:, :] = quat
+        self.rpy[:, :] = quat_to_euler(quat)
+        self.vel[:, :] = vel
+        self.ang_v[:, :] = np.einsum("nij,nj->ni", quat_to_rot(quat), body_rates)
+        self.rpy_rates[:, :] = body_rates
+        self.pyb_state_stale = True
 
     def _show_drone_local_axes(self, nth_drone):
         """Draws the local frame of the n-th drone in PyBullet's GUI.
@@ -582,7 +922,7 @@ class BaseAviary(BenchmarkEnv):
             nth_drone (int): The ordinal number/position of the desired drone in list self.DRONE_IDS.
 
         """
-        if self.GUI:
+        if self.GUI and not self.HEADLESS:
             AXIS_LENGTH = 2 * self.L
             self.X_AX[nth_drone] = p.addUserDebugLine(
                 lineFromXYZ=[0, 0, 0],
@@ -646,6 +986,11 @@ class BaseAviary(BenchmarkEnv):
         PWM2RPM_CONST = float(URDF_TREE[0].attrib['pwm2rpm_const'])
         MIN_PWM = float(URDF_TREE[0].attrib['pwm_min'])
         MAX_PWM = float(URDF_TREE[0].attrib['pwm_max'])
+        # Positions of the propellers (links 0 to 3) in the base frame.
+        PROP_OFFSETS = np.array([
+            [float(s) for s in URDF_TREE.find("link[@name='prop{}_link']/inertial/origin".format(i)).attrib['xyz'].split(' ')]
+            for i in range(4)
+        ])
         return M, L, THRUST2WEIGHT_RATIO, J, J_INV, KF, KM, COLLISION_H, COLLISION_R, COLLISION_Z_OFFSET, MAX_SPEED_KMH, \
                GND_EFF_COEFF, PROP_RADIUS, DRAG_COEFF, DW_COEFF_1, DW_COEFF_2, DW_COEFF_3, \
-               PWM2RPM_SCALE, PWM2RPM_CONST, MIN_PWM, MAX_PWM
+               PWM2RPM_SCALE, PWM2RPM_CONST, MIN_PWM, MAX_PWM, PROP_OFFSETS
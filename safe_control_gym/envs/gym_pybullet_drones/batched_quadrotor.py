@@ -0,0 +1,528 @@
+"""Batched quadrotor environment using vectorized NumPy dynamics.
+
+Steps N independent quadrotors (sharing the configuration of a `Quadrotor` environment)
+without any PyBullet call per drone, keeping their states in a single (N, 12) array.
+
+"""
+import copy
+import numpy as np
+from gymnasium.utils import seeding
+
+from safe_control_gym.envs.benchmark_env import Cost, Task
+from safe_control_gym.envs.env_wrappers.vectorized_env.vec_env import VecEnv
+from safe_control_gym.envs.gym_pybullet_drones.base_aviary import DynIntegrator, Physics
+from safe_control_gym.envs.gym_pybullet_drones.quadrotor import Quadrotor
+from safe_control_gym.envs.gym_pybullet_drones.quadrotor_utils import QuadType
+from safe_control_gym.math_and_models.transformations import euler_to_quat, quat_multiply, quat_to_euler, quat_to_rot
+from safe_control_gym.utils.utils import get_random_state, set_random_state
+
+
+class BatchedQuadrotor(VecEnv):
+    """N quadrotors integrated with the explicit dynamics of `Physics.DYN` (and its `dyn_integrator`) in NumPy.
+
+    The full state of all drones is kept in (N, 12)-shaped arrays and every control step
+    is computed with vectorized operations, which makes it possible to step thousands of
+    environments per process (e.g. for PPO/SAC data collection).
+    Observations, rewards, termination and the info dictionaries (including constraint
+    evaluations) follow those of a `Quadrotor` created with the same arguments and
+    `physics="dyn"`; done environments are automatically reset as in the other VecEnvs.
+
+    Notes:
+        * Gates, obstacles, disturbances and adversaries are not supported.
+        * As with `Physics.DYN`, the initial angular velocity only appears in the reset
+          observation with the legacy Euler integrator, and there are no collisions (e.g. with
+          the ground plane).
+
+    """
+    NAME = "batched_quadrotor"
+
+    def __init__(self,
+                 num_envs: int = 1,
+                 seed=None,
+                 **kwargs
+                 ):
+        """Initialize a batch of quadrotor environments.
+
+        Args:
+            num_envs (int): The number of environments in the batch.
+            seed (int, optional): Seed for the random number generator.
+            kwargs: Any `Quadrotor` argument, shared by all the environments in the batch.
+
+        """
+        physics = Physics(kwargs.pop("physics", Physics.DYN))
+        if physics != Physics.DYN and kwargs.get("verbose", False):
+            print("[WARNING] BatchedQuadrotor only implements Physics.DYN, ignoring physics={}.".format(physics.value))
+        kwargs["info_in_reset"] = True
+        # Single (never stepped) environment used to parse the configuration and build spaces,
+        # goals, constraints and the symbolic model.
+        self.env = Quadrotor(seed=seed, physics=Physics.DYN, **kwargs)
+        self.env.close()
+        if len(self.env.GATES) > 0 or len(self.env.OBSTACLES) > 0:
+            raise ValueError("[ERROR] in BatchedQuadrotor.__init__(), gates and obstacles are not supported.")
+        if len(self.env.disturbances) > 0 or self.env.adversary_disturbance is not None:
+            raise NotImplementedError("[ERROR] in BatchedQuadrotor.__init__(), disturbances are not supported.")
+        if self.env.COST == Cost.COMPETITION:
+            raise NotImplementedError("[ERROR] in BatchedQuadrotor.__init__(), the competition cost is not supported.")
+        super().__init__(num_envs, self.env.observation_space, self.env.action_space)
+        self.QUAD_TYPE = self.env.QUAD_TYPE
+        self.TASK = self.env.TASK
+        self.COST = self.env.COST
+        self.CTRL_STEPS = self.env.CTRL_STEPS
+        self.PYB_STEPS_PER_CTRL = self.env.PYB_STEPS_PER_CTRL
+        self.PYB_TIMESTEP = self.env.PYB_TIMESTEP
+        self.DYN_INTEGRATOR = self.env.DYN_INTEGRATOR
+        self.X_GOAL = self.env.X_GOAL
+        self.U_GOAL = self.env.U_GOAL
+        self.symbolic = self.env.symbolic
+        self.constraints = self.env.constraints
+        self.action_dim = self.env.action_dim
+        self.state_dim = self.env.state_dim
+        self.STATE_IDX = self.env.STATE_IDX
+        self.OUT_OF_BOUND_MASK = self.env.OUT_OF_BOUND_MASK
+        # Drone model constants (as in BaseAviary._dynamics()).
+        self.KF = self.env.KF
+        self.KM = self.env.KM
+        self.L = self.env.L
+        self.GRAVITY_ACC = self.env.GRAVITY_ACC
+        self.np_random = self.env.np_random
+        self.mass = np.full(self.num_envs, self.env.MASS)
+        self.J_diag = np.tile(np.diag(self.env.J), (self.num_envs, 1))
+        # Kinematic information of all drones.
+        self.pos = np.zeros((self.num_envs, 3))
+        self.quat = np.zeros((self.num_envs, 4))
+        self.rpy = np.zeros((self.num_envs, 3))
+        self.vel = np.zeros((self.num_envs, 3))
+        self.ang_v = np.zeros((self.num_envs, 3))
+        self.rpy_rates = np.zeros((self.num_envs, 3))
+        self.state = np.zeros((self.num_envs, self.state_dim))
+        self.ctrl_step_counter = np.zeros(self.num_envs, dtype=int)
+        self.steps_at_goal_pos = np.zeros(self.num_envs, dtype=int)
+        self.task_completed = np.zeros(self.num_envs, dtype=bool)
+        self.current_raw_input_action = np.zeros((self.num_envs, self.action_dim))
+        self.current_preprocessed_action = np.zeros((self.num_envs, self.action_dim))
+        self.actions = None
+        self.initial_reset = False
+
+    def seed(self, seed=None):
+        """Sets up the random number generator shared by the batch.
+
+        """
+        self.np_random, seed = seeding.np_random(seed)
+        self.action_space.seed(seed)
+        return [seed]
+
+    def reset(self):
+        """(Re-)initializes all the environments to start an episode.
+
+        Returns:
+            ndarray: The (N, obs_dim) initial observations.
+            dict: A dictionary with the list of reset info dictionaries under key "n".
+
+        """
+        self.initial_reset = True
+        self._reset_idx(np.arange(self.num_envs))
+        obs = self._get_observation()
+        reset_info = self.env._get_reset_info()
+        infos = [dict(reset_info) for _ in range(self.num_envs)]
+        if self.constraints is not None:
+            c_values, _, _ = self._get_constraint_values(only_state=True)
+            for i, info in enumerate(infos):
+                info["constraint_values"] = c_values[i]
+        return obs, {"n": infos}
+
+    def step_async(self, actions):
+        """Stores the (N, action_dim) actions for the next step_wait().
+
+        """
+        # Copied, the stored actions are reset in place when the environments are.
+        self.actions = np.array(actions, dtype=np.float64).reshape(self.num_envs, self.action_dim)
+
+    def step_wait(self):
+        """Advances all the environments by one control step.
+
+        Returns:
+            ndarray: The (N, obs_dim) observations (after auto-reset for done environments).
+            ndarray: The (N,) rewards.
+            ndarray: The (N,) done flags.
+            dict: A dictionary with the list of step info dictionaries under key "n".
+
+        """
+        if not self.initial_reset:
+            raise RuntimeError("[ERROR] You must call env.reset() at least once before using env.step().")
+        rpm = self._preprocess_control(self.actions)
+        for _ in range(self.PYB_STEPS_PER_CTRL):
+            self._dynamics(rpm)
+        obs = self._get_observation()
+        at_goal_pos = self._update_goal_progress()
+        done, goal_reached = self._get_done()
+        rew = self._get_reward()
+        mse = self._get_mse()
+        # Counters (as in BenchmarkEnv.after_step()).
+        self.ctrl_step_counter += 1
+        c_values = None
+        if self.constraints is not None:
+            c_values, violated, almost_active = self._get_constraint_values()
+            if self.env.DONE_ON_VIOLATION:
+                done = done | violated
+            if self.COST == Cost.RL_REWARD and self.env.use_constraint_penalty:
+                rew = rew + self.env.constraint_penalty * almost_active
+        time_limit = self.ctrl_step_counter >= self.CTRL_STEPS
+        truncated = time_limit & ~done
+        done = done | time_limit
+        # Info dictionaries.
+        infos = []
+        for i in range(self.num_envs):
+            info = {}
+            if goal_reached is not None:
+                info["goal_reached"] = bool(goal_reached[i])
+            info["mse"] = mse[i]
+            info["collision"] = (None, False)
+            info["current_target_gate_id"] = -1
+            info["current_target_gate_in_range"] = False
+            info["current_target_gate_pos"] = []
+            info["current_target_gate_type"] = -1
+            info["at_goal_position"] = bool(at_goal_pos[i])
+            info["task_completed"] = bool(self.task_completed[i])
+            if c_values is not None:
+                info["constraint_values"] = c_values[i]
+                info["constraint_violation"] = int(violated[i])
+            if time_limit[i]:
+                info["TimeLimit.truncated"] = bool(truncated[i])
+            infos.append(info)
+        # Auto-reset the done environments.
+        done_idx = np.flatnonzero(done)
+        if done_idx.size > 0:
+            for i in done_idx:
+                infos[i] = dict(infos[i], terminal_observation=obs[i].copy(), terminal_info=copy.copy(infos[i]))
+            self._reset_idx(done_idx)
+            obs[done_idx] = self._get_observation()[done_idx]
+        return obs, rew, done, {"n": infos}
+
+    def close(self):
+        """Terminates the environments.
+
+        """
+        self.closed = True
+
+    def get_images(self):
+        """Rendering is not available without PyBullet.
+
+        """
+        raise NotImplementedError("[ERROR] BatchedQuadrotor does not support rendering.")
+
+    def get_env_random_state(self):
+        """Snapshots the (process-wide) random state.
+
+        """
+        return [get_random_state()]
+
+    def set_env_random_state(self, worker_random_states):
+        """Restores the (process-wide) random state.
+
+        """
+        set_random_state(worker_random_states[0])
+
+    def get_attr(self, attr_name, indices=None):
+        """Return attribute from vectorized environment (see base class).
+
+        """
+        value = getattr(self, attr_name)
+        indices = list(self._get_indices(indices))
+        if isinstance(value, np.ndarray) and value.shape[:1] == (self.num_envs,):
+            return [value[i] for i in indices]
+        return [value for _ in indices]
+
+    def set_attr(self, attr_name, values, indices=None):
+        """Set attribute inside vectorized environment (see base class).
+
+        """
+        value = getattr(self, attr_name)
+        indices = list(self._get_indices(indices))
+        if not (isinstance(value, np.ndarray) and value.shape[:1] == (self.num_envs,)):
+            raise NotImplementedError("[ERROR] BatchedQuadrotor.set_attr() only supports per-environment arrays.")
+        value[indices] = values
+
+    def env_method(self,
+                   method_name,
+                   method_args=None,
+                   method_kwargs=None,
+                   indices=None):
+        """Per-environment methods are not available on the batched environment.
+
+        """
+        raise NotImplementedError("[ERROR] BatchedQuadrotor does not support env_method().")
+
+    def _reset_idx(self, idx):
+        """Resets the environments with indices `idx` (as in Quadrotor.reset()).
+
+        Args:
+            idx (ndarray): The indices of the environments to reset.
+
+        """
+        n = len(idx)
+        # Choose randomized or deterministic inertial properties.
+        self.mass[idx] = self.env.MASS
+        self.J_diag[idx] = np.diag(self.env.J)
+        if self.env.RANDOMIZED_INERTIAL_PROP:
+            for k, key in enumerate(["Ixx", "Iyy", "Izz"]):
+                if key in self.env.INERTIAL_PROP_RAND_INFO:
+                    self.J_diag[idx, k] += self._sample(self.env.INERTIAL_PROP_RAND_INFO[key], n)
+            if "M" in self.env.INERTIAL_PROP_RAND_INFO:
+                self.mass[idx] += self._sample(self.env.INERTIAL_PROP_RAND_INFO["M"], n)
+            if np.any(self.mass[idx] < 0) or np.any(self.J_diag[idx] < 0):
+                raise ValueError("[ERROR] in BatchedQuadrotor.reset(), negative randomized inertial properties.")
+        # Randomize initial state.
+        init_values = {}
+        for init_name in self.env.INIT_STATE_LABELS[self.QUAD_TYPE]:
+            init_values[init_name] = np.full(n, self.env.__dict__[init_name.upper()], dtype=np.float64)
+            if self.env.RANDOMIZED_INIT and init_name in self.env.INIT_STATE_RAND_INFO:
+                init_values[init_name] += self._sample(self.env.INIT_STATE_RAND_INFO[init_name], n)
+        zeros = np.zeros(n)
+        self.pos[idx] = np.stack([init_values.get("init_" + k, zeros) for k in ["x", "y", "z"]], axis=-1)
+        self.vel[idx] = np.stack([init_values.get("init_" + k + "_dot", zeros) for k in ["x", "y", "z"]], axis=-1)
+        init_rpy = np.stack([init_values.get("init_" + k, zeros) for k in ["phi", "theta", "psi"]], axis=-1)
+        if self.QUAD_TYPE == QuadType.TWO_D:
+            self.ang_v[idx] = np.stack([zeros, init_values.get("init_theta_dot", zeros), zeros], axis=-1)
+        else:
+            self.ang_v[idx] = np.stack([init_values.get("init_" + k, zeros) for k in ["p", "q", "r"]], axis=-1)
+        self.quat[idx] = euler_to_quat(init_rpy)
+        self.rpy[idx] = quat_to_euler(self.quat[idx])
+        self.rpy_rates[idx] = 0.
+        self.ctrl_step_counter[idx] = 0
+        self.steps_at_goal_pos[idx] = 0
+        self.task_completed[idx] = False
+        self.current_raw_input_action[idx] = 0.
+        self.current_preprocessed_action[idx] = 0.
+
+    def _sample(self, rand_info, n):
+        """Draws `n` samples from a randomization info entry (e.g. {"distrib": "uniform", "low": 0, "high": 1}).
+
+        """
+        rand_info = dict(rand_info)
+        distrib = getattr(self.np_random, rand_info.pop("distrib"))
+        d_args = rand_info.pop("args", [])
+        return distrib(*d_args, size=n, **rand_info)
+
+    def _preprocess_control(self, action):
+        """Converts the (N, action_dim) actions into (N, 4) motors' RPMs (as in Quadrotor._preprocess_control()).
+
+        """
+        self.current_raw_input_action = action
+        if self.env.NORMALIZED_RL_ACTION_SPACE:
+            action = np.clip(action, self.action_space.low, self.action_space.high)
+            thrust = (1 + self.env.norm_act_scale * action) * self.env.hover_thrust
+        else:
+            thrust = np.clip(action, self.action_space.low, self.action_space.high)
+        self.current_preprocessed_action = thrust
+        # Vectorized cmd2pwm() and pwm2rpm().
+        n_motor = 4 // self.action_dim
+        thrust = np.clip(thrust, 0., None)
+        motor_pwm = (np.sqrt(thrust / n_motor / self.KF) - self.env.PWM2RPM_CONST) / self.env.PWM2RPM_SCALE
+        if self.action_dim == 1:
+            motor_pwm = np.repeat(motor_pwm, 4, axis=1)
+        elif self.action_dim == 2:
+            motor_pwm = np.concatenate([motor_pwm, motor_pwm[:, ::-1]], axis=1)
+        motor_pwm = np.clip(motor_pwm, self.env.MIN_PWM, self.env.MAX_PWM)
+        return self.env.PWM2RPM_SCALE * motor_pwm + self.env.PWM2RPM_CONST
+
+    def _dynamics(self, rpm):
+        """Vectorized explicit dynamics, one PyBullet timestep (as in BaseAviary._dynamics()).
+
+        Dispatches to `_integrate_dynamics()` for the higher-order schemes in DynIntegrator.
+
+        Args:
+            rpm (ndarray): (N, 4)-shaped array containing the RPMs of the motors of each drone.
+
+        """
+        # Compute forces and torques.
+        forces = rpm**2 * self.KF
+        thrust = np.sum(forces, axis=1)
+        z_torques = rpm**2 * self.KM
+        z_torque = z_torques[:, 0] - z_torques[:, 1] + z_torques[:, 2] - z_torques[:, 3]
+        x_torque = (forces[:, 0] + forces[:, 1] - forces[:, 2] - forces[:, 3]) * (self.L / np.sqrt(2))
+        y_torque = (-forces[:, 0] + forces[:, 1] + forces[:, 2] - forces[:, 3]) * (self.L / np.sqrt(2))
+        torques = np.stack([x_torque, y_torque, z_torque], axis=-1)
+        if self.DYN_INTEGRATOR != DynIntegrator.EULER:
+            self._integrate_dynamics(thrust, torques)
+            return
+        rotation = quat_to_rot(self.quat)
+        acc = rotation[:, :, 2] * (thrust / self.mass)[:, None]
+        acc[:, 2] -= self.GRAVITY_ACC
+        torques = torques - np.cross(self.rpy_rates, self.J_diag * self.rpy_rates)
+        rpy_rates_deriv = torques / self.J_diag
+        # Update state.
+        self.vel = self.vel + self.PYB_TIMESTEP * acc
+        self.rpy_rates = self.rpy_rates + self.PYB_TIMESTEP * rpy_rates_deriv
+        self.pos = self.pos + self.PYB_TIMESTEP * self.vel
+        # Orientation stored as a quaternion, Euler angles read back from it (as PyBullet does).
+        self.quat = euler_to_quat(self.rpy + self.PYB_TIMESTEP * self.rpy_rates)
+        self.rpy = quat_to_euler(self.quat)
+        self.ang_v = self.rpy_rates.copy()
+
+    def _rigid_body_derivatives(self, vel, quat, body_rates, thrust, torques):
+        """Time derivatives of the drones' rigid body state (as in BaseAviary._rigid_body_derivatives()).
+
+        """
+        # Thrust along the third column of the rotation matrix, see `quat_to_rot()`.
+        x, y, z, w = quat.T
+        scale = 2. * thrust / (self.mass * np.sum(quat * quat, axis=1))
+        acc = np.stack([(x * z + w * y) * scale,
+                        (y * z - w * x) * scale,
+                        thrust / self.mass - (x * x + y * y) * scale - self.GRAVITY_ACC], axis=1)
+        quat_deriv = 0.5 * quat_multiply(quat, np.hstack([body_rates, np.zeros((self.num_envs, 1))]))
+        body_rates_deriv = (torques - np.cross(body_rates, self.J_diag * body_rates)) / self.J_diag
+        return vel, acc, quat_deriv, body_rates_deriv
+
+    def _integrate_dynamics(self, thrust, torques):
+        """Semi-implicit Euler or RK4 dynamics with quaternion attitude (as in BaseAviary._integrate_dynamics()).
+
+        Args:
+            thrust (ndarray): (N,)-shaped array of thrusts along the drones' z-axes.
+            torques (ndarray): (N, 3)-shaped array of torques in the body frames.
+
+        """
+        dt = self.PYB_TIMESTEP
+        # Body rates from the world frame angular velocities.
+        body_rates = np.einsum("nji,nj->ni", quat_to_rot(self.quat), self.ang_v)
+        state = (self.pos, self.vel, self.quat, body_rates)
+        if self.DYN_INTEGRATOR == DynIntegrator.SEMI_IMPLICIT:
+            _, acc, _, body_rates_deriv = self._rigid_body_derivatives(*state[1:], thrust, torques)
+            vel = self.vel + dt * acc
+            body_rates = body_rates + dt * body_rates_deriv
+            pos = self.pos + dt * vel
+            # Exact rotation by the updated body rates over the timestep.
+            half_angle = 0.5 * dt * np.linalg.norm(body_rates, axis=1, keepdims=True)
+            delta_quat = np.hstack([0.5 * dt * np.sinc(half_angle / np.pi) * body_rates, np.cos(half_angle)])
+            quat = quat_multiply(self.quat, delta_quat)
+        else:
+            k1 = self._rigid_body_derivatives(*state[1:], thrust, torques)
+            k2 = self._rigid_body_derivatives(*[x + 0.5 * dt * k for x, k in zip(state, k1)][1:], thrust, torques)
+            k3 = self._rigid_body_derivatives(*[x + 0.5 * dt * k for x, k in zip(state, k2)][1:], thrust, torques)
+            k4 = self._rigid_body_derivatives(*[x + dt * k for x, k in zip(state, k3)][1:], thrust, torques)
+            pos, vel, quat, body_rates = [x + dt / 6 * (a + 2 * b + 2 * c + d) for x, a, b, c, d in zip(state, k1, k2, k3, k4)]
+        self.pos = pos
+        self.vel = vel
+        self.quat = quat / np.linalg.norm(quat, axis=1, keepdims=True)
+        self.rpy = quat_to_euler(self.quat)
+        self.ang_v = np.einsum("nij,nj->ni", quat_to_rot(self.quat), body_rates)
+        self.rpy_rates = body_rates
+
+    def _get_observation(self):
+        """Returns the current (N, obs_dim) observations (as in Quadrotor._get_observation()).
+
+        """
+        rotation = quat_to_rot(self.quat)
+        ang_v_body_frame = np.einsum("nji,nj->ni", rotation, self.ang_v)
+        full_state = np.concatenate([self.pos[:, 0:1], self.vel[:, 0:1],
+                                     self.pos[:, 1:2], self.vel[:, 1:2],
+                                     self.pos[:, 2:3], self.vel[:, 2:3],
+                                     self.rpy, ang_v_body_frame], axis=1)
+        if self.QUAD_TYPE == QuadType.TWO_D:
+            # 2D quadrotor uses the world frame pitch rate.
+            full_state[:, 10] = self.ang_v[:, 1]
+        self.state = full_state[:, self.STATE_IDX]
+        return self._extend_obs(self.state.copy(), self.ctrl_step_counter + 1)
+
+    def _extend_obs(self, obs, next_step):
+        """Concatenates goal info (reference state(s)) for RL (as in BenchmarkEnv.extend_obs()).
+
+        """
+        horizon = self.env.obs_goal_horizon
+        if self.COST == Cost.RL_REWARD and self.TASK == Task.TRAJ_TRACKING and horizon > 0:
+            wp_idx = np.minimum(next_step[:, None] + np.arange(horizon)[None, :], self.X_GOAL.shape[0] - 1)
+            goal_state = self.X_GOAL[wp_idx].reshape(self.num_envs, -1)
+            obs = np.concatenate([obs, goal_state], axis=1)
+        elif self.COST == Cost.RL_REWARD and self.TASK == Task.STABILIZATION and horizon > 0:
+            goal_state = np.tile(self.X_GOAL.flatten(), (self.num_envs, 1))
+            obs = np.concatenate([obs, goal_state], axis=1)
+        return obs
+
+    def _get_goal(self):
+        """Returns the (N, state_dim) goal states for the current step.
+
+        """
+        if self.TASK == Task.STABILIZATION:
+            return np.broadcast_to(self.X_GOAL, self.state.shape)
+        wp_idx = np.minimum(self.ctrl_step_counter, self.X_GOAL.shape[0] - 1)
+        return self.X_GOAL[wp_idx]
+
+    def _get_reward(self):
+        """Computes the current step's (N,) rewards (as in Quadrotor._get_reward()).
+
+        """
+        if self.COST == Cost.RL_REWARD:
+            state_error = self.state - self._get_goal()
+            act_error = self.current_preprocessed_action - self.U_GOAL
+            dist = np.sum(self.env.rew_state_weight * state_error * state_error, axis=1)
+            dist += np.sum(self.env.rew_act_weight * act_error * act_error, axis=1)
+            rew = -dist
+            if self.env.rew_exponential:
+                rew = np.exp(rew)
+            return rew
+        # Cost.QUADRATIC.
+        return -self.env.quadratic_cost(self.state, self.current_preprocessed_action, self._get_goal(), self.U_GOAL)
+
+    def _get_done(self):
+        """Computes the (N,) termination flags (as in Quadrotor._get_done()).
+
+        Returns:
+            ndarray: Whether each episode is over.
+            ndarray: Whether the goal is reached (None unless stabilization with quadratic cost).
+
+        """
+        done = np.zeros(self.num_envs, dtype=bool)
+        goal_reached = None
+        if self.TASK == Task.STABILIZATION and self.COST == Cost.QUADRATIC:
+            goal_reached = np.linalg.norm(self.state - self.X_GOAL, axis=1) < self.env.TASK_INFO["stabilization_goal_tolerance"]
+            done |= goal_reached
+        if self.env.done_on_out_of_bound:
+            out_of_bound = np.logical_or(self.state < self.env.state_space.low,
+                                         self.state > self.env.state_space.high)
+            done |= np.any(out_of_bound[:, self.OUT_OF_BOUND_MASK], axis=1)
+        if self.env.DONE_ON_COMPLETION:
+            done |= self.task_completed
+        return done, goal_reached
+
+    def _update_goal_progress(self):
+        """Updates the final goal position bookkeeping of the 3D quadrotor (as in Quadrotor._get_info()).
+
+        Returns:
+            ndarray: The (N,) flags of the drones being at the goal position.
+
+        """
+        at_goal_pos = np.zeros(self.num_envs, dtype=bool)
+        if self.QUAD_TYPE == QuadType.THREE_D and self.TASK == Task.STABILIZATION:
+            xyz_idx = [0, 2, 4]
+            dist = np.linalg.norm(self.state[:, xyz_idx] - self.X_GOAL[xyz_idx], axis=1)
+            at_goal_pos = dist < self.env.TASK_INFO["stabilization_goal_tolerance"]
+            self.steps_at_goal_pos = np.where(at_goal_pos, self.steps_at_goal_pos + 1, 0)
+            self.task_completed |= self.steps_at_goal_pos > self.env.CTRL_FREQ * 2
+        return at_goal_pos
+
+    def _get_mse(self):
+        """Computes the (N,) weighted squared state errors reported as "mse" in the info.
+
+        """
+        state_error = (self.state - self._get_goal()) * self.env.info_mse_metric_state_weight
+        return np.sum(state_error ** 2, axis=1)
+
+    def _get_constraint_values(self, only_state=False):
+        """Evaluates the constraints of all environments, with `ConstraintList.get_values_batch()`.
+
+        Args:
+            only_state (bool): Whether to only evaluate the state constraints (e.g. at reset).
+
+        Returns:
+            ndarray: The (N, num_constraints) constraint values.
+            ndarray: The (N,) flags of any constraint being violated, None if only_state.
+            ndarray: The (N,) flags of any constraint being almost active, None if only_state.
+
+        """
+        if only_state:
+            return self.constraints.get_values_batch(self.state, only_state=True), None, None
+        values = self.constraints.get_values_batch(self.state, self.current_raw_input_action)
+        strict_rows = self.constraints.strict_rows
+        violated = np.any(np.where(strict_rows, values >= 0., values > 0.), axis=1)
+        # Rows without tolerance are NaN, hence never almost active.
+        almost_active = np.any(values + self.constraints.tolerance_rows > 0., axis=1)
+        return values, violated, almost_active
@@ -0,0 +1,120 @@
+"""Vectorized environment hosting many quadrotor worlds in a single PyBullet client.
+
+Each environment is a regular `Quadrotor` whose world (drones, ground plane, gates and obstacles) sits at
+its own spatial offset in a PyBullet client shared by all the environments, with collision filtering
+between worlds.
+A control step applies the forces of every world and calls `stepSimulation` once per physics step,
+instead of once per physics step and environment.
+
+"""
+import copy
+import numpy as np
+import pybullet as p
+
+from safe_control_gym.envs.env_wrappers.vectorized_env.dummy_vec_env import DummyVecEnv
+from safe_control_gym.envs.env_wrappers.vectorized_env.vec_env_utils import _flatten_obs
+from safe_control_gym.envs.gym_pybullet_drones.base_aviary import Physics
+
+# Number of distinct collision groups (bits of PyBullet's 32-bit collision masks).
+NUM_COLLISION_GROUPS = 32
+# Distance between the blocks of NUM_COLLISION_GROUPS worlds, worlds sharing a collision group are
+# further apart than the size of their ground planes (200 m).
+BLOCK_SPACING = 300.0
+
+
+class LockstepVecEnv(DummyVecEnv):
+    """Steps K independent quadrotor environments in lockstep in one PyBullet client.
+
+    The worlds are laid out in blocks of NUM_COLLISION_GROUPS, on a square grid (`world_spacing` apart),
+    and each world's bodies only collide with the bodies of the same world.
+    The environments' states, observations and rewards are relative to their world's origin, so they
+    are the same as those of separate environments.
+
+    Notes:
+        * All environments must share the same physics and physics/control frequencies.
+        * The worlds are persistent (`fast_reset`), and state snapshots are not supported.
+
+    """
+
+    def __init__(self,
+                 env_func,
+                 env_configs=None,
+                 num_envs=1,
+                 seed=None,
+                 gui=False,
+                 world_spacing=10.0
+                 ):
+        """Creates the shared PyBullet client and the environments.
+
+        Args:
+            env_func (function): partial function that can accept args.
+            env_configs (list, optional): non-shareable args for each env.
+            num_envs (int, optional): number of environments (worlds).
+            seed (int, optional): base seed for the run.
+            gui (bool, optional): whether the shared client uses PyBullet's GUI.
+            world_spacing (float, optional): distance between the origins of neighboring worlds.
+
+        """
+        # Avoids circular imports with the vectorized envs package.
+        from safe_control_gym.envs.env_wrappers.vectorized_env import make_env_fn
+        if env_configs is None:
+            env_configs = [{}] * num_envs
+        self.pyb_client = p.connect(p.GUI if gui else p.DIRECT)
+        grid_size = int(np.ceil(np.sqrt(min(num_envs, NUM_COLLISION_GROUPS))))
+        env_fns = []
+        for i in range(num_envs):
+            block, index = divmod(i, NUM_COLLISION_GROUPS)
+            shared_world = {
+                "pyb_client": self.pyb_client,
+                "offset": [BLOCK_SPACING * block + world_spacing * (index % grid_size), world_spacing * (index // grid_size), 0],
+                # Signed 32-bit masks.
+                "collision_group": 1 << index if index < 31 else -(1 << 31)
+            }
+            env_fns.append(make_env_fn(env_func, dict(env_configs[i], shared_world=shared_world), seed, i))
+        super().__init__(env_fns)
+        env = self.envs[0]
+        for other_env in self.envs:
+            if not hasattr(other_env, "_step_inputs"):
+                raise ValueError("[ERROR] in LockstepVecEnv.__init__(), the environments must be quadrotors.")
+            if (other_env.PHYSICS, other_env.PYB_STEPS_PER_CTRL, other_env.PYB_TIMESTEP) != \
+                    (env.PHYSICS, env.PYB_STEPS_PER_CTRL, env.PYB_TIMESTEP):
+                raise ValueError("[ERROR] in LockstepVecEnv.__init__(), the environments must share their physics and frequencies.")
+        self.PHYSICS = env.PHYSICS
+        self.PYB_STEPS_PER_CTRL = env.PYB_STEPS_PER_CTRL
+
+    def step_wait(self):
+        """Advances all the worlds by one control step, with one `stepSimulation` per physics step.
+
+        """
+        inputs = []
+        for env, action in zip(self.envs, self.actions):
+            rpm, disturb_force = env._step_inputs(action)
+            inputs.append((np.reshape(rpm, (env.NUM_DRONES, 4)), disturb_force))
+        for _ in range(self.PYB_STEPS_PER_CTRL):
+            for env, (rpm, disturb_force) in zip(self.envs, inputs):
+                env._apply_physics_step(rpm, disturb_force)
+            # PyBullet computes the new state, unless Physics.DYN.
+            if self.PHYSICS != Physics.DYN:
+                p.stepSimulation(physicsClientId=self.pyb_client)
+        results = []
+        for env in self.envs:
+            env._finish_physics_steps()
+            obs, rew, done, info = env._step_outputs()
+            if done:
+                end_obs = copy.deepcopy(obs)
+                end_info = copy.deepcopy(info)
+                obs, info = env.reset()
+                info["terminal_observation"] = end_obs
+                info["terminal_info"] = end_info
+            results.append([obs, rew, done, info])
+        obs, rews, dones, infos = zip(*results)
+        return _flatten_obs(obs), np.array(rews), np.array(dones), {"n": infos}
+
+    def close(self):
+        """Closes the environments and disconnects the shared client.
+
+        """
+        if self.closed:
+            return
+        super().close()
+        p.disconnect(physicsClientId=self.pyb_client)
@@ -15,17 +15,26 @@ import pybullet as p
 from safe_control_gym.envs.benchmark_env import Cost, Task
 from safe_control_gym.envs.constraints import GENERAL_CONSTRAINTS
 from safe_control_gym.math_and_models.symbolic_systems import SymbolicModel
-from safe_control_gym.envs.gym_pybullet_drones.base_aviary import BaseAviary
-from safe_control_gym.envs.gym_pybullet_drones.quadrotor_utils import QuadType, cmd2pwm, pwm2rpm
+from safe_control_gym.envs.gym_pybullet_drones.base_aviary import BaseAviary, Physics
+from safe_control_gym.envs.gym_pybullet_drones.quadrotor_utils import QuadType, RandomizationSchedule, cmd2pwm, pwm2rpm
 from safe_control_gym.math_and_models.normalization import normalize_angle
 from safe_control_gym.math_and_models.transformations import projection_matrix, transform_trajectory, csRotXYZ
 
+# Symbolic models already built, by quad type, physical parameters, timestep and integration (see `Quadrotor._setup_symbolic()`).
+_SYMBOLIC_MODELS = {}
+
 class Quadrotor(BaseAviary):
     """1D and 2D quadrotor environment task.
 
     Including symbolic model, constraints, randomization, adversarial disturbances,
     multiple cost functions, stabilization and trajectory tracking references.
 
+    With `num_drones` > 1, all drones share the task and the maze: the action and observation spaces,
+    the actions, observations and rewards gain a leading (num_drones,) dimension, and the gates progress,
+    collisions and goal are tracked per drone. The constraints are evaluated per drone (the info's
+    "constraint_values" are (num_drones, num_constraints)-shaped), and a violation by any drone is a
+    violation of the env.
+
     """
     NAME = "quadrotor"
     AVAILABLE_CONSTRAINTS = deepcopy(GENERAL_CONSTRAINTS)
@@ -145,6 +154,31 @@ class Quadrotor(BaseAviary):
         "proj_normal": [0, 1, 1],
     }
 
+    # Keys of the info dictionary returned by .step() that can be selected with `info_keys`.
+    GATE_VISIBILITY_INFO_KEYS = [
+        "current_target_gate_id", "current_target_gate_in_range", "current_target_gate_pos", "current_target_gate_type"
+    ]
+    STEP_INFO_KEYS = ["goal_reached", "mse", "collision"] + GATE_VISIBILITY_INFO_KEYS + ["at_goal_position", "task_completed"]
+    # Keys added by BenchmarkEnv.after_step(), always included.
+    CONSTRAINT_INFO_KEYS = ["constraint_values", "constraint_violation", "TimeLimit.truncated"]
+
+    # IROS 2022 - Per-step info phases, timed separately from `_get_info()`.
+    STEP_TIMED_PHASES = BaseAviary.STEP_TIMED_PHASES + [
+        "_update_collision_info", "_update_gate_progress", "_update_gate_visibility_info"
+    ]
+
+    # Python-side attributes that evolve during an episode, saved/restored by the state snapshots.
+    SNAPSHOT_ATTRIBUTES = [
+        # Step counters and actions.
+        "pyb_step_counter", "ctrl_step_counter", "current_raw_input_action", "current_preprocessed_action",
+        "last_clipped_action", "adv_action", "pyb_state_stale",
+        # Kinematics.
+        "pos", "quat", "rpy", "vel", "ang_v", "rpy_rates", "state", "prev_drone_pos",
+        # IROS 2022 - Gates progress and constraints.
+        "current_gate", "stepped_through_gate", "currently_collided", "at_goal_pos", "steps_at_goal_pos",
+        "task_completed", "goal_reached", "cnstr_violation"
+    ]
+
     def __init__(self,
                  init_state=None,
                  inertial_prop=None,
@@ -157,6 +191,12 @@ class Quadrotor(BaseAviary):
                  rew_exponential=True,
                  done_on_out_of_bound=True,
                  info_mse_metric_state_weight=None,
+                 inplace_step=False,
+                 info_keys=None,
+                 randomization_seed=None,
+                 randomization_block_size=100,
+                 integration_algo='cvodes',
+                 integration_substeps=4,
                  **kwargs
                  ):
         """Initialize a quadrotor environment.
@@ -172,6 +212,17 @@ class Quadrotor(BaseAviary):
             rew_exponential (bool): if to exponentiate negative quadratic cost to positive, bounded [0,1] reward.
             done_on_out_of_bound (bool): if to termiante when state is out of bound.
             info_mse_metric_state_weight (list/ndarray): quadratic weights for state in mse calculation for info dict.
+            inplace_step (bool): if to write the state, observation and intermediate results of .step() into preallocated
+                buffers, the returned observation is then overwritten by the next step (copy it to keep it).
+            info_keys (list, optional): the keys of .step()'s info dictionary to compute (see `STEP_INFO_KEYS`), all if None;
+                the constraints and time limit keys are always added, and the gates progress is always tracked.
+            randomization_seed (int, optional): if given, the gates, obstacles, inertial properties and initial state
+                randomization of each episode is pre-drawn from this seed and the episode's index (see `RandomizationSchedule`),
+                instead of from the env's random number generator.
+            randomization_block_size (int): the number of episodes pre-drawn at once with `randomization_seed`.
+            integration_algo (str): the discretization of the symbolic model, 'rk4', 'rk4_multi' or a CasADi integrator
+                (e.g. 'cvodes'), see `SymbolicModel`.
+            integration_substeps (int): the number of RK4 steps per control step with integration_algo 'rk4_multi'.
 
         """
         # Select the 1D (moving along z) or 2D (moving in the xz plane) quadrotor.
@@ -182,6 +233,17 @@ class Quadrotor(BaseAviary):
         self.rew_act_weight = np.array(rew_act_weight, ndmin=1, dtype=float)
         self.rew_exponential = rew_exponential
         self.done_on_out_of_bound = done_on_out_of_bound
+        self.INPLACE_STEP = inplace_step
+        self.INTEGRATION_ALGO = integration_algo
+        self.INTEGRATION_SUBSTEPS = integration_substeps
+        if info_keys is None:
+            info_keys = self.STEP_INFO_KEYS
+        unknown_info_keys = set(info_keys) - set(self.STEP_INFO_KEYS + self.CONSTRAINT_INFO_KEYS)
+        if unknown_info_keys:
+            raise ValueError("[ERROR] in Quadrotor.__init__(), unknown info keys {}.".format(sorted(unknown_info_keys)))
+        self.INFO_KEYS = set(info_keys)
+        self.FILTER_INFO = not self.INFO_KEYS.issuperset(self.STEP_INFO_KEYS)
+        self.INFO_GATE_VISIBILITY = any(key in self.INFO_KEYS for key in self.GATE_VISIBILITY_INFO_KEYS)
         if info_mse_metric_state_weight is None:
             if self.QUAD_TYPE == QuadType.ONE_D:
                 self.info_mse_metric_state_weight = np.array([1,0], ndmin=1, dtype=float)
@@ -202,6 +264,8 @@ class Quadrotor(BaseAviary):
         # BaseAviary constructor, called after defining the custom args, 
         # since some BenchmarkEnv init setup can be task(custom args)-dependent. 
         super().__init__(init_state=init_state, inertial_prop=inertial_prop, **kwargs)
+        if self.NUM_DRONES > 1 and self.INPLACE_STEP:
+            raise ValueError("[ERROR] in Quadrotor.__init__(), inplace_step is only supported with a single drone.")
 
         # Store initial state info.
         self.INIT_STATE_LABELS = {
@@ -214,14 +278,7 @@ class Quadrotor(BaseAviary):
             for init_name in self.INIT_STATE_RAND_INFO: # Default zero state.
                 self.__dict__[init_name.upper()] = 0.
         else:
-            if isinstance(init_state, np.ndarray):  # Full state as numpy array .
-                for i, init_name in enumerate(self.INIT_STATE_LABELS[self.QUAD_TYPE]):
-                    self.__dict__[init_name.upper()] = init_state[i]
-            elif isinstance(init_state, dict):  # Partial state as dictionary.
-                for init_name in self.INIT_STATE_LABELS[self.QUAD_TYPE]:
-                    self.__dict__[init_name.upper()] = init_state.get(init_name, 0.)
-            else:
-                raise ValueError("[ERROR] in Quadrotor.__init__(), init_state incorrect format.")
+            self._set_init_state(init_state)
 
         # Remove randomization info of initial state components inconsistent with quad type.
         for init_name in list(self.INIT_STATE_RAND_INFO.keys()):
@@ -331,6 +388,10 @@ class Quadrotor(BaseAviary):
         # IROS 2022 - Load maze.
         self.OBSTACLES = []
         self.GATES = []
+        self.OBSTACLES_IDS = []
+        self.GATES_IDS = []
+        self.MAZE_LAYOUT = None
+        self.episode_counter = 0  # Ties state snapshots to the episode they were taken in.
         if 'obstacles' in kwargs:
             self.OBSTACLES = kwargs['obstacles']
         if 'gates' in kwargs:
@@ -342,6 +403,18 @@ class Quadrotor(BaseAviary):
             self.GATES_AND_OBS_RAND_INFO = kwargs['gates_and_obstacles_randomization_info']
         else:
             self.RANDOMIZED_GATES_AND_OBS = False
+        if randomization_seed is not None:
+            self.RANDOMIZATION_SCHEDULE = RandomizationSchedule(self._sample_episode_randomization,
+                                                                randomization_seed, randomization_block_size)
+        else:
+            self.RANDOMIZATION_SCHEDULE = None
+        #
+        # Skipping the contact query when the drone is away from all bodies only pays off when
+        # PyBullet queries are expensive (e.g. with the GUI or a shared memory connection).
+        if 'collision_broadphase' in kwargs:
+            self.COLLISION_BROADPHASE = kwargs['collision_broadphase']
+        else:
+            self.COLLISION_BROADPHASE = False
         #
         if 'done_on_collision' in kwargs:
             self.DONE_ON_COLLISION = kwargs['done_on_collision']
@@ -352,58 +425,75 @@ class Quadrotor(BaseAviary):
             self.DONE_ON_COMPLETION = kwargs['done_on_completion']
         else:
             self.DONE_ON_COMPLETION = False
-
-    def reset(self):
+        # Contact queries are skipped if neither the info, the reward, nor the termination use collisions.
+        self.CHECK_COLLISIONS = "collision" in self.INFO_KEYS or self.COST == Cost.COMPETITION or self.DONE_ON_COLLISION
+
+        # Masks of the state dimensions checked for out-of-bound termination (i.e. excluding velocities).
+        self.OUT_OF_BOUND_MASK = {
+            QuadType.ONE_D: np.array([1, 0]),
+            QuadType.TWO_D: np.array([1, 0, 1, 0, 1, 0]),
+            QuadType.THREE_D: np.array([1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 0, 0])
+        }[self.QUAD_TYPE].astype(bool)
+        # Indices of the state in vector {x, x_dot, y, y_dot, z, z_dot, phi, theta, psi, p, q, r}.
+        self.STATE_IDX = {
+            QuadType.ONE_D: np.array([4, 5]),
+            QuadType.TWO_D: np.array([0, 1, 4, 5, 7, 10]),
+            QuadType.THREE_D: np.arange(12)
+        }[self.QUAD_TYPE]
+        if self.INPLACE_STEP:
+            self._setup_step_buffers()
+
+    def reset(self, init_state=None):
         """(Re-)initializes the environment to start an episode.
 
         Mandatory to call at least once after __init__().
 
+        Args:
+            init_state (ndarray/dict, optional): if given, replaces the initial state (as `init_state` in __init__())
+                                                 of this and the following episodes.
+
         Returns:
             ndarray: The initial state of the environment.
             dict: A dictionary with information about the dynamics and constraints symbolic models.
 
         """
+        if init_state is not None:
+            self._set_init_state(init_state)
         super().before_reset()
+        self.episode_counter += 1
         # PyBullet simulation reset.
-        super()._reset_simulation()
+        world_reused = super()._reset_simulation()
 
         # IROS 2022 - Create maze.
+        # In a persistent world (`fast_reset`), the gates and obstacles bodies are only re-positioned
+        # if the maze layout (number of obstacles, number and types of gates) is unchanged.
+        maze_layout = (len(self.OBSTACLES), tuple(gate[6] for gate in self.GATES))
+        reuse_maze = world_reused and maze_layout == self.MAZE_LAYOUT
+        if world_reused and not reuse_maze:
+            for body_id in self.OBSTACLES_IDS + self.GATES_IDS:
+                p.removeBody(body_id, physicsClientId=self.PYB_CLIENT)
+        self.MAZE_LAYOUT = maze_layout
+        # Randomization of the episode: (x, y, yaw) offsets of the maze bodies, inertial properties and initial state offsets.
+        if self.RANDOMIZATION_SCHEDULE is not None:
+            randomization = self.RANDOMIZATION_SCHEDULE.get(self.episode_counter - 1)
+        else:
+            randomization = self._sample_episode_randomization(self.np_random)
+        PREV_OBSTACLES_IDS = self.OBSTACLES_IDS if reuse_maze else [None] * len(self.OBSTACLES)
         self.OBSTACLES_IDS = []
-        if self.RANDOMIZED_GATES_AND_OBS:
-            rand_info_copy = deepcopy(self.GATES_AND_OBS_RAND_INFO)
-            distrib = getattr(self.np_random, rand_info_copy["obstacles"].pop("distrib"))
-            d_args = rand_info_copy["obstacles"].pop("args", [])
-            d_kwargs = rand_info_copy["obstacles"]
-        for obstacle in self.OBSTACLES:
+        for obstacle, PREV_ID, rand_offset in zip(self.OBSTACLES, PREV_OBSTACLES_IDS, randomization["obstacles"]):
             obs_height = 0.525 # URDF dependent, places 'obstacle.urdf' at z == 0.
-            if self.RANDOMIZED_GATES_AND_OBS:
-                offset = np.array([distrib(*d_args, **d_kwargs), distrib(*d_args, **d_kwargs), obs_height])
-                pose_disturbance = np.array([0, 0, distrib(*d_args, **d_kwargs)])
-            else:
-                offset = np.array([0, 0, obs_height])
-                pose_disturbance = np.array([0, 0, 0])
-            TMP_ID = p.loadURDF(os.path.join(self.URDF_DIR, "obstacle.urdf"),
-                       np.array(obstacle[0:3]) + offset,
-                       p.getQuaternionFromEuler(np.array(obstacle[3:6])+pose_disturbance),
-                       physicsClientId=self.PYB_CLIENT)
-            p.addUserDebugText(str(TMP_ID),
-                               textPosition=[0, 0, 0.5],
-                               textColorRGB=[1, 0, 0],
-                               lifeTime=self.EPISODE_LEN_SEC,
-                               textSize=1.5,
-                               parentObjectUniqueId=TMP_ID,
-                               parentLinkIndex=-1,
-                               physicsClientId=self.PYB_CLIENT)
+            offset = np.array([rand_offset[0], rand_offset[1], obs_height])
+            pose_disturbance = np.array([0, 0, rand_offset[2]])
+            TMP_ID = self._place_maze_body("obstacle.urdf",
+                                           np.array(obstacle[0:3]) + offset,
+                                           np.array(obstacle[3:6]) + pose_disturbance,
+                                           PREV_ID)
             self.OBSTACLES_IDS.append(TMP_ID)
         #
+        PREV_GATES_IDS = self.GATES_IDS if reuse_maze else [None] * len(self.GATES)
         self.GATES_IDS = []
         self.EFFECTIVE_GATES_POSITIONS = []
-        if self.RANDOMIZED_GATES_AND_OBS:
-            rand_info_copy = deepcopy(self.GATES_AND_OBS_RAND_INFO)
-            distrib = getattr(self.np_random, rand_info_copy["gates"].pop("distrib"))
-            d_args = rand_info_copy["gates"].pop("args", [])
-            d_kwargs = rand_info_copy["gates"]
-        for gate in self.GATES:
+        for gate, PREV_ID, rand_offset in zip(self.GATES, PREV_GATES_IDS, randomization["gates"]):
             if gate[6] == 0:
                 urdf_file = "portal.urdf"
                 gate_height = 1. # URDF dependent, places 'portal.urdf' at z == 0.
@@ -412,29 +502,18 @@ class Quadrotor(BaseAviary):
                 gate_height = 0.525 # URDF dependent, places 'low_portal.urdf' at z == 0.
             else:
                 raise ValueError("[ERROR] Unknown gate type.")
-            if self.RANDOMIZED_GATES_AND_OBS:
-                offset = np.array([distrib(*d_args, **d_kwargs), distrib(*d_args, **d_kwargs), gate_height])
-                pose_disturbance = np.array([0, 0, distrib(*d_args, **d_kwargs)])
-            else:
-                offset = np.array([0, 0, gate_height])
-                pose_disturbance = np.array([0, 0, 0])
+            offset = np.array([rand_offset[0], rand_offset[1], gate_height])
+            pose_disturbance = np.array([0, 0, rand_offset[2]])
             self.EFFECTIVE_GATES_POSITIONS.append(list(np.array(gate[0:3]) + offset) + list(np.array(gate[3:6]) + pose_disturbance))
-            TMP_ID = p.loadURDF(os.path.join(self.URDF_DIR, urdf_file),
-                       np.array(gate[0:3]) + offset,
-                       p.getQuaternionFromEuler(np.array(gate[3:6])+pose_disturbance),
-                       physicsClientId=self.PYB_CLIENT)
-            p.addUserDebugText(str(TMP_ID),
-                               textPosition=[0, 0, 0.5],
-                               textColorRGB=[1, 0, 0],
-                               lifeTime=self.EPISODE_LEN_SEC,
-                               textSize=1.5,
-                               parentObjectUniqueId=TMP_ID,
-                               parentLinkIndex=-1,
-                               physicsClientId=self.PYB_CLIENT)
+            TMP_ID = self._place_maze_body(urdf_file,
+                                           np.array(gate[0:3]) + offset,
+                                           np.array(gate[3:6]) + pose_disturbance,
+                                           PREV_ID)
             self.GATES_IDS.append(TMP_ID)
         #
         self.NUM_GATES = len(self.GATES)
-        self.current_gate = 0
+        self.current_gate = np.zeros(self.NUM_DRONES, dtype=int)
+        self._cache_maze_geometry()
         #
         # Deactivate select collisions, e.g. between the ground plane and the drone
         # p.setCollisionFilterPair(bodyUniqueIdA=self.PLANE_ID,
@@ -444,56 +523,51 @@ class Quadrotor(BaseAviary):
         #                          enableCollision=0,
         #                          physicsClientId=self.PYB_CLIENT)
         # 
-        # Initialize IROS-specific attributes.
-        self.stepped_through_gate = False
-        self.currently_collided = False
-        self.at_goal_pos = False
-        self.steps_at_goal_pos = 0
-        self.task_completed = False
+        # Initialize IROS-specific attributes, one entry per drone.
+        self.stepped_through_gate = np.zeros(self.NUM_DRONES, dtype=bool)
+        self.currently_collided = np.zeros(self.NUM_DRONES, dtype=bool)
+        self.at_goal_pos = np.zeros(self.NUM_DRONES, dtype=bool)
+        self.steps_at_goal_pos = np.zeros(self.NUM_DRONES, dtype=int)
+        self.task_completed = np.zeros(self.NUM_DRONES, dtype=bool)
+        self.goal_reached = False
 
         # Choose randomized or deterministic inertial properties.
-        prop_values = {
-            "M": self.MASS,
-            "Ixx": self.J[0, 0],
-            "Iyy": self.J[1, 1],
-            "Izz": self.J[2, 2]
-        }
-        if self.RANDOMIZED_INERTIAL_PROP:
-            prop_values = self._randomize_values_by_info(
-                prop_values, self.INERTIAL_PROP_RAND_INFO)
-            if any(phy_quantity < 0 for phy_quantity in prop_values.values()):
-                raise ValueError("[ERROR] in Quadrotor.reset(), negative randomized inertial properties.")
-        self.OVERRIDDEN_QUAD_MASS = prop_values["M"]
-        self.OVERRIDDEN_QUAD_INERTIA = [prop_values["Ixx"], prop_values["Iyy"], prop_values["Izz"]]
+        prop_values = np.array([self.MASS, self.J[0, 0], self.J[1, 1], self.J[2, 2]]) + randomization["inertial_prop"]
+        if np.any(prop_values < 0):
+            raise ValueError("[ERROR] in Quadrotor.reset(), negative randomized inertial properties.")
+        self.OVERRIDDEN_QUAD_MASS = float(prop_values[0])
+        self.OVERRIDDEN_QUAD_INERTIA = [float(inertia) for inertia in prop_values[1:]]
         
         # Override inertial properties.
-        p.changeDynamics(
-            self.DRONE_IDS[0],
-            linkIndex=-1,  # Base link.
-            mass=self.OVERRIDDEN_QUAD_MASS,
-            localInertiaDiagonal=self.OVERRIDDEN_QUAD_INERTIA,
-            physicsClientId=self.PYB_CLIENT)
-
-        # Randomize initial state.
-        init_values = {init_name: self.__dict__[init_name.upper()] 
-                       for init_name in self.INIT_STATE_LABELS[self.QUAD_TYPE]}
-        if self.RANDOMIZED_INIT:
-            init_values = self._randomize_values_by_info(init_values, self.INIT_STATE_RAND_INFO)
-        INIT_XYZ = [init_values.get("init_"+k, 0.) for k in ["x", "y", "z"]]
-        INIT_VEL = [init_values.get("init_"+k+"_dot", 0.) for k in ["x", "y", "z"]]
-        INIT_RPY = [init_values.get("init_"+k, 0.) for k in ["phi", "theta", "psi"]]
-        if self.QUAD_TYPE == QuadType.TWO_D:
-            INIT_ANG_VEL = [0, init_values.get("init_theta_dot", 0.), 0]
-        else:
-            INIT_ANG_VEL = [init_values.get("init_"+k, 0.) for k in ["p", "q", "r"]]
-        p.resetBasePositionAndOrientation(self.DRONE_IDS[0], INIT_XYZ,
-                                          p.getQuaternionFromEuler(INIT_RPY),
-                                          physicsClientId=self.PYB_CLIENT)
-        p.resetBaseVelocity(self.DRONE_IDS[0], INIT_VEL, INIT_ANG_VEL,
-                            physicsClientId=self.PYB_CLIENT)
+        for drone_id in self.DRONE_IDS:
+            p.changeDynamics(
+                drone_id,
+                linkIndex=-1,  # Base link.
+                mass=self.OVERRIDDEN_QUAD_MASS,
+                localInertiaDiagonal=self.OVERRIDDEN_QUAD_INERTIA,
+                physicsClientId=self.PYB_CLIENT)
+
+        # Randomize initial state, independently for each drone.
+        # The drones keep their offsets from the first one in the default formation (INIT_XYZS).
+        for i, drone_id in enumerate(self.DRONE_IDS):
+            init_values = {init_name: self.__dict__[init_name.upper()] + rand_offset
+                           for init_name, rand_offset in zip(self.INIT_STATE_LABELS[self.QUAD_TYPE], randomization["init_state"][i])}
+            INIT_XYZ = [init_values.get("init_"+k, 0.) for k in ["x", "y", "z"]] + self.INIT_XYZS[i] - self.INIT_XYZS[0]
+            INIT_VEL = [init_values.get("init_"+k+"_dot", 0.) for k in ["x", "y", "z"]]
+            INIT_RPY = [init_values.get("init_"+k, 0.) for k in ["phi", "theta", "psi"]]
+            if self.QUAD_TYPE == QuadType.TWO_D:
+                INIT_ANG_VEL = [0, init_values.get("init_theta_dot", 0.), 0]
+            else:
+                INIT_ANG_VEL = [init_values.get("init_"+k, 0.) for k in ["p", "q", "r"]]
+            p.resetBasePositionAndOrientation(drone_id, INIT_XYZ + self.WORLD_OFFSET,
+                                              p.getQuaternionFromEuler(INIT_RPY),
+                                              physicsClientId=self.PYB_CLIENT)
+            p.resetBaseVelocity(drone_id, INIT_VEL, INIT_ANG_VEL,
+                                physicsClientId=self.PYB_CLIENT)
 
         # Update BaseAviary internal variables before calling self._get_observation().
         self._update_and_store_kinematic_information()
+        self.prev_drone_pos = self.pos.copy()
         obs, info = self._get_observation(), self._get_reset_info()
         obs, info = super().after_reset(obs, info)
         
@@ -502,7 +576,297 @@ class Quadrotor(BaseAviary):
             return obs, info
         else:
             return obs
-        
+
+    def _set_init_state(self, init_state):
+        """Sets the (non-randomized) initial state of the episodes.
+
+        Args:
+            init_state (ndarray/dict): the full initial state as an array, or a partial one as a dictionary
+                                       (e.g. {"init_x": 1.0}, missing components are zero).
+
+        """
+        if isinstance(init_state, np.ndarray):  # Full state as numpy array .
+            for i, init_name in enumerate(self.INIT_STATE_LABELS[self.QUAD_TYPE]):
+                self.__dict__[init_name.upper()] = init_state[i]
+        elif isinstance(init_state, dict):  # Partial state as dictionary.
+            for init_name in self.INIT_STATE_LABELS[self.QUAD_TYPE]:
+                self.__dict__[init_name.upper()] = init_state.get(init_name, 0.)
+        else:
+            raise ValueError("[ERROR] in Quadrotor._set_init_state(), init_state incorrect format.")
+
+    def _sample_episode_randomization(self, rng, num_episodes=None):
+        """Draws the randomization of one episode, or of several for a `RandomizationSchedule`.
+
+        For a single episode, the values are drawn in the same order as the randomization used to be applied
+        in `reset()` (obstacles, gates, inertial properties, then each drone's initial state).
+
+        Args:
+            rng (np.random.Generator): The random number generator.
+            num_episodes (int, optional): The number of episodes, the arrays then have a leading (num_episodes,) dimension.
+
+        Returns:
+            dict: The (num_obstacles, 3) and (num_gates, 3) (x, y, yaw) offsets of the maze bodies, the (4,) offsets
+                  of the inertial properties (M, Ixx, Iyy, Izz) and the (num_drones, len(INIT_STATE_LABELS)) offsets
+                  of the initial states.
+
+        """
+        batch = () if num_episodes is None else (num_episodes,)
+
+        def draw(info, shape):
+            kwargs = dict(info)
+            distrib = getattr(rng, kwargs.pop("distrib"))
+            args = kwargs.pop("args", [])
+            return distrib(*args, size=batch + shape, **kwargs)
+
+        randomization = {}
+        for name, bodies in [("obstacles", self.OBSTACLES), ("gates", self.GATES)]:
+            if self.RANDOMIZED_GATES_AND_OBS:
+                randomization[name] = draw(self.GATES_AND_OBS_RAND_INFO[name], (len(bodies), 3))
+            else:
+                randomization[name] = np.zeros(batch + (len(bodies), 3))
+        randomization["inertial_prop"] = np.zeros(batch + (4,))
+        if self.RANDOMIZED_INERTIAL_PROP:
+            for i, name in enumerate(["M", "Ixx", "Iyy", "Izz"]):
+                if name in self.INERTIAL_PROP_RAND_INFO:
+                    randomization["inertial_prop"][..., i] = draw(self.INERTIAL_PROP_RAND_INFO[name], ())
+        init_labels = self.INIT_STATE_LABELS[self.QUAD_TYPE]
+        randomization["init_state"] = np.zeros(batch + (self.NUM_DRONES, len(init_labels)))
+        if self.RANDOMIZED_INIT:
+            for i in range(self.NUM_DRONES):
+                for j, name in enumerate(init_labels):
+                    if name in self.INIT_STATE_RAND_INFO:
+                        randomization["init_state"][..., i, j] = draw(self.INIT_STATE_RAND_INFO[name], ())
+        return randomization
+
+    def load_randomization_schedule(self, exported):
+        """Replays exported episode randomizations (see `export_randomization_schedule()`) in the next resets.
+
+        Args:
+            exported (dict): The exported schedule, or the .npz file it was saved to (loaded with `np.load()`).
+
+        """
+        self.RANDOMIZATION_SCHEDULE = RandomizationSchedule(exported=exported)
+
+    def export_randomization_schedule(self, num_episodes, first_episode=0):
+        """Exports the randomization of consecutive episodes, to replay them with `load_randomization_schedule()`.
+
+        Args:
+            num_episodes (int): The number of episodes.
+            first_episode (int, optional): The index of the first episode (the first reset is episode 0).
+
+        Returns:
+            dict: The arrays of the episodes' randomization, can be saved with `np.savez()`.
+
+        """
+        if self.RANDOMIZATION_SCHEDULE is None:
+            raise RuntimeError("[ERROR] in Quadrotor.export_randomization_schedule(), no randomization_seed given.")
+        return self.RANDOMIZATION_SCHEDULE.export(num_episodes, first_episode)
+
+    def _cache_maze_geometry(self):
+        """Caches the gates' centers and frames, the maze bodies' bounding boxes and the drones' bounding radius.
+
+        Gates, obstacles and the ground plane are static during an episode, these are used by `_get_info()`
+        to detect collisions, crossings and visibility without per-body or per-step PyBullet queries.
+
+        """
+        self.GATES_CENTERS = np.zeros((self.NUM_GATES, 3))
+        self.GATES_FRAMES = np.zeros((self.NUM_GATES, 3, 3))  # Columns are the opening's width, normal, height axes.
+        for i, gate_pos in enumerate(self.EFFECTIVE_GATES_POSITIONS):
+            self.GATES_CENTERS[i] = gate_pos[0:3]
+            self.GATES_FRAMES[i] = np.array(p.getMatrixFromQuaternion(p.getQuaternionFromEuler(gate_pos[3:6]))).reshape(3, 3)
+        # Collision candidates, in the order in which collisions are reported (other drones last).
+        maze_ids = self.GATES_IDS + self.OBSTACLES_IDS + [self.PLANE_ID]
+        self.MAZE_BODIES = {body_id: priority for priority, body_id in enumerate(maze_ids + list(self.DRONE_IDS))}
+        self.MAZE_AABBS = np.array([self._get_body_aabb(body_id) for body_id in maze_ids]) - self.WORLD_OFFSET
+        self.GATES_AABBS = self.MAZE_AABBS[:self.NUM_GATES]
+        drone_aabb = self._get_body_aabb(self.DRONE_IDS[0])
+        drone_pos, _ = p.getBasePositionAndOrientation(self.DRONE_IDS[0], physicsClientId=self.PYB_CLIENT)
+        self.DRONE_BOUNDING_RADIUS = np.linalg.norm(np.max(np.abs(drone_aabb - drone_pos), axis=0))
+        # Bounding boxes expanded by the drone's bounding radius and Bullet's default contact breaking threshold.
+        contact_threshold = 0.02
+        self.MAZE_AABBS_CENTERS = np.mean(self.MAZE_AABBS, axis=1)
+        self.MAZE_AABBS_HALF_EXTENTS = 0.5 * (self.MAZE_AABBS[:, 1] - self.MAZE_AABBS[:, 0]) \
+                                       + self.DRONE_BOUNDING_RADIUS + contact_threshold
+        self.DRONES_CONTACT_DISTANCE = 2 * self.DRONE_BOUNDING_RADIUS + contact_threshold
+
+    def _get_body_aabb(self, body_id):
+        """Axis-aligned bounding box of a body, including all its links.
+
+        Args:
+            body_id (int): The PyBullet id of the body.
+
+        Returns:
+            ndarray: The (2, 3) minimum and maximum corners of the bounding box.
+
+        """
+        aabbs = np.array([p.getAABB(body_id, link, physicsClientId=self.PYB_CLIENT)
+                          for link in range(-1, p.getNumJoints(body_id, physicsClientId=self.PYB_CLIENT))])
+        return np.array([np.min(aabbs[:, 0], axis=0), np.max(aabbs[:, 1], axis=0)])
+
+    def _near_maze_bodies(self, nth_drone=0):
+        """Broadphase check of a drone's position against the maze bodies' (cached, expanded) bounding boxes.
+
+        Args:
+            nth_drone (int, optional): The ordinal number/position of the desired drone in list self.DRONE_IDS.
+
+        Returns:
+            bool: Whether the drone might be in contact with a gate, an obstacle, the ground plane or another drone.
+
+        """
+        pos = self.pos[nth_drone]
+        if np.any(np.all(np.abs(pos - self.MAZE_AABBS_CENTERS) <= self.MAZE_AABBS_HALF_EXTENTS, axis=1)):
+            return True
+        if self.NUM_DRONES > 1:
+            # Itself included.
+            return np.count_nonzero(np.linalg.norm(self.pos - pos, axis=1) <= self.DRONES_CONTACT_DISTANCE) > 1
+        return False
+
+    def _crossed_gate(self, gate_idx, prev_pos, pos):
+        """Checks if the drone moved through a gate's opening between two positions.
+
+        Args:
+            gate_idx (int): The index of the gate.
+            prev_pos (ndarray): The drone's position at the previous control step.
+            pos (ndarray): The drone's current position.
+
+        Returns:
+            bool: Whether segment prev_pos-pos intersects the gate's opening.
+
+        """
+        half_edge = 0.2  # Gate URDF dependent, 0.45 edge minus the 0.05 frame thickness.
+        frame = self.GATES_FRAMES[gate_idx]
+        prev_local = (prev_pos - self.GATES_CENTERS[gate_idx]) @ frame
+        local = (pos - self.GATES_CENTERS[gate_idx]) @ frame
+        if prev_local[1] * local[1] > 0 or prev_local[1] == local[1]:
+            return False
+        crossing = prev_local + prev_local[1] / (prev_local[1] - local[1]) * (local - prev_local)
+        return abs(crossing[0]) <= half_edge and abs(crossing[2]) <= half_edge
+
+    def _place_maze_body(self, urdf_file, pos, rpy, body_id=None):
+        """Loads a gate or obstacle URDF, or re-positions its already loaded body.
+
+        Args:
+            urdf_file (str): The name of the URDF file in folder `assets`.
+            pos (ndarray): The position of the body.
+            rpy (ndarray): The roll, pitch, yaw orientation of the body.
+            body_id (int, optional): The id of the body to re-position (in a persistent world).
+
+        Returns:
+            int: The PyBullet id of the body.
+
+        """
+        if body_id is None:
+            body_id = p.loadURDF(os.path.join(self.URDF_DIR, urdf_file),
+                                 pos + self.WORLD_OFFSET,
+                                 p.getQuaternionFromEuler(rpy),
+                                 physicsClientId=self.PYB_CLIENT)
+            self._set_world_collision_group(body_id)
+        else:
+            p.resetBasePositionAndOrientation(body_id, pos + self.WORLD_OFFSET, p.getQuaternionFromEuler(rpy),
+                                              physicsClientId=self.PYB_CLIENT)
+        if not self.HEADLESS:
+            p.addUserDebugText(str(body_id),
+                               textPosition=[0, 0, 0.5],
+                               textColorRGB=[1, 0, 0],
+                               lifeTime=self.EPISODE_LEN_SEC,
+                               textSize=1.5,
+                               parentObjectUniqueId=body_id,
+                               parentLinkIndex=-1,
+                               physicsClientId=self.PYB_CLIENT)
+        return body_id
+
+    def get_state_snapshot(self):
+        """Saves the current state of the environment, to branch rollouts with `restore_state_snapshot()`.
+
+        A snapshot pairs PyBullet's in-memory `saveState()` with the Python-side attributes in
+        `SNAPSHOT_ATTRIBUTES`, the state of the random number generator (shared with the disturbances),
+        the states of the block-sampled disturbances' own generators and the disturbances' per-episode
+        attributes. It is only valid in the episode it was taken in.
+
+        Returns:
+            dict: The snapshot of the environment's state.
+
+        """
+        if not self.initial_reset:
+            raise RuntimeError("[ERROR] in Quadrotor.get_state_snapshot(), call reset() before taking a snapshot.")
+        if self.SHARED_WORLD is not None:
+            raise RuntimeError("[ERROR] in Quadrotor.get_state_snapshot(), snapshots are not supported in a shared PyBullet client.")
+        self._sync_pybullet_state()
+        return {
+            "episode": self.episode_counter,
+            "pyb_state_id": p.saveState(physicsClientId=self.PYB_CLIENT),
+            # Bullet's cached link transforms are not serialized and lag one physics step behind while stepping,
+            # they are read without forward kinematics (which would update them).
+            "link_poses": [p.getLinkState(drone_id, 0, computeForwardKinematics=0, physicsClientId=self.PYB_CLIENT)[4:6]
+                           for drone_id in self.DRONE_IDS],
+            "attributes": {name: deepcopy(self.__dict__[name])
+                           for name in self.SNAPSHOT_ATTRIBUTES if name in self.__dict__},
+            "np_random_state": deepcopy(self.np_random.bit_generator.state),
+            "disturbances": {mode: [{k: deepcopy(v) for k, v in disturb.__dict__.items() if k != "np_random"}
+                                    for disturb in disturbs.disturbances]
+                             for mode, disturbs in self.disturbances.items()},
+            "disturbances_np_random_states": {mode: [deepcopy(disturb.np_random.bit_generator.state)
+                                                     if disturb.np_random is not self.np_random else None
+                                                     for disturb in disturbs.disturbances]
+                                              for mode, disturbs in self.disturbances.items()}
+        }
+
+    def restore_state_snapshot(self, snapshot):
+        """Restores a state of the environment saved by `get_state_snapshot()`.
+
+        Restoring is much cheaper than a reset: no body is loaded or re-positioned, and the gates,
+        obstacles and cached maze geometry of the current episode are left untouched. The branches
+        restored from a snapshot are bit-identical; with PyBullet physics, they match the rollout that
+        continued from the snapshot up to Bullet's single precision cached link transforms (~1e-7).
+
+        Args:
+            snapshot (dict): The snapshot returned by `get_state_snapshot()` in the current episode.
+
+        """
+        if snapshot["episode"] != self.episode_counter:
+            raise ValueError("[ERROR] in Quadrotor.restore_state_snapshot(), the snapshot was taken in a different episode.")
+        p.restoreState(stateId=snapshot["pyb_state_id"], physicsClientId=self.PYB_CLIENT)
+        if self.PHYSICS != Physics.DYN:
+            # The forces of the next physics step are applied with the snapshot's lagging link transforms.
+            self.lagged_base_poses = [self._get_lagged_base_pose(drone_id, link_pose)
+                                      for drone_id, link_pose in zip(self.DRONE_IDS, snapshot["link_poses"])]
+        self.__dict__.update(deepcopy(snapshot["attributes"]))
+        self.np_random.bit_generator.state = deepcopy(snapshot["np_random_state"])
+        for mode, disturbs in self.disturbances.items():
+            for disturb, disturb_attributes in zip(disturbs.disturbances, snapshot["disturbances"][mode]):
+                disturb.__dict__.update(deepcopy(disturb_attributes))
+            for disturb, np_random_state in zip(disturbs.disturbances, snapshot["disturbances_np_random_states"][mode]):
+                if np_random_state is not None:
+                    disturb.np_random.bit_generator.state = deepcopy(np_random_state)
+
+    def _get_lagged_base_pose(self, drone_id, link_pose):
+        """Computes the base pose matching the cached (lagging) transform of a drone's first link.
+
+        The drone's links are attached with fixed joints, their offset from the base is taken from the
+        forward kinematics of the restored state.
+
+        Args:
+            drone_id (int): the PyBullet body id of the drone.
+            link_pose (tuple): the cached (position, orientation) of the drone's first link.
+
+        Returns:
+            tuple: the base (position, orientation) of the cached link transforms.
+
+        """
+        pos, quat = p.getBasePositionAndOrientation(drone_id, physicsClientId=self.PYB_CLIENT)
+        link_pos, link_quat = p.getLinkState(drone_id, 0, computeForwardKinematics=1, physicsClientId=self.PYB_CLIENT)[4:6]
+        base_in_link = p.multiplyTransforms(*p.invertTransform(link_pos, link_quat), pos, quat)
+        return p.multiplyTransforms(*link_pose, *base_in_link)
+
+    def remove_state_snapshot(self, snapshot):
+        """Releases the memory of PyBullet's saved state of a snapshot.
+
+        Args:
+            snapshot (dict): The snapshot returned by `get_state_snapshot()`.
+
+        """
+        p.removeState(snapshot["pyb_state_id"], physicsClientId=self.PYB_CLIENT)
+
 
     def step(self, action):
         """Advances the environment by one control step.
@@ -511,17 +875,34 @@ class Quadrotor(BaseAviary):
         The PyBullet simulation is stepped PYB_FREQ/CTRL_FREQ times in BaseAviary.
 
         Args:
-            action (ndarray): the action applied to the environment for the step.
+            action (ndarray): the action applied to the environment for the step, (num_drones, action_dim)-shaped
+                with multiple drones.
 
         Returns:
             ndarray: The state of the environment after the step.
-            float: The scalar reward/cost of the step.
+            float: The scalar reward/cost of the step, (num_drones,)-shaped ndarray with multiple drones.
             bool: Whether the conditions for the end of an episode are met in the step.
             dict: A dictionary with information about the constraints evaluations and violations.
 
+        """
+        rpm, disturb_force = self._step_inputs(action)
+        # Advance the simulation.
+        self._advance_simulation(rpm, disturb_force)
+        return self._step_outputs()
+
+    def _step_inputs(self, action):
+        """Preprocesses the action and determines the disturbance force of a control step.
+
+        Args:
+            action (ndarray): the action applied to the environment for the step.
+
+        Returns:
+            ndarray: The RPMs of the drones' motors.
+            ndarray: The (3,) disturbance force applied to the drones, or None.
+
         """
         # Get the preprocessed rpm for each motor
-        rpm = super().before_step(action)
+        rpm = self.before_step(action)
 
         # Determine disturbance force.
         disturb_force = None
@@ -546,15 +927,24 @@ class Quadrotor(BaseAviary):
                 disturb_force = [float(disturb_force[0]), 0, float(disturb_force[1])]
             elif self.QUAD_TYPE == QuadType.THREE_D:
                 disturb_force = np.asarray(disturb_force).flatten()
+        return rpm, disturb_force
+
+    def _step_outputs(self):
+        """Computes the observation, reward, termination and info of a control step, once the simulation advanced.
+
+        Returns:
+            ndarray: The state of the environment after the step.
+            float: The scalar reward/cost of the step.
+            bool: Whether the conditions for the end of an episode are met in the step.
+            dict: A dictionary with information about the constraints evaluations and violations.
 
-        # Advance the simulation.        
-        super()._advance_simulation(rpm, disturb_force)
+        """
         # Standard Gym return.
         obs = self._get_observation()
         info = self._get_info()
         done = self._get_done()  # IROS 2022 - After _get_info() to use this step's 'self' attributes.
         rew = self._get_reward()  # IROS 2022 - After _get_info() to use this step's 'self' attributes.
-        obs, rew, done, info = super().after_step(obs, rew, done, info)
+        obs, rew, done, info = self.after_step(obs, rew, done, info)
         return obs, rew, done, info
     
     def render(self, mode='human'):
@@ -567,16 +957,7 @@ class Quadrotor(BaseAviary):
             ndarray: A multidimensional array with the RGB frame captured by PyBullet's camera.
 
         """
-        [w, h, rgb, dep, seg] = p.getCameraImage(width=self.RENDER_WIDTH,
-                                                 height=self.RENDER_HEIGHT,
-                                                 shadow=1,
-                                                 viewMatrix=self.CAM_VIEW,
-                                                 projectionMatrix=self.CAM_PRO,
-                                                 renderer=p.ER_TINY_RENDERER,
-                                                 flags=p.ER_SEGMENTATION_MASK_OBJECT_AND_LINKINDEX,
-                                                 physicsClientId=self.PYB_CLIENT)
-        # Image.fromarray(np.reshape(rgb, (h, w, 4)), 'RGBA').show()
-        return np.reshape(rgb, (h, w, 4))
+        return self.capture_frame(flags=p.ER_SEGMENTATION_MASK_OBJECT_AND_LINKINDEX)
 
     def _setup_symbolic(self):
         """Creates symbolic (CasADi) models for dynamics, observation, and cost.
@@ -588,6 +969,12 @@ class Quadrotor(BaseAviary):
         m, g, l = self.MASS, self.GRAVITY_ACC, self.L
         Iyy = self.J[1, 1]
         dt = self.CTRL_TIMESTEP
+        # The symbolic models are not modified after their creation, reuse the one of a previous environment.
+        cache_key = (self.QUAD_TYPE, m, g, l, tuple(np.diag(self.J)), self.KF, self.KM, dt,
+                     self.INTEGRATION_ALGO, self.INTEGRATION_SUBSTEPS)
+        if cache_key in _SYMBOLIC_MODELS:
+            self.symbolic = _SYMBOLIC_MODELS[cache_key]
+            return
         # Define states.
         z = cs.MX.sym('z')
         z_dot = cs.MX.sym('z_dot')
@@ -694,13 +1081,17 @@ class Quadrotor(BaseAviary):
             }
         }
         # Setup symbolic model.
-        self.symbolic = SymbolicModel(dynamics=dynamics, cost=cost, dt=dt)
+        self.symbolic = SymbolicModel(dynamics=dynamics, cost=cost, dt=dt,
+                                      integration_algo=self.INTEGRATION_ALGO,
+                                      integration_substeps=self.INTEGRATION_SUBSTEPS)
+        _SYMBOLIC_MODELS[cache_key] = self.symbolic
 
     def _set_action_space(self):
         """Returns the action space of the environment.
 
         Returns:
-            gym.spaces: The quadrotor environment's action space, of size 1 or 2 depending on QUAD_TYPE.
+            gym.spaces: The quadrotor environment's action space, of size 1, 2 or 4 depending on QUAD_TYPE
+                        (per drone, with a leading (num_drones,) dimension with multiple drones).
 
         """
         # Define action/input dimension, labels, and units.
@@ -720,23 +1111,27 @@ class Quadrotor(BaseAviary):
         if self.NORMALIZED_RL_ACTION_SPACE:
             # Normalized thrust (around hover thrust).
             self.hover_thrust = self.GRAVITY_ACC * self.MASS / action_dim
-            self.action_space = spaces.Box(low=-np.ones(action_dim), 
-                                           high=np.ones(action_dim), 
-                                           dtype=np.float32)
+            low = -np.ones(action_dim, np.float32)
+            high = np.ones(action_dim, np.float32)
         else:
             # Direct thrust control.
             n_motors = 4 / action_dim
             a_low = self.KF * n_motors * (self.PWM2RPM_SCALE * self.MIN_PWM + self.PWM2RPM_CONST)**2
             a_high = self.KF * n_motors * (self.PWM2RPM_SCALE * self.MAX_PWM + self.PWM2RPM_CONST)**2
-            self.action_space = spaces.Box(low=np.full(action_dim, a_low, np.float32), 
-                                           high=np.full(action_dim, a_high, np.float32), 
-                                           dtype=np.float32)
+            low = np.full(action_dim, a_low, np.float32)
+            high = np.full(action_dim, a_high, np.float32)
+        if self.NUM_DRONES > 1:
+            # One row per drone.
+            low = np.tile(low, (self.NUM_DRONES, 1))
+            high = np.tile(high, (self.NUM_DRONES, 1))
+        self.action_space = spaces.Box(low=low, high=high, dtype=np.float32)
 
     def _set_observation_space(self):
         """Returns the observation space of the environment.
 
         Returns:
-            gym.spaces: The bounded observation (state) space, of size 2, 6, or 12 depending on QUAD_TYPE.
+            gym.spaces: The bounded observation (state) space, of size 2, 6, or 12 depending on QUAD_TYPE
+                        (per drone, with a leading (num_drones,) dimension with multiple drones).
 
         """
         self.x_threshold = 5
@@ -801,6 +1196,11 @@ class Quadrotor(BaseAviary):
             low = np.concatenate([low] * 2)
             high = np.concatenate([high] * 2)
 
+        if self.NUM_DRONES > 1:
+            # One row per drone.
+            low = np.tile(low, (self.NUM_DRONES, 1))
+            high = np.tile(high, (self.NUM_DRONES, 1))
+
         # Define obs space exposed to the controller.
         # Note how the obs space can differ from state space (i.e. augmented with the next reference states for RL)
         self.observation_space = spaces.Box(low=low, high=high, dtype=np.float32)
@@ -811,12 +1211,27 @@ class Quadrotor(BaseAviary):
         self.DISTURBANCE_MODES["action"]["dim"] = self.action_dim
         self.DISTURBANCE_MODES["dynamics"]["dim"] = int(self.QUAD_TYPE)
         super()._setup_disturbances()
-    
+
+    def _apply_disturbance(self, mode, target):
+        """Applies the observation or action disturbances, independently to each drone.
+
+        Args:
+            mode (str): The disturbance mode, "observation" or "action".
+            target (ndarray): The observation or action, (num_drones, dim)-shaped with multiple drones.
+
+        Returns:
+            ndarray: The disturbed observation or action.
+
+        """
+        if self.NUM_DRONES == 1:
+            return self.disturbances[mode].apply(target, self)
+        return self.disturbances[mode].apply_batch(target, self)
+
     def _preprocess_control(self, action):
         """Converts the action passed to .step() into motors' RPMs (ndarray of shape (4,)).
 
         Args:
-            action (ndarray): The raw action input, of size 1 or 2 depending on QUAD_TYPE.
+            action (ndarray): The raw action input, of size 1, 2 or 4 depending on QUAD_TYPE (per drone).
 
         Returns:
             ndarray: The motors RPMs to apply to the quadrotor.
@@ -833,7 +1248,7 @@ class Quadrotor(BaseAviary):
         self.current_preprocessed_action = thrust
         # Apply disturbances.
         if "action" in self.disturbances:
-            thrust = self.disturbances["action"].apply(thrust, self)
+            thrust = self._apply_disturbance("action", thrust)
         if self.adversary_disturbance == "action":
             thrust = thrust + self.adv_action
         # convert to quad motor rpm commands
@@ -845,52 +1260,147 @@ class Quadrotor(BaseAviary):
         """Returns the current observation (state) of the environment.
 
         Returns:
-            ndarray: The state of the quadrotor, of size 2 or 6 depending on QUAD_TYPE.
+            ndarray: The state of the quadrotor, of size 2, 6 or 12 depending on QUAD_TYPE (per drone).
 
         """
-        full_state = self._get_drone_state_vector(0)
+        if self.INPLACE_STEP:
+            return self._get_observation_inplace()
+        if self.NUM_DRONES == 1:
+            self.state = self._get_drone_state(0)
+        else:
+            self.state = np.stack([self._get_drone_state(i) for i in range(self.NUM_DRONES)])
+        # if not np.array_equal(self.state,
+        #                       np.clip(self.state, self.observation_space.low, self.observation_space.high)):
+        #     if self.GUI and self.VERBOSE:
+        #         print(
+        #             "[WARNING]: observation was clipped in Quadrotor._get_observation()."
+        #         )
+
+        # Apply observation disturbance.
+        obs = self.state.copy()
+        if "observation" in self.disturbances:
+            obs = self._apply_disturbance("observation", obs)
+
+        # Concatenate goal info (references state(s)) for RL.
+        if self.NUM_DRONES == 1:
+            return self.extend_obs(obs, self.ctrl_step_counter+1)
+        return np.stack([self.extend_obs(drone_obs, self.ctrl_step_counter+1) for drone_obs in obs])
+
+    def _get_drone_state(self, nth_drone):
+        """Returns the state of a drone, from BaseAviary's kinematic information.
+
+        Args:
+            nth_drone (int): The ordinal number/position of the desired drone in list self.DRONE_IDS.
+
+        Returns:
+            ndarray: The state of the drone, of size 2, 6 or 12 depending on QUAD_TYPE.
+
+        """
+        full_state = self._get_drone_state_vector(nth_drone)
         pos, _, rpy, vel, ang_v, _ = np.split(full_state, [3, 7, 10, 13, 16])
         if self.QUAD_TYPE == QuadType.ONE_D:
             # {z, z_dot}.
-            self.state = np.hstack([pos[2], vel[2]]).reshape((2,))
+            state = np.hstack([pos[2], vel[2]]).reshape((2,))
         elif self.QUAD_TYPE == QuadType.TWO_D:
             # {x, x_dot, z, z_dot, theta, theta_dot}.
-            self.state = np.hstack(
+            state = np.hstack(
                 [pos[0], vel[0], pos[2], vel[2], rpy[1], ang_v[1]]
             ).reshape((6,))
         elif self.QUAD_TYPE == QuadType.THREE_D:
-            Rob = np.array(p.getMatrixFromQuaternion(self.quat[0])).reshape((3,3))
+            Rob = np.array(p.getMatrixFromQuaternion(self.quat[nth_drone])).reshape((3,3))
             Rbo = Rob.T
             ang_v_body_frame = Rbo @ ang_v
             # {x, x_dot, y, y_dot, z, z_dot, phi, theta, psi, p, q, r}.
-            self.state = np.hstack(
+            state = np.hstack(
                 # [pos[0], vel[0], pos[1], vel[1], pos[2], vel[2], rpy, ang_v]  # Note: world ang_v != body frame pqr
                 [pos[0], vel[0], pos[1], vel[1], pos[2], vel[2], rpy, ang_v_body_frame]
             ).reshape((12,))
-        # if not np.array_equal(self.state,
-        #                       np.clip(self.state, self.observation_space.low, self.observation_space.high)):
-        #     if self.GUI and self.VERBOSE:
-        #         print(
-        #             "[WARNING]: observation was clipped in Quadrotor._get_observation()."
-        #         )
+        return state
+
+    def _setup_step_buffers(self):
+        """Preallocates the buffers used by .step() and .reset() when `inplace_step` is True.
+
+        """
+        self.state = np.zeros(self.state_dim)
+        self._full_state = np.zeros(12)
+        self._rot = np.zeros(9)
+        self._rot_mat = self._rot.reshape((3, 3))  # View of self._rot.
+        # Observation, i.e. the (disturbed) state and the reference state(s) for RL.
+        self._obs = np.zeros(self.obs_dim)
+        self._obs_state = self._obs[:self.state_dim]
+        self._obs_goal = self._obs[self.state_dim:].reshape((-1, self.state_dim))
+        if self.TASK == Task.STABILIZATION:
+            self._obs_goal[:] = self.X_GOAL
+        self._goal_offsets = np.arange(self._obs_goal.shape[0])
+        self._goal_idx = np.zeros(self._obs_goal.shape[0], dtype=int)
+        # Errors, weights and bounds for the reward, info and termination.
+        self._state_err = np.zeros(self.state_dim)
+        self._weighted_state_err = np.zeros(self.state_dim)
+        self._act_err = np.zeros(self.action_dim)
+        self._weighted_act_err = np.zeros(self.action_dim)
+        self._rew_state_weight = np.broadcast_to(self.rew_state_weight, self.state_dim).astype(float)
+        self._rew_act_weight = np.broadcast_to(self.rew_act_weight, self.action_dim).astype(float)
+        self._state_low = self.state_space.low.astype(float)
+        self._state_high = self.state_space.high.astype(float)
+        self._out_of_bound = np.zeros(self.state_dim, dtype=bool)
+        self._out_of_bound_high = np.zeros(self.state_dim, dtype=bool)
+        # Position error to the stabilization goal, for the goal progress in the info.
+        self._xyz_idx = np.array([0, 2, 4])
+        self._xyz_err = np.zeros(3)
+        if self.TASK == Task.STABILIZATION and self.QUAD_TYPE == QuadType.THREE_D:
+            self._goal_xyz = self.X_GOAL[self._xyz_idx]
+
+    def _get_observation_inplace(self):
+        """Writes the current state and observation into the preallocated buffers (`inplace_step`).
+
+        Returns:
+            ndarray: The observation buffer, overwritten by the next call.
 
+        """
+        full = self._full_state
+        full[0:6:2] = self.pos[0]
+        full[1:6:2] = self.vel[0]
+        full[6:9] = self.rpy[0]
+        if self.QUAD_TYPE == QuadType.THREE_D:
+            # Body frame angular velocity, i.e. Rob.T @ ang_v.
+            self._rot[:] = p.getMatrixFromQuaternion(self.quat[0])
+            np.dot(self.ang_v[0], self._rot_mat, out=full[9:12])
+        else:
+            full[9:12] = self.ang_v[0]
+        np.take(full, self.STATE_IDX, out=self.state)
         # Apply observation disturbance.
-        obs = deepcopy(self.state)
         if "observation" in self.disturbances:
-            obs = self.disturbances["observation"].apply(obs, self) 
-
-        # Concatenate goal info (references state(s)) for RL.
-        obs = self.extend_obs(obs, self.ctrl_step_counter+1)
-        return obs
+            self._obs_state[:] = self.disturbances["observation"].apply(self.state, self)
+        else:
+            self._obs_state[:] = self.state
+        # Write the reference states for RL (constant for stabilization).
+        if self._goal_idx.size > 0 and self.TASK == Task.TRAJ_TRACKING:
+            np.add(self._goal_offsets, self.ctrl_step_counter + 1, out=self._goal_idx)
+            np.minimum(self._goal_idx, self.X_GOAL.shape[0] - 1, out=self._goal_idx)
+            np.take(self.X_GOAL, self._goal_idx, axis=0, out=self._obs_goal)
+        return self._obs
 
     def _get_reward(self):
         """Computes the current step's reward value.
 
         Returns:
-            float: The evaluated reward/cost.
+            float: The evaluated reward/cost, (num_drones,)-shaped ndarray with multiple drones.
 
         """
         # RL cost.
+        if self.COST == Cost.RL_REWARD and self.INPLACE_STEP:
+            if self.TASK == Task.STABILIZATION:
+                np.subtract(self.state, self.X_GOAL, out=self._state_err)
+            if self.TASK == Task.TRAJ_TRACKING:
+                wp_idx = min(self.ctrl_step_counter, self.X_GOAL.shape[0]-1)
+                np.subtract(self.state, self.X_GOAL[wp_idx], out=self._state_err)
+            np.subtract(self.current_preprocessed_action, self.U_GOAL, out=self._act_err)
+            np.multiply(self._rew_state_weight, self._state_err, out=self._weighted_state_err)
+            np.multiply(self._rew_act_weight, self._act_err, out=self._weighted_act_err)
+            rew = -(np.dot(self._weighted_state_err, self._state_err) + np.dot(self._weighted_act_err, self._act_err))
+            if self.rew_exponential:
+                rew = np.exp(rew)
+            return rew
         if self.COST == Cost.RL_REWARD:
             state = self.state
             act = np.asarray(self.current_preprocessed_action)
@@ -899,13 +1409,13 @@ class Quadrotor(BaseAviary):
             # TODO: consider using multiple future goal states for cost in tracking
             if self.TASK == Task.STABILIZATION:
                 state_error = state - self.X_GOAL
-                dist = np.sum(self.rew_state_weight * state_error * state_error)
-                dist += np.sum(self.rew_act_weight * act_error * act_error)
+                dist = np.sum(self.rew_state_weight * state_error * state_error, axis=-1)
+                dist += np.sum(self.rew_act_weight * act_error * act_error, axis=-1)
             if self.TASK == Task.TRAJ_TRACKING:
                 wp_idx = min(self.ctrl_step_counter, self.X_GOAL.shape[0]-1)
                 state_error = state - self.X_GOAL[wp_idx]
-                dist = np.sum(self.rew_state_weight * state_error * state_error)
-                dist += np.sum(self.rew_act_weight * act_error * act_error)
+                dist = np.sum(self.rew_state_weight * state_error * state_error, axis=-1)
+                dist += np.sum(self.rew_act_weight * act_error * act_error, axis=-1)
             rew = -dist
             # Convert rew to be positive and bounded [0,1].
             if self.rew_exponential:
@@ -915,32 +1425,26 @@ class Quadrotor(BaseAviary):
         # Control cost.
         if self.COST == Cost.QUADRATIC:
             if self.TASK == Task.STABILIZATION:
-                return float(-1 * self.symbolic.loss(x=self.state,
-                                                     Xr=self.X_GOAL,
-                                                     u=self.current_preprocessed_action,
-                                                     Ur=self.U_GOAL,
-                                                     Q=self.Q,
-                                                     R=self.R)["l"])
+                cost = self.quadratic_cost(x=self.state,
+                                           u=self.current_preprocessed_action,
+                                           Xr=self.X_GOAL,
+                                           Ur=self.U_GOAL)
             if self.TASK == Task.TRAJ_TRACKING:
-                return float(-1 * self.symbolic.loss(x=self.state,
-                                                     Xr=self.X_GOAL[self.ctrl_step_counter,:],
-                                                     u=self.current_preprocessed_action,
-                                                     Ur=self.U_GOAL,
-                                                     Q=self.Q,
-                                                     R=self.R)["l"])
+                cost = self.quadratic_cost(x=self.state,
+                                           u=self.current_preprocessed_action,
+                                           Xr=self.X_GOAL[self.ctrl_step_counter,:],
+                                           Ur=self.U_GOAL)
+            return float(-1 * cost) if self.NUM_DRONES == 1 else -1 * cost
 
         # IROS 2022 - Competition sparse reward signal.
         if self.COST == Cost.COMPETITION:
-            reward = 0
+            reward = np.zeros(self.NUM_DRONES, dtype=int)
             # Reward for stepping through the (correct) next gate.
-            if self.stepped_through_gate:
-                reward += 100
+            reward += 100 * self.stepped_through_gate
             # Reward for reaching goal position (after navigating the gates in the correct order).
-            if self.at_goal_pos:
-                reward += 100
+            reward += 100 * self.at_goal_pos
             # Penalize by collision.
-            if self.currently_collided:
-                reward -= 1000
+            reward -= 1000 * self.currently_collided
             # Penalize by constraint violation.
             if self.cnstr_violation:
                 reward -= 100
@@ -951,18 +1455,27 @@ class Quadrotor(BaseAviary):
             #                                         Ur=self.U_GOAL,
             #                                         Q=self.Q,
             #                                         R=self.R)["l"])
-            return reward
+            return int(reward[0]) if self.NUM_DRONES == 1 else reward
 
     def _get_done(self):
         """Computes the conditions for termination of an episode.
 
+        With multiple drones, an episode is over when any drone fails (out of bounds, collision)
+        or all drones succeed (goal reached, task completed).
+
         Returns:
             bool: Whether an episode is over.
 
         """
         # Done if goal reached for stabilization task with quadratic cost.
         if self.TASK == Task.STABILIZATION and self.COST == Cost.QUADRATIC:
-            self.goal_reached = bool(np.linalg.norm(self.state - self.X_GOAL) < self.TASK_INFO["stabilization_goal_tolerance"])
+            if self.INPLACE_STEP:
+                np.subtract(self.state, self.X_GOAL, out=self._state_err)
+                dist = math.sqrt(np.dot(self._state_err, self._state_err))
+                self.goal_reached = dist < self.TASK_INFO["stabilization_goal_tolerance"]
+            else:
+                dist = np.linalg.norm(self.state - self.X_GOAL, axis=-1)
+                self.goal_reached = bool(np.all(dist < self.TASK_INFO["stabilization_goal_tolerance"]))
             if self.goal_reached:
                 return True
 
@@ -976,27 +1489,29 @@ class Quadrotor(BaseAviary):
         #         return True
 
         # Done if state is out-of-bounds.
-        if self.done_on_out_of_bound:
-            if self.QUAD_TYPE == QuadType.ONE_D:
-                mask = np.array([1, 0])
-            if self.QUAD_TYPE == QuadType.TWO_D:
-                mask = np.array([1, 0, 1, 0, 1, 0])
-            if self.QUAD_TYPE == QuadType.THREE_D:
-                mask = np.array([1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 0, 0])
+        if self.done_on_out_of_bound and self.INPLACE_STEP:
+            np.less(self.state, self._state_low, out=self._out_of_bound)
+            np.greater(self.state, self._state_high, out=self._out_of_bound_high)
+            np.logical_or(self._out_of_bound, self._out_of_bound_high, out=self._out_of_bound)
+            np.logical_and(self._out_of_bound, self.OUT_OF_BOUND_MASK, out=self._out_of_bound)
+            # np.count_nonzero() does not set up a reduction, unlike .any().
+            if np.count_nonzero(self._out_of_bound) > 0:
+                return True
+        elif self.done_on_out_of_bound:
             # Element-wise or to check out-of-bound conditions.
             out_of_bound = np.logical_or(self.state < self.state_space.low, 
                                          self.state > self.state_space.high)
             # Mask out un-included dimensions (i.e. velocities)
-            out_of_bound = np.any(out_of_bound * mask)
+            out_of_bound = np.any(out_of_bound * self.OUT_OF_BOUND_MASK)
             # Early terminate if needed.
             if out_of_bound:
                 return True
 
         # IROS 2022 - Terminate episode on collision.
-        if self.DONE_ON_COLLISION and self.currently_collided:
+        if self.DONE_ON_COLLISION and np.count_nonzero(self.currently_collided) > 0:
             return True
         # IROS 2022 - Terminate episode on task completion.
-        if self.DONE_ON_COMPLETION and self.task_completed:
+        if self.DONE_ON_COMPLETION and np.count_nonzero(self.task_completed) == self.NUM_DRONES:
             return True
 
         return False
@@ -1004,135 +1519,197 @@ class Quadrotor(BaseAviary):
     def _get_info(self):
         """Generates the info dictionary returned by every call to .step().
 
+        With multiple drones, the per-drone entries (e.g. `mse`, `collision`, `current_target_gate_id`)
+        are lists (an ndarray for `mse`) with one value per drone.
+
         Returns:
             dict: A dictionary with information about the constraints evaluations and violations.
 
         """
         info = {}
-        if self.TASK == Task.STABILIZATION and self.COST == Cost.QUADRATIC:
+        if self.TASK == Task.STABILIZATION and self.COST == Cost.QUADRATIC and "goal_reached" in self.INFO_KEYS:
             info["goal_reached"] = self.goal_reached  # Add boolean flag for the goal being reached.
         # Add MSE.
-        state = deepcopy(self.state) 
-        if self.TASK == Task.STABILIZATION:
-            state_error = state - self.X_GOAL
-        elif self.TASK == Task.TRAJ_TRACKING:
-            # TODO: should use angle wrapping  
-            # state[4] = normalize_angle(state[4])
-            wp_idx = min(self.ctrl_step_counter, self.X_GOAL.shape[0]-1)
-            state_error = state - self.X_GOAL[wp_idx]
-        # Filter only relevant dimensions.
-        state_error = state_error * self.info_mse_metric_state_weight
-        info["mse"] = np.sum(state_error ** 2)
+        if "mse" in self.INFO_KEYS:
+            state = self.state
+            if self.TASK == Task.STABILIZATION:
+                goal = self.X_GOAL
+            elif self.TASK == Task.TRAJ_TRACKING:
+                # TODO: should use angle wrapping  
+                # state[4] = normalize_angle(state[4])
+                wp_idx = min(self.ctrl_step_counter, self.X_GOAL.shape[0]-1)
+                goal = self.X_GOAL[wp_idx]
+            if self.INPLACE_STEP:
+                np.subtract(state, goal, out=self._state_err)
+                np.multiply(self._state_err, self.info_mse_metric_state_weight, out=self._state_err)
+                info["mse"] = np.dot(self._state_err, self._state_err)
+            else:
+                state_error = state - goal
+                # Filter only relevant dimensions.
+                state_error = state_error * self.info_mse_metric_state_weight
+                info["mse"] = np.sum(state_error ** 2, axis=-1)
 
         # Note: constraint_values and constraint_violations populated in benchmark_env.
 
         # IROS 2022 - Per-step info.
-        # Collisions
-        # tmp1 = [p.getContactPoints(bodyA=obs_id,
-        #                            bodyB=self.DRONE_IDS[0],
-        #                            # linkIndexA=-1, linkIndexB=-1,
-        #                            physicsClientId=self.PYB_CLIENT)
-        #         for obs_id in self.OBSTACLES_IDS]
-        # tmp2 = [p.getContactPoints(bodyA=gates_id,
-        #                            bodyB=self.DRONE_IDS[0],
-        #                            # linkIndexA=-1, linkIndexB=-1,
-        #                            physicsClientId=self.PYB_CLIENT)
-        #         for gates_id in self.GATES_IDS]
-        # tmp3 = p.getContactPoints(bodyA=self.PLANE_ID,
-        #                           bodyB=self.DRONE_IDS[0],
-        #                           # linkIndexA=-1, linkIndexB=-1,
-        #                           physicsClientId=self.PYB_CLIENT)
-        # print(tmp1, tmp2, tmp3)
-        for GATE_OBS_ID in self.GATES_IDS + self.OBSTACLES_IDS + [self.PLANE_ID]:
-            ret = p.getContactPoints(bodyA=GATE_OBS_ID,
-                                     bodyB=self.DRONE_IDS[0],
-                                     # linkIndexA=-1, linkIndexB=-1,
-                                     physicsClientId=self.PYB_CLIENT)
-            if ret:
-                info["collision"] = (GATE_OBS_ID, True)
-                self.currently_collided = True
-                break  # Note: only returning the first collision per step.
-        else:
-            info["collision"] = (None, False)
-            self.currently_collided = False
-        #
-        # Gates progress (note: allow 0.5 seconds for initial drop if objects are not on the gound).
-        if self.pyb_step_counter > 0.5*self.PYB_FREQ and self.NUM_GATES > 0 and self.current_gate < self.NUM_GATES:
-            x, y, _, _, _, rot = self.EFFECTIVE_GATES_POSITIONS[self.current_gate]
-            if self.GATES[self.current_gate][6] == 0:
-                height = 1. # URDF dependent.
-            elif self.GATES[self.current_gate][6] == 1:
-                height = 0.525 # URDF dependent.
-            else:
-                raise ValueError("[ERROR] Unknown gate type.")
-            half_length = 0.1875 # Obstacle URDF dependent.
-            delta_x = 0.05*np.cos(rot)
-            delta_y = 0.05*np.sin(rot)
-            fr = [[x,y, height-half_length]]
-            to = [[x,y, height+half_length]]
-            for i in [1,2, 3]:
-                fr.append([x+i*delta_x, y+i*delta_y, height-half_length])
-                fr.append([x-i*delta_x, y-i*delta_y, height-half_length])
-                to.append([x+i*delta_x, y+i*delta_y, height+half_length])
-                to.append([x-i*delta_x, y-i*delta_y, height+half_length])
-            # for i in range(len(fr)):
-            #     p.addUserDebugLine(lineFromXYZ=fr[i],
-            #                        lineToXYZ=to[i],
-            #                        lineColorRGB=[1, 0, 0],
-            #                        lifeTime=100 * self.CTRL_TIMESTEP,
-            #                        physicsClientId=self.PYB_CLIENT)
-            rays = p.rayTestBatch(rayFromPositions=fr,
-                                  rayToPositions=to,
-                                  physicsClientId=self.PYB_CLIENT)
-            self.stepped_through_gate = False
-            for r in rays:
-                if r[2] < .9999:
-                    self.current_gate += 1
-                    self.stepped_through_gate = True
-                    break
-        if self.current_gate < self.NUM_GATES:
-            VISIBILITY_RANGE = 0.45
-            info["current_target_gate_id"] = self.current_gate
-            closest_points = p.getClosestPoints(bodyA=self.GATES_IDS[self.current_gate],
-                                                bodyB=self.DRONE_IDS[0],
-                                                distance=VISIBILITY_RANGE,
-                                                # linkIndexA=-1, linkIndexB=-1,
-                                                physicsClientId=self.PYB_CLIENT)
-            if len(closest_points) > 0:
-                info["current_target_gate_in_range"] = True
-                info["current_target_gate_pos"] = self.EFFECTIVE_GATES_POSITIONS[self.current_gate]
-            else:
-                info["current_target_gate_in_range"] = False
-                info["current_target_gate_pos"] = self.GATES[self.current_gate][0:6]
-            info["current_target_gate_type"] = self.GATES[self.current_gate][6]
-        else:
-            info["current_target_gate_id"] = -1
-            info["current_target_gate_in_range"] = False
-            info["current_target_gate_pos"] = []
-            info["current_target_gate_type"] = -1
+        # The gates progress (and the collisions, if used by the reward or termination) are tracked
+        # even if their info keys are not selected.
+        if self.CHECK_COLLISIONS:
+            self._update_collision_info(info)
+        self._update_gate_progress()
+        if self.INFO_GATE_VISIBILITY:
+            self._update_gate_visibility_info(info)
         #
         # Final goal position reached
-        info["at_goal_position"] = False
-        info["task_completed"] = False
-        if self.current_gate == self.NUM_GATES:
+        if self.INPLACE_STEP and self.TASK == Task.STABILIZATION:
+            self._update_goal_progress_inplace(info)
+            if self.FILTER_INFO:
+                info = {key: value for key, value in info.items() if key in self.INFO_KEYS}
+            return info
+        at_goal_pos = np.zeros(self.NUM_DRONES, dtype=bool)
+        task_completed = np.zeros(self.NUM_DRONES, dtype=bool)
+        finished = self.current_gate == self.NUM_GATES
+        if np.any(finished):
             if self.QUAD_TYPE == QuadType.THREE_D:
-                quad_xyz = np.array([self.state[0], self.state[2], self.state[4]])
+                quad_xyz = np.atleast_2d(self.state)[:, [0, 2, 4]]
                 goal_xyz = np.array([self.X_GOAL[0], self.X_GOAL[2], self.X_GOAL[4]])
-                if np.linalg.norm(quad_xyz - goal_xyz) < self.TASK_INFO["stabilization_goal_tolerance"]:
-                    self.at_goal_pos = True
-                    self.steps_at_goal_pos += 1
-                else:
-                    self.at_goal_pos = False
-                    self.steps_at_goal_pos = 0
-                if self.steps_at_goal_pos > self.CTRL_FREQ*2: # Remain near goal position for 2''.
-                    self.task_completed = True
-                info["at_goal_position"] = self.at_goal_pos
-                info["task_completed"] = self.task_completed
-            else:
+                near_goal = np.linalg.norm(quad_xyz - goal_xyz, axis=-1) < self.TASK_INFO["stabilization_goal_tolerance"]
+                self.at_goal_pos[finished] = near_goal[finished]
+                self.steps_at_goal_pos[finished & near_goal] += 1
+                self.steps_at_goal_pos[finished & ~near_goal] = 0
+                # Remain near goal position for 2''.
+                self.task_completed[finished & (self.steps_at_goal_pos > self.CTRL_FREQ*2)] = True
+                at_goal_pos = finished & self.at_goal_pos
+                task_completed = finished & self.task_completed
+            elif "at_goal_position" in self.INFO_KEYS or "task_completed" in self.INFO_KEYS:
                 print('[WARNING] "at_goal_position" and "task_completed" are only intended for used with the 3D quadrotor.')
+        info["at_goal_position"] = self._per_drone_info([bool(value) for value in at_goal_pos])
+        info["task_completed"] = self._per_drone_info([bool(value) for value in task_completed])
 
+        # Drop the unselected keys computed along the state updates.
+        if self.FILTER_INFO:
+            info = {key: value for key, value in info.items() if key in self.INFO_KEYS}
         return info
 
+    def _update_goal_progress_inplace(self, info):
+        """Tracks the (single) drone's time at the stabilization goal, without temporary arrays (`inplace_step`).
+
+        Args:
+            info (dict): The step's info dictionary, keys `at_goal_position` and `task_completed` are set.
+
+        """
+        at_goal_pos, task_completed = False, False
+        if self.current_gate[0] == self.NUM_GATES:
+            if self.QUAD_TYPE == QuadType.THREE_D:
+                np.take(self.state, self._xyz_idx, out=self._xyz_err)
+                np.subtract(self._xyz_err, self._goal_xyz, out=self._xyz_err)
+                near_goal = math.sqrt(np.dot(self._xyz_err, self._xyz_err)) < self.TASK_INFO["stabilization_goal_tolerance"]
+                self.at_goal_pos[0] = near_goal
+                self.steps_at_goal_pos[0] = self.steps_at_goal_pos[0] + 1 if near_goal else 0
+                # Remain near goal position for 2''.
+                if self.steps_at_goal_pos[0] > self.CTRL_FREQ*2:
+                    self.task_completed[0] = True
+                at_goal_pos, task_completed = bool(self.at_goal_pos[0]), bool(self.task_completed[0])
+            elif "at_goal_position" in self.INFO_KEYS or "task_completed" in self.INFO_KEYS:
+                print('[WARNING] "at_goal_position" and "task_completed" are only intended for used with the 3D quadrotor.')
+        info["at_goal_position"] = at_goal_pos
+        info["task_completed"] = task_completed
+
+    def _per_drone_info(self, values):
+        """Formats a per-drone info entry, a single value unless there are multiple drones.
+
+        Args:
+            values (list): The entry's value for each drone.
+
+        Returns:
+            Any: The value of the only drone, or the list of values.
+
+        """
+        return values[0] if self.NUM_DRONES == 1 else values
+
+    def _update_collision_info(self, info):
+        """Checks the drones' collisions with the gates, obstacles, ground plane and each other (IROS 2022).
+
+        Only the first collision per step and drone is reported, gates first, then obstacles, the plane and drones.
+        A single contact query per drone, skipped if the drone is away from all the maze's bounding boxes and drones.
+
+        Args:
+            info (dict): The step's info dictionary, key `collision` is set.
+
+        """
+        collisions = []
+        for i, drone_id in enumerate(self.DRONE_IDS):
+            collided_id = None
+            if not self.COLLISION_BROADPHASE or self._near_maze_bodies(i):
+                self._sync_pybullet_state()
+                contacts = p.getContactPoints(bodyA=drone_id, physicsClientId=self.PYB_CLIENT)
+                collided_ids = [contact[2] for contact in contacts if contact[2] in self.MAZE_BODIES]
+                if collided_ids:
+                    collided_id = min(collided_ids, key=self.MAZE_BODIES.get)
+            self.currently_collided[i] = collided_id is not None
+            collisions.append((collided_id, collided_id is not None))
+        info["collision"] = self._per_drone_info(collisions)
+
+    def _update_gate_progress(self):
+        """Advances each drone's current gate if it flew through it since the last step (IROS 2022).
+
+        Note: allows 0.5 seconds for the initial drop if objects are not on the ground.
+
+        """
+        if self.pyb_step_counter > 0.5*self.PYB_FREQ and self.NUM_GATES > 0:
+            for i in np.flatnonzero(self.current_gate < self.NUM_GATES):
+                self.stepped_through_gate[i] = self._crossed_gate(self.current_gate[i], self.prev_drone_pos[i], self.pos[i])
+                if self.stepped_through_gate[i]:
+                    self.current_gate[i] += 1
+        if self.INPLACE_STEP:
+            np.copyto(self.prev_drone_pos, self.pos)
+        else:
+            self.prev_drone_pos = self.pos.copy()
+
+    def _update_gate_visibility_info(self, info):
+        """Adds each drone's current target gate's id, type and (nominal, or exact if in range) pose (IROS 2022).
+
+        Args:
+            info (dict): The step's info dictionary, keys `current_target_gate_*` are set.
+
+        """
+        visibility = [self._get_gate_visibility(i) for i in range(self.NUM_DRONES)]
+        for key, values in zip(self.GATE_VISIBILITY_INFO_KEYS, zip(*visibility)):
+            info[key] = self._per_drone_info(list(values))
+
+    def _get_gate_visibility(self, nth_drone):
+        """Returns a drone's current target gate's id, whether it is in range, its pose and its type.
+
+        Args:
+            nth_drone (int): The ordinal number/position of the desired drone in list self.DRONE_IDS.
+
+        Returns:
+            tuple: The values of the `current_target_gate_*` info keys (in GATE_VISIBILITY_INFO_KEYS order).
+
+        """
+        current_gate = int(self.current_gate[nth_drone])
+        if current_gate >= self.NUM_GATES:
+            return -1, False, [], -1
+        VISIBILITY_RANGE = 0.45
+        pos = self.pos[nth_drone]
+        # Only query the closest points if the drone is near the gate's (cached) bounding box.
+        aabb_min, aabb_max = self.GATES_AABBS[current_gate]
+        aabb_dist = np.linalg.norm(np.maximum(np.maximum(aabb_min - pos, pos - aabb_max), 0))
+        in_range = False
+        if aabb_dist <= VISIBILITY_RANGE + self.DRONE_BOUNDING_RADIUS:
+            self._sync_pybullet_state()
+            closest_points = p.getClosestPoints(bodyA=self.GATES_IDS[current_gate],
+                                                bodyB=self.DRONE_IDS[nth_drone],
+                                                distance=VISIBILITY_RANGE,
+                                                # linkIndexA=-1, linkIndexB=-1,
+                                                physicsClientId=self.PYB_CLIENT)
+            in_range = len(closest_points) > 0
+        if in_range:
+            gate_pos = self.EFFECTIVE_GATES_POSITIONS[current_gate]
+        else:
+            gate_pos = self.GATES[current_gate][0:6]
+        return current_gate, in_range, gate_pos, self.GATES[current_gate][6]
+
     def _get_reset_info(self):
         """Generates the info dictionary returned by every call to .reset().
 
@@ -1198,5 +1775,6 @@ class Quadrotor(BaseAviary):
         # INFO 2022 - Debugging.
         info["urdf_dir"] = self.URDF_DIR
         info["pyb_client"] = self.PYB_CLIENT
+        info["headless"] = self.HEADLESS
 
         return info
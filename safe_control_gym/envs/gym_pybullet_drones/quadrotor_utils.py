@@ -23,9 +23,10 @@ def cmd2pwm(thrust, pwm2rpm_scale, pwm2rpm_const, ct, pwm_min, pwm_max):
 
     For 1D, thrust is the total of all 4 motors; for 2D, 1st thrust is total of motor
     1 & 4, 2nd thrust is total of motor 2 & 3; for 4D, thrust is thrust of each motor.
+    Leading dimensions, e.g. one per drone, are preserved.
 
     Args:
-        thrust (ndarray): array of length 1, 2 containing target thrusts.
+        thrust (ndarray): (..., 1), (..., 2) or (..., 4)-shaped array containing target thrusts.
         pwm2rpm_scale (float): scaling factor between PWM and RPMs.
         pwm2rpm_const (float): constant factor between PWM and RPMs.
         ct (float): torque coefficient.
@@ -33,20 +34,20 @@ def cmd2pwm(thrust, pwm2rpm_scale, pwm2rpm_const, ct, pwm_min, pwm_max):
         pwm_max (float): pwm upper bound.
 
     Returns:
-        ndarray: array of length 4 containing PWM.
+        ndarray: (..., 4)-shaped array containing PWM.
 
     """
-    n_motor = 4 // int(thrust.size)
+    thrust = np.atleast_1d(thrust)
+    thrust_dim = thrust.shape[-1]
+    if thrust_dim not in [1, 2, 4]:
+        raise ValueError("Input action shape not supported.")
+    n_motor = 4 // thrust_dim
     thrust = np.clip(thrust, np.zeros_like(thrust), None)  # Make sure thrust is not negative.
     motor_pwm = (np.sqrt(thrust / n_motor / ct) - pwm2rpm_const) / pwm2rpm_scale
-    if thrust.size == 1:  # 1D case.
-        motor_pwm = np.repeat(motor_pwm, 4)
-    elif thrust.size == 2:  # 2D case.
-        motor_pwm = np.concatenate([motor_pwm, motor_pwm[::-1]], 0)
-    elif thrust.size == 4:  # 3D case.
-        motor_pwm = np.array(motor_pwm)
-    else:
-        raise ValueError("Input action shape not supported.")
+    if thrust_dim == 1:  # 1D case.
+        motor_pwm = np.repeat(motor_pwm, 4, axis=-1)
+    elif thrust_dim == 2:  # 2D case.
+        motor_pwm = np.concatenate([motor_pwm, motor_pwm[..., ::-1]], -1)
     motor_pwm = np.clip(motor_pwm, pwm_min, pwm_max)
     return motor_pwm
 
@@ -67,6 +68,91 @@ def pwm2rpm(pwm, pwm2rpm_scale, pwm2rpm_const):
     return rpm
 
 
+class RandomizationSchedule():
+    """Per-episode randomization values, pre-drawn in blocks of episodes from counter-based seeds.
+
+    The values of episode e are drawn together with those of the other episodes of its block, e // block_size,
+    by a generator seeded with (seed, e // block_size). They only depend on the seed and the episode's index,
+    not on the order (or the process) in which the episodes are run. A schedule built from exported values
+    (see `export()`) replays them exactly, e.g. in another process or with another version of numpy.
+
+    """
+
+    def __init__(self,
+                 sampler=None,
+                 seed=0,
+                 block_size=100,
+                 exported=None
+                 ):
+        """Initializes the schedule.
+
+        Args:
+            sampler (Callable, optional): sampler(rng, num_episodes) returns a dict of arrays with a leading
+                                          (num_episodes,) dimension, the values of consecutive episodes.
+            seed (int, optional): The seed of the schedule.
+            block_size (int, optional): The number of episodes drawn at once.
+            exported (dict, optional): Values returned by `export()` (or loaded from its .npz file) to replay,
+                                       instead of a sampler.
+
+        """
+        if exported is not None:
+            exported = dict(exported)
+            self.first_episode = int(exported.pop("first_episode"))
+            self.values = {key: np.asarray(value) for key, value in exported.items()}
+            self.num_episodes = len(next(iter(self.values.values()))) if self.values else 0
+        elif sampler is None:
+            raise ValueError("[ERROR] in RandomizationSchedule.__init__(), a sampler or exported values are required.")
+        else:
+            self.values = None
+        self.sampler = sampler
+        self.seed = seed
+        self.block_size = block_size
+        self.block = None
+        self.block_index = None
+
+    def get(self,
+            episode
+            ):
+        """Gets the values of an episode.
+
+        Args:
+            episode (int): The index of the episode (from 0).
+
+        Returns:
+            dict: The arrays of randomized values of the episode.
+
+        """
+        if self.values is not None:
+            row = episode - self.first_episode
+            if not 0 <= row < self.num_episodes:
+                raise ValueError("[ERROR] in RandomizationSchedule.get(), episode {} is not in the replayed schedule.".format(episode))
+            return {key: value[row] for key, value in self.values.items()}
+        block_index, row = divmod(episode, self.block_size)
+        if block_index != self.block_index:
+            self.block = self.sampler(np.random.default_rng([self.seed, block_index]), self.block_size)
+            self.block_index = block_index
+        return {key: value[row] for key, value in self.block.items()}
+
+    def export(self,
+               num_episodes,
+               first_episode=0
+               ):
+        """Exports the values of consecutive episodes, e.g. to save them with `np.savez()`.
+
+        Args:
+            num_episodes (int): The number of episodes.
+            first_episode (int, optional): The index of the first exported episode.
+
+        Returns:
+            dict: The arrays of values, with a leading (num_episodes,) dimension, and `first_episode`.
+
+        """
+        episodes = [self.get(episode) for episode in range(first_episode, first_episode + num_episodes)]
+        exported = {key: np.stack([values[key] for values in episodes]) for key in episodes[0]}
+        exported["first_episode"] = np.array(first_episode)
+        return exported
+
+
 class PIDController():
     """PID control class for Crazyflies.
 
@@ -1,8 +1,9 @@
 """Perform normalization on inputs or rewards.
 
 """
+import sys
+
 import numpy as np
-import torch
 
 from gymnasium.spaces import Box
 
@@ -203,7 +204,9 @@ class RescaleNormalizer(BaseNormalizer):
         """Scale the input.
 
         """
-        if not isinstance(x, torch.Tensor):
+        # Avoid importing torch (slow) in the environments, an input can only be a tensor if it is loaded.
+        torch = sys.modules.get("torch")
+        if torch is None or not isinstance(x, torch.Tensor):
             x = np.asarray(x)
         return self.coef * x
 
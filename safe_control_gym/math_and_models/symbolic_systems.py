@@ -15,15 +15,25 @@ class SymbolicModel():
         * naming convention on symbolic variable and functions. 
             * for single-letter symbol, use {}_sym, otherwise use underscore for delimiter.
             * for symbolic functions to be exposed, use {}_func.
+        * the linearized model and the cost derivatives (LINEARIZATION_ATTRIBUTES) are only set up
+          on the first access to one of them, see `setup_linearization()`.
+        * integration_algo 'rk4' ('rk4_multi') discretizes the dynamics with one (integration_substeps)
+          explicit RK4 step(s) per dt, any other value is passed to `cs.integrator` (e.g. 'cvodes').
 
     """
+    LINEARIZATION_ATTRIBUTES = frozenset([
+        'dfdx', 'dfdu', 'df_func', 'dgdx', 'dgdu', 'dg_func', 'x_eval', 'u_eval',
+        'x_dot_linear', 'fc_linear_func', 'fd_linear_func', 'y_linear', 'g_linear_func',
+        'l_x', 'l_xx', 'l_u', 'l_uu', 'l_xu', 'loss'
+    ])
 
     def __init__(self,
                  dynamics,
                  cost,
                  dt=1e-3,
                  integration_algo='cvodes',
-                 funcs=None):
+                 funcs=None,
+                 integration_substeps=4):
         """
 
         """
@@ -39,6 +49,8 @@ class SymbolicModel():
         self.dt = dt
         # Integration algorithm.
         self.integration_algo = integration_algo
+        self.integration_substeps = integration_substeps if integration_algo == 'rk4_multi' else 1
+        self._batch_funcs = {}
         # Other symbolic functions.
         if funcs is not None:
             for name, func in funcs.items():
@@ -57,8 +69,15 @@ class SymbolicModel():
         self.Ur = cost["vars"]["Ur"]
         # Setup symbolic model.
         self.setup_model()
-        # Setup Jacobian and Hessian of the dynamics and cost functions.
+
+    def __getattr__(self, name):
+        """Sets up the Jacobian and Hessian of the dynamics and cost functions on first access.
+
+        """
+        if name not in SymbolicModel.LINEARIZATION_ATTRIBUTES:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
         self.setup_linearization()
+        return self.__dict__[name]
 
     def setup_model(self):
         """Exposes functions to evaluate the model.
@@ -67,10 +86,13 @@ class SymbolicModel():
         # Continuous time dynamics.
         self.fc_func = cs.Function('fc', [self.x_sym, self.u_sym], [self.x_dot], ['x', 'u'], ['f'])
         # Discrete time dynamics.
-        self.fd_func = cs.integrator('fd', self.integration_algo, {'x': self.x_sym,
-                                                                   'p': self.u_sym,
-                                                                   'ode': self.x_dot}, {'tf': self.dt}
-                                    )
+        if self.integration_algo in ['rk4', 'rk4_multi']:
+            self.fd_func = self.rk4_integrator('fd', self.fc_func, self.nx, self.nu)
+        else:
+            self.fd_func = cs.integrator('fd', self.integration_algo, {'x': self.x_sym,
+                                                                       'p': self.u_sym,
+                                                                       'ode': self.x_dot}, {'tf': self.dt}
+                                        )
         # Observation model.
         self.g_func = cs.Function('g', [self.x_sym, self.u_sym], [self.y_sym], ['x', 'u'], ['g'])
 
@@ -98,12 +120,19 @@ class SymbolicModel():
         self.fc_linear_func = cs.Function(
             'fc', [self.x_eval, self.u_eval, self.x_sym, self.u_sym],
             [self.x_dot_linear], ['x_eval', 'u_eval', 'x', 'u'], ['f_linear'])
-        self.fd_linear_func = cs.integrator(
-            'fd_linear', self.integration_algo, {
-                'x': self.x_eval,
-                'p': cs.vertcat(self.u_eval, self.x_sym, self.u_sym),
-                'ode': self.x_dot_linear
-            }, {'tf': self.dt})
+        if self.integration_algo in ['rk4', 'rk4_multi']:
+            nx, nu = self.nx, self.nu
+            self.fd_linear_func = self.rk4_integrator(
+                'fd_linear',
+                lambda x, p: self.fc_linear_func(x, p[:nu], p[nu:nu + nx], p[nu + nx:]),
+                nx, 2 * nu + nx)
+        else:
+            self.fd_linear_func = cs.integrator(
+                'fd_linear', self.integration_algo, {
+                    'x': self.x_eval,
+                    'p': cs.vertcat(self.u_eval, self.x_sym, self.u_sym),
+                    'ode': self.x_dot_linear
+                }, {'tf': self.dt})
         # Linearized observation model.
         self.y_linear = self.y_sym + self.dgdx @ (
             self.x_eval - self.x_sym) + self.dgdu @ (self.u_eval - self.u_sym)
@@ -121,3 +150,44 @@ class SymbolicModel():
         l_outputs = [self.cost_func, self.l_x, self.l_xx, self.l_u, self.l_uu, self.l_xu]
         l_outputs_str = ['l', 'l_x', 'l_xx', 'l_u', 'l_uu', 'l_xu']
         self.loss = cs.Function('loss', l_inputs, l_outputs, l_inputs_str, l_outputs_str)
+
+    def rk4_integrator(self, name, ode, nx, n_p):
+        """Explicit RK4 discretization over dt, with the x0, p -> xf interface of `cs.integrator`.
+
+        Args:
+            name (str): The name of the CasADi function.
+            ode (Callable): The continuous time dynamics, x_dot = ode(x, p).
+            nx (int): The state dimension.
+            n_p (int): The parameter (e.g. input) dimension.
+
+        Returns:
+            cs.Function: The state after dt, xf = F(x0, p).
+
+        """
+        x0 = cs.MX.sym('x0', nx)
+        p = cs.MX.sym('p', n_p)
+        h = self.dt / self.integration_substeps
+        x = x0
+        for _ in range(self.integration_substeps):
+            k1 = ode(x, p)
+            k2 = ode(x + h / 2 * k1, p)
+            k3 = ode(x + h / 2 * k2, p)
+            k4 = ode(x + h * k3, p)
+            x = x + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        return cs.Function(name, [x0, p], [x], ['x0', 'p'], ['xf'])
+
+    def fd_batch_func(self, num_samples, parallelization='serial'):
+        """Discrete time dynamics of a batch, built once per batch size with `fd_func.map()`.
+
+        Args:
+            num_samples (int): The number of (state, input) pairs, stacked as columns of x0 and p.
+            parallelization (str): The evaluation of the map, 'serial', 'unroll' or 'openmp'.
+
+        Returns:
+            cs.Function: The (nx, num_samples)-shaped states after dt, xf = F(x0, p).
+
+        """
+        key = (num_samples, parallelization)
+        if key not in self._batch_funcs:
+            self._batch_funcs[key] = self.fd_func.map(num_samples, parallelization)
+        return self._batch_funcs[key]
@@ -195,3 +195,86 @@ def RotXYZ(phi, theta,psi):
     """
     R = csRotXYZ(phi, theta, psi).toarray()
     return R
+
+def euler_to_quat(rpy):
+    """Quaternion(s) from roll, pitch, yaw angles, following PyBullet's `getQuaternionFromEuler`.
+
+    Args:
+      rpy: (..., 3)-shaped array of roll, pitch, yaw angles.
+
+    Returns:
+      quat: (..., 4)-shaped array of quaternions in PyBullet's (x, y, z, w) order.
+    """
+    rpy = np.asarray(rpy, dtype=np.float64)
+    half = 0.5 * rpy
+    c = np.cos(half)
+    s = np.sin(half)
+    cr, cp, cy = c[..., 0], c[..., 1], c[..., 2]
+    sr, sp, sy = s[..., 0], s[..., 1], s[..., 2]
+    quat = np.stack([sr * cp * cy - cr * sp * sy,
+                     cr * sp * cy + sr * cp * sy,
+                     cr * cp * sy - sr * sp * cy,
+                     cr * cp * cy + sr * sp * sy], axis=-1)
+    return quat
+
+def quat_to_euler(quat):
+    """Roll, pitch, yaw angles from quaternion(s), following PyBullet's `getEulerFromQuaternion`.
+
+    Args:
+      quat: (..., 4)-shaped array of quaternions in PyBullet's (x, y, z, w) order.
+
+    Returns:
+      rpy: (..., 3)-shaped array of roll, pitch, yaw angles.
+    """
+    quat = np.asarray(quat, dtype=np.float64)
+    x, y, z, w = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+    sqx, sqy, sqz, sqw = x * x, y * y, z * z, w * w
+    sarg = -2. * (x * z - w * y)
+    roll = np.arctan2(2. * (y * z + w * x), sqw - sqx - sqy + sqz)
+    pitch = np.arcsin(np.clip(sarg, -1., 1.))
+    yaw = np.arctan2(2. * (x * y + w * z), sqw + sqx - sqy - sqz)
+    # Gimbal lock, same special cases as PyBullet.
+    low = sarg <= -0.99999
+    high = sarg >= 0.99999
+    roll = np.where(low | high, 0., roll)
+    pitch = np.where(low, -0.5 * np.pi, np.where(high, 0.5 * np.pi, pitch))
+    yaw = np.where(low, 2. * np.arctan2(x, -y), np.where(high, 2. * np.arctan2(-x, y), yaw))
+    return np.stack([roll, pitch, yaw], axis=-1)
+
+def quat_multiply(quat_a, quat_b):
+    """Hamilton product(s) of quaternions, i.e. the rotation quat_b followed by quat_a.
+
+    Args:
+      quat_a: (..., 4)-shaped array of quaternions in PyBullet's (x, y, z, w) order.
+      quat_b: (..., 4)-shaped array of quaternions in PyBullet's (x, y, z, w) order.
+
+    Returns:
+      quat: (..., 4)-shaped array of the products quat_a * quat_b.
+    """
+    x1, y1, z1, w1 = quat_a[..., 0], quat_a[..., 1], quat_a[..., 2], quat_a[..., 3]
+    x2, y2, z2, w2 = quat_b[..., 0], quat_b[..., 1], quat_b[..., 2], quat_b[..., 3]
+    return np.stack([w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+                     w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+                     w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+                     w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2], axis=-1)
+
+def quat_to_rot(quat):
+    """Rotation matrix (or matrices) from quaternion(s), following PyBullet's `getMatrixFromQuaternion`.
+
+    Args:
+      quat: (..., 4)-shaped array of quaternions in PyBullet's (x, y, z, w) order.
+
+    Returns:
+      R: (..., 3, 3)-shaped array of rotation matrices (body to world frame).
+    """
+    quat = np.asarray(quat, dtype=np.float64)
+    x, y, z, w = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+    s = 2. / np.sum(quat * quat, axis=-1)
+    xs, ys, zs = x * s, y * s, z * s
+    wx, wy, wz = w * xs, w * ys, w * zs
+    xx, xy, xz = x * xs, x * ys, x * zs
+    yy, yz, zz = y * ys, y * zs, z * zs
+    R = np.stack([1. - (yy + zz), xy - wz, xz + wy,
+                  xy + wz, 1. - (xx + zz), yz - wx,
+                  xz - wy, yz + wx, 1. - (xx + yy)], axis=-1)
+    return R.reshape(quat.shape[:-1] + (3, 3))
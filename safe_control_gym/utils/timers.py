@@ -0,0 +1,132 @@
+"""Low-overhead wall-clock timers aggregating per-phase histograms.
+
+Used to instrument the phases of an environment's step (see `BaseAviary(step_timers=True)`).
+
+"""
+import time
+
+import numpy as np
+
+
+class PhaseTimers:
+    """Collects the durations of named phases into fixed, log-spaced histograms.
+
+    Timed functions are wrapped once (`wrap()`), durations are buffered in lists and
+    aggregated with numpy every `flush_size` calls, so the per-call overhead is two
+    `time.perf_counter_ns()` calls and a list append.
+
+    """
+
+    def __init__(self,
+                 bin_edges_ns=None,
+                 flush_size=4096
+                 ):
+        """Initializes empty timers.
+
+        Args:
+            bin_edges_ns (ndarray, optional): The histograms' bin edges in nanoseconds, defaults to
+                                              10 bins per decade between 100 ns and 1 s.
+            flush_size (int, optional): The number of buffered durations per phase before aggregation.
+
+        """
+        if bin_edges_ns is None:
+            bin_edges_ns = np.logspace(2, 9, 71)
+        self.bin_edges_ns = np.asarray(bin_edges_ns, dtype=float)
+        self.flush_size = flush_size
+        self._pending = {}
+        self._stats = {}
+
+    def wrap(self,
+             phase,
+             func
+             ):
+        """Returns a version of `func` that records its duration under `phase`.
+
+        Args:
+            phase (str): The name of the timed phase.
+            func (Callable): The function (or bound method) to time.
+
+        Returns:
+            Callable: The timed function.
+
+        """
+        pending = self._pending.setdefault(phase, [])
+        record = pending.append
+        clock = time.perf_counter_ns
+        flush_size = self.flush_size
+        flush = self._flush
+
+        def timed(*args, **kwargs):
+            start = clock()
+            result = func(*args, **kwargs)
+            record(clock() - start)
+            if len(pending) >= flush_size:
+                flush(phase)
+            return result
+
+        return timed
+
+    def record(self,
+               phase,
+               duration_ns
+               ):
+        """Records a duration measured by the caller.
+
+        Args:
+            phase (str): The name of the timed phase.
+            duration_ns (int): The duration in nanoseconds.
+
+        """
+        pending = self._pending.setdefault(phase, [])
+        pending.append(duration_ns)
+        if len(pending) >= self.flush_size:
+            self._flush(phase)
+
+    def reset(self):
+        """Discards all the recorded durations, keeping the wrapped functions valid.
+
+        """
+        for pending in self._pending.values():
+            pending.clear()
+        self._stats = {}
+
+    def summary(self):
+        """Aggregates the recorded durations.
+
+        Returns:
+            dict: For each phase with recorded durations, a dictionary with its `count`, `total_ns`,
+                  `mean_ns`, `min_ns`, `max_ns`, histogram `counts` and `bin_edges_ns` (values outside
+                  the edges are counted in the first/last bin).
+
+        """
+        for phase in self._pending:
+            self._flush(phase)
+        summary = {}
+        for phase, stats in self._stats.items():
+            summary[phase] = dict(stats,
+                                  mean_ns=stats["total_ns"] / stats["count"],
+                                  counts=stats["counts"].copy(),
+                                  bin_edges_ns=self.bin_edges_ns)
+        return summary
+
+    def _flush(self,
+               phase
+               ):
+        """Aggregates the buffered durations of a phase into its statistics and histogram.
+
+        """
+        pending = self._pending[phase]
+        if not pending:
+            return
+        durations = np.array(pending, dtype=float)
+        pending.clear()
+        clipped = np.clip(durations, self.bin_edges_ns[0], self.bin_edges_ns[-1])
+        counts, _ = np.histogram(clipped, bins=self.bin_edges_ns)
+        if phase not in self._stats:
+            self._stats[phase] = {"count": 0, "total_ns": 0., "min_ns": np.inf, "max_ns": 0., "counts": np.zeros_like(counts)}
+        stats = self._stats[phase]
+        stats["count"] += durations.size
+        stats["total_ns"] += durations.sum()
+        stats["min_ns"] = min(stats["min_ns"], durations.min())
+        stats["max_ns"] = max(stats["max_ns"], durations.max())
+        stats["counts"] += counts
@@ -0,0 +1,226 @@
+"""Streaming video recording of environment frames.
+
+Frames are copied into a fixed ring buffer and a background thread pipes them to an encoder
+subprocess (ffmpeg), so the memory used by a recording does not grow with its length and the
+encoding does not block the control loop.
+
+"""
+import os
+import shutil
+import subprocess
+import threading
+from contextlib import nullcontext
+
+import numpy as np
+
+
+def find_ffmpeg():
+    """Returns the path of an ffmpeg executable (on the PATH, or bundled with `imageio-ffmpeg`).
+
+    Returns:
+        str: The path of the executable, or None if ffmpeg is not available.
+
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        try:
+            import imageio_ffmpeg
+            ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+        except (ImportError, RuntimeError):
+            pass
+    return ffmpeg
+
+
+def make_eval_video_recorder(video_config,
+                             path
+                             ):
+    """Creates the recorder of an evaluation from a controller's `eval_video` config.
+
+    Args:
+        video_config (dict): the keyword arguments of `VideoRecorder` (e.g. fps, capture_every, width,
+                             height), or None not to record.
+        path (str): the path of the video.
+
+    Returns:
+        VideoRecorder/nullcontext: a context manager yielding the recorder (or None), closing it on exit.
+
+    """
+    if video_config is None:
+        return nullcontext()
+    return VideoRecorder(path, **video_config)
+
+
+class VideoRecorder:
+    """Streams RGB frames to an encoder subprocess through a ring buffer.
+
+    The buffer (and the encoder) are created with the first frame, whose shape all the following
+    frames must have. When the buffer is full, `write()` waits for the encoder thread to free a slot.
+
+    """
+
+    def __init__(self,
+                 path,
+                 fps=20,
+                 buffer_size=16,
+                 capture_every=1,
+                 width=None,
+                 height=None,
+                 encoder_cmd=None
+                 ):
+        """Initializes the recorder, the encoder is started with the first frame.
+
+        Args:
+            path (str): The path of the video (.mp4 or .gif).
+            fps (int, optional): The frames per second of the video.
+            buffer_size (int, optional): The number of frames in the ring buffer.
+            capture_every (int, optional): `capture()` renders one frame every `capture_every` calls.
+            width (int, optional): The width of the frames rendered by `capture()`.
+            height (int, optional): The height of the frames rendered by `capture()`.
+            encoder_cmd (list, optional): The command of the encoder, reading raw rgb24 frames from
+                                          its stdin, defaults to ffmpeg (`{width}`, `{height}` and
+                                          `{fps}` in its arguments are formatted).
+
+        """
+        if not path.endswith((".mp4", ".gif")):
+            raise ValueError("[ERROR] in VideoRecorder.__init__(), invalid video name (.mp4 or .gif).")
+        if buffer_size < 1 or capture_every < 1:
+            raise ValueError("[ERROR] in VideoRecorder.__init__(), buffer_size and capture_every must be positive.")
+        self.path = path
+        self.fps = fps
+        self.buffer_size = buffer_size
+        self.capture_every = capture_every
+        self.width = width
+        self.height = height
+        self.encoder_cmd = encoder_cmd
+        self.num_captures = 0
+        self.num_frames = 0
+        self.buffer = None
+        self.process = None
+        self.thread = None
+        self.error = None
+        self.closed = False
+        # Frames [encoded, written) are in the buffer, at index `frame % buffer_size`.
+        self._encoded = 0
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def capture(self,
+                env
+                ):
+        """Renders and writes a frame of the environment, once every `capture_every` calls.
+
+        Args:
+            env (BenchmarkEnv): The environment (or a wrapper of it), rendering with `capture_frame()`
+                                if it has it (`BaseAviary`), `render("rgb_array")` otherwise.
+
+        """
+        self.num_captures += 1
+        if (self.num_captures - 1) % self.capture_every != 0:
+            return
+        env = getattr(env, "unwrapped", env)
+        if hasattr(env, "capture_frame"):
+            self.write(env.capture_frame(width=self.width, height=self.height))
+        else:
+            self.write(env.render("rgb_array"))
+
+    def write(self,
+              frame
+              ):
+        """Copies a frame into the ring buffer, waiting for a free slot if it is full.
+
+        Args:
+            frame (ndarray): The (H,W,3) RGB or (H,W,4) RGBA frame.
+
+        """
+        if self.closed:
+            raise RuntimeError("[ERROR] in VideoRecorder.write(), the recorder is closed.")
+        frame = np.asarray(frame)
+        if self.buffer is None:
+            self._start(frame.shape[0], frame.shape[1])
+        if frame.shape[:2] != self.buffer.shape[1:3]:
+            raise ValueError("[ERROR] in VideoRecorder.write(), all frames must have the same shape.")
+        with self._condition:
+            while self.num_frames - self._encoded >= self.buffer_size and self.error is None:
+                self._condition.wait()
+        if self.error is not None:
+            raise RuntimeError("[ERROR] in VideoRecorder.write(), the encoder failed.") from self.error
+        self.buffer[self.num_frames % self.buffer_size] = frame[..., :3]
+        with self._condition:
+            self.num_frames += 1
+            self._condition.notify_all()
+
+    def close(self):
+        """Waits for the buffered frames to be encoded and terminates the encoder.
+
+        """
+        if self.closed:
+            return
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+        if self.thread is None:
+            return
+        self.thread.join()
+        try:
+            # Flushes the pipe, which fails if the encoder already exited.
+            self.process.stdin.close()
+        except OSError as error:
+            if self.error is None:
+                self.error = error
+        returncode = self.process.wait()
+        if self.error is not None:
+            raise RuntimeError("[ERROR] in VideoRecorder.close(), the encoder failed.") from self.error
+        if returncode != 0:
+            raise RuntimeError("[ERROR] in VideoRecorder.close(), the encoder exited with code {}.".format(returncode))
+
+    def _start(self,
+               height,
+               width
+               ):
+        """Allocates the ring buffer and starts the encoder subprocess and thread.
+
+        """
+        cmd = self.encoder_cmd
+        if cmd is None:
+            ffmpeg = find_ffmpeg()
+            if ffmpeg is None:
+                raise RuntimeError("[ERROR] in VideoRecorder._start(), ffmpeg not found (install it or imageio-ffmpeg).")
+            cmd = [ffmpeg, "-loglevel", "error", "-y",
+                   "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", "{width}x{height}", "-r", "{fps}", "-i", "-"]
+            if self.path.endswith(".mp4"):
+                # H.264 with yuv420p requires even dimensions.
+                cmd += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p"]
+            cmd += [self.path]
+        cmd = [str(arg).format(width=width, height=height, fps=self.fps) for arg in cmd]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.buffer = np.empty((self.buffer_size, height, width, 3), dtype=np.uint8)
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        self.thread = threading.Thread(target=self._encode, daemon=True)
+        self.thread.start()
+
+    def _encode(self):
+        """Background loop piping the buffered frames to the encoder.
+
+        """
+        try:
+            while True:
+                with self._condition:
+                    while self._encoded == self.num_frames and not self.closed:
+                        self._condition.wait()
+                    if self._encoded == self.num_frames:
+                        return
+                    frame = self.buffer[self._encoded % self.buffer_size]
+                # The slot is only reused once `_encoded` is incremented.
+                self.process.stdin.write(memoryview(frame).cast("B"))
+                with self._condition:
+                    self._encoded += 1
+                    self._condition.notify_all()
+        except Exception as error:
+            with self._condition:
+                self.error = error
+                self._condition.notify_all()
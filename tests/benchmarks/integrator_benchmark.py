@@ -0,0 +1,69 @@
+"""Benchmark of the discretizations of the quadrotor's symbolic dynamics (`SymbolicModel.fd_func`).
+
+Compares the CVODES integrator with the explicit RK4 ones ('rk4' and 'rk4_multi') on the 1D, 2D
+and 3D quadrotor. Reports the maximum state error after one control step (w.r.t. RK4 with 256
+substeps) on random states and inputs around hover, and the evaluations/sec of single calls
+and of batched calls (`fd_batch_func()`).
+
+Example:
+
+    $ python3 integrator_benchmark.py --num_samples 1000
+
+"""
+import argparse
+import time
+import numpy as np
+
+from safe_control_gym.math_and_models.symbolic_systems import SymbolicModel
+from safe_control_gym.utils.registration import make
+
+QUAD_TYPES = {1: [0, 1], 2: [0, 1], 3: [0, 0, 1]}
+ALGOS = [('cvodes', 1), ('rk4', 1), ('rk4_multi', 4)]
+
+
+def rebuild(model, integration_algo, integration_substeps):
+    """Same symbolic model as `model` with another discretization.
+
+    """
+    dynamics = {'dyn_eqn': model.x_dot, 'obs_eqn': model.y_sym, 'vars': {'X': model.x_sym, 'U': model.u_sym}}
+    cost = {'cost_func': model.cost_func, 'vars': {'X': model.x_sym, 'U': model.u_sym, 'Xr': model.Xr,
+                                                   'Ur': model.Ur, 'Q': model.Q, 'R': model.R}}
+    return SymbolicModel(dynamics=dynamics, cost=cost, dt=model.dt, integration_algo=integration_algo,
+                         integration_substeps=integration_substeps)
+
+
+def run(num_samples=1000):
+    """Prints the accuracy and throughput of each discretization for each quad type.
+
+    """
+    print('{:6s} {:12s} {:>12s} {:>14s} {:>14s}'.format('quad', 'algo', 'max error', 'evals/s', 'evals/s batch'))
+    rng = np.random.default_rng(0)
+    for quad_type, goal in QUAD_TYPES.items():
+        env = make('quadrotor', quad_type=quad_type, gui=False,
+                   task_info={'stabilization_goal': goal, 'stabilization_goal_tolerance': 0.05})
+        model = env.symbolic
+        x0 = rng.uniform(-0.5, 0.5, (model.nx, num_samples))
+        p = np.tile(env.U_GOAL[:, None], (1, num_samples)) * rng.uniform(0.8, 1.2, (model.nu, num_samples))
+        reference = rebuild(model, 'rk4_multi', 256).fd_batch_func(num_samples)(x0=x0, p=p)['xf'].full()
+        for integration_algo, integration_substeps in ALGOS:
+            variant = rebuild(model, integration_algo, integration_substeps)
+            start = time.perf_counter()
+            xf = np.hstack([variant.fd_func(x0=x0[:, i], p=p[:, i])['xf'].full() for i in range(num_samples)])
+            evals_per_sec = num_samples / (time.perf_counter() - start)
+            batch_func = variant.fd_batch_func(num_samples)
+            batch_func(x0=x0, p=p)
+            start = time.perf_counter()
+            xf_batch = batch_func(x0=x0, p=p)['xf'].full()
+            batch_evals_per_sec = num_samples / (time.perf_counter() - start)
+            assert np.allclose(xf, xf_batch)
+            print('{:6s} {:12s} {:12.2e} {:14.0f} {:14.0f}'.format('{}D'.format(quad_type), integration_algo,
+                                                                  np.abs(xf - reference).max(),
+                                                                  evals_per_sec, batch_evals_per_sec))
+        env.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num_samples', type=int, default=1000)
+    args = parser.parse_args()
+    run(num_samples=args.num_samples)
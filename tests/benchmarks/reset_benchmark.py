@@ -0,0 +1,58 @@
+"""Benchmark of the quadrotor environment's resets per second, with and without `fast_reset`.
+
+Example:
+
+    $ python3 reset_benchmark.py --level ../../competition/level3.yaml --num_resets 200
+
+"""
+import argparse
+import time
+import yaml
+
+from safe_control_gym.utils.registration import make
+
+
+def time_resets(config, fast_reset, num_resets):
+    """Times `num_resets` consecutive resets of a quadrotor environment.
+
+    Args:
+        config (dict): The quadrotor environment's configuration.
+        fast_reset (bool): Whether to keep the PyBullet world across resets.
+        num_resets (int): The number of timed resets.
+
+    Returns:
+        float: The number of resets per second.
+
+    """
+    env = make('quadrotor', **dict(config, fast_reset=fast_reset, gui=False))
+    env.reset()  # The first reset always loads the world.
+    START = time.perf_counter()
+    for _ in range(num_resets):
+        env.reset()
+    elapsed_sec = time.perf_counter() - START
+    env.close()
+    return num_resets / elapsed_sec
+
+
+def run(level='./competition/level3.yaml', num_resets=200):
+    """Prints the resets/sec of the full and the fast reset on a competition level.
+
+    """
+    with open(level, 'r') as file:
+        config = yaml.safe_load(file)['quadrotor_config']
+    # Without the firmware, as in the test mode of competition/getting_started.py.
+    config['ctrl_freq'] = 60
+    config['pyb_freq'] = 240
+    full = time_resets(config, False, num_resets)
+    fast = time_resets(config, True, num_resets)
+    print('{:d} resets of {:s}'.format(num_resets, level))
+    print('\tresetSimulation + URDF reload: {:.1f} resets/sec'.format(full))
+    print('\tfast_reset (persistent world): {:.1f} resets/sec ({:.1f}x)'.format(fast, fast / full))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--level', type=str, default='./competition/level3.yaml')
+    parser.add_argument('--num_resets', type=int, default=200)
+    args = parser.parse_args()
+    run(level=args.level, num_resets=args.num_resets)
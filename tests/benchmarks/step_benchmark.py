@@ -0,0 +1,84 @@
+"""Micro-benchmark of the per-step methods of the quadrotor environment, with and without `inplace_step`.
+
+Reports the time (ns/call) and the peak of memory allocated (bytes/call, traced by tracemalloc)
+by `_get_observation()`, `_get_info()`, `_get_reward()` and `_get_done()`.
+With `inplace_step`, the remaining allocations of `_get_info()` (~0.7 KB/call) are the returned
+dictionary and the results of the PyBullet contact and gate queries.
+
+Example:
+
+    $ python3 step_benchmark.py --num_calls 20000
+
+"""
+import argparse
+import timeit
+import tracemalloc
+import numpy as np
+
+from safe_control_gym.utils.registration import make
+
+CONFIGS = {
+    'RL reward': {
+        'quad_type': 3,
+        'task': 'stabilization',
+        'cost': 'rl_reward',
+        'obs_goal_horizon': 1,
+        'task_info': {
+            'stabilization_goal': [0, 0, 1],
+            'stabilization_goal_tolerance': 0.05
+        }
+    },
+    'quadratic cost': {
+        'quad_type': 3,
+        'task': 'stabilization',
+        'cost': 'quadratic',
+        'task_info': {
+            'stabilization_goal': [0, 0, 1],
+            'stabilization_goal_tolerance': 0.05
+        }
+    }
+}
+METHODS = ['_get_observation', '_get_info', '_get_reward', '_get_done']
+
+
+def peak_allocated_bytes(func):
+    """Peak of the memory allocated (and possibly freed) during a call of `func`.
+
+    """
+    func()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - before
+
+
+def run(num_calls=20000):
+    """Prints ns/call and bytes/call of the step methods for each configuration and step mode.
+
+    """
+    print('{:18s} {:18s} {:>14s} {:>14s} {:>14s} {:>14s}'.format('config', 'method', 'ns/call', 'ns/call inplace',
+                                                                 'B/call', 'B/call inplace'))
+    for name, config in CONFIGS.items():
+        results = {}
+        for inplace_step in [False, True]:
+            env = make('quadrotor', inplace_step=inplace_step, gui=False, done_on_out_of_bound=True, **config)
+            env.reset()
+            env.step(env.U_GOAL)
+            for method in METHODS:
+                func = getattr(env, method)
+                ns = timeit.timeit(func, number=num_calls) / num_calls * 1e9
+                results[(method, inplace_step)] = (ns, peak_allocated_bytes(func))
+            env.close()
+        for method in METHODS:
+            (ns, nbytes), (ns_ip, nbytes_ip) = results[(method, False)], results[(method, True)]
+            print('{:18s} {:18s} {:14.0f} {:14.0f} {:14d} {:14d}'.format(name, method, ns, ns_ip, nbytes, nbytes_ip))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num_calls', type=int, default=20000)
+    args = parser.parse_args()
+    run(num_calls=args.num_calls)
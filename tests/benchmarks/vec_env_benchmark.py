@@ -0,0 +1,90 @@
+"""Benchmark of the transports of `SubprocVecEnv`, pickled step results through the pipes or shared memory.
+
+Reports the steps/s (of all envs) of 3D quadrotor envs, and checks that both transports return the same
+observations, rewards and dones. The reset infos (holding CasADi symbolic models, that cannot be pickled)
+are dropped for the pipes.
+
+Example:
+
+    $ python3 vec_env_benchmark.py --num_envs 32 --num_workers 4 --num_steps 500
+
+"""
+import argparse
+import time
+from functools import partial
+import gym
+import numpy as np
+
+from safe_control_gym.utils.registration import make
+from safe_control_gym.envs.env_wrappers.vectorized_env import make_vec_envs
+
+CONFIG = {
+    'quad_type': 3,
+    'physics': 'dyn',
+    'task': 'stabilization',
+    'cost': 'rl_reward',
+    'episode_len_sec': 2,
+    'info_in_reset': True,
+    'gui': False,
+    'task_info': {
+        'stabilization_goal': [0, 0, 1],
+        'stabilization_goal_tolerance': 0.05
+    }
+}
+
+
+class DropResetInfo(gym.Wrapper):
+    """Replaces the info returned by `reset()` with an empty dictionary.
+
+    """
+
+    def reset(self, **kwargs):
+        obs, _ = self.env.reset(**kwargs)
+        return obs, {}
+
+
+def make_env(**kwargs):
+    return DropResetInfo(make('quadrotor', **kwargs))
+
+
+def rollout(num_envs, num_workers, num_steps, shared_memory):
+    """Steps the vectorized envs with random actions, returns the results and the steps/s.
+
+    """
+    env_func = partial(make_env, **CONFIG)
+    venv = make_vec_envs(env_func, None, num_envs, num_workers, seed=0,
+                         shared_memory=shared_memory, shared_info={'TimeLimit.truncated': ()})
+    rng = np.random.default_rng(0)
+    low, high = venv.action_space.low, venv.action_space.high
+    actions = rng.uniform(low, high, (num_steps, num_envs) + low.shape)
+    obs, _ = venv.reset()
+    results = [obs]
+    start = time.perf_counter()
+    for step in range(num_steps):
+        obs, rew, done, _ = venv.step(actions[step])
+        results.append((obs, rew, done))
+    steps_per_sec = num_steps * num_envs / (time.perf_counter() - start)
+    venv.close()
+    return results, steps_per_sec
+
+
+def run(num_envs=32, num_workers=4, num_steps=500):
+    """Prints the steps/s of both transports.
+
+    """
+    pipe_results, pipe_sps = rollout(num_envs, num_workers, num_steps, False)
+    shm_results, shm_sps = rollout(num_envs, num_workers, num_steps, True)
+    same = np.array_equal(pipe_results[0], shm_results[0]) and all(
+        np.array_equal(a, b) for pipe_step, shm_step in zip(pipe_results[1:], shm_results[1:])
+        for a, b in zip(pipe_step, shm_step))
+    print('{:>6s} {:>8s} {:>14s} {:>14s} {:>6s}'.format('envs', 'workers', 'pipe steps/s', 'shm steps/s', 'same'))
+    print('{:6d} {:8d} {:14.0f} {:14.0f} {:>6s}'.format(num_envs, num_workers, pipe_sps, shm_sps, str(same)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num_envs', type=int, default=32)
+    parser.add_argument('--num_workers', type=int, default=4)
+    parser.add_argument('--num_steps', type=int, default=500)
+    args = parser.parse_args()
+    run(num_envs=args.num_envs, num_workers=args.num_workers, num_steps=args.num_steps)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from safe_control_gym.utils.registration import make
+
+NUM_ENVS = 3
+CONSTRAINTS = [
+    {'constraint_form': 'default_constraint', 'constrained_variable': 'state'},
+    {'constraint_form': 'default_constraint', 'constrained_variable': 'input'},
+    {'constraint_form': 'bounded_constraint', 'constrained_variable': 'state', 'active_dims': [0, 2],
+     'lower_bounds': [-0.05, 0.95], 'upper_bounds': [0.05, 1.05], 'tolerance': [0.01, 0.01, 0.01, 0.01]},
+    {'constraint_form': 'quadratic_constraint', 'constrained_variable': 'state', 'active_dims': [0, 2],
+     'P': [[1.0, 0.0], [0.0, 1.0]], 'b': 1.0, 'tolerance': [0.01]},
+]
+
+
+def make_config(quad_type, dyn_integrator):
+    goal = [0, 1] if quad_type == 2 else [0, 0, 1]
+    return {
+        'quad_type': quad_type,
+        'dyn_integrator': dyn_integrator,
+        'task': 'stabilization',
+        'task_info': {'stabilization_goal': goal, 'stabilization_goal_tolerance': 0.0},
+        'cost': 'rl_reward',
+        'episode_len_sec': 0.5,
+        # Away from the ground plane, BatchedQuadrotor has no collisions.
+        'init_state': {'init_z': 1.0},
+        'randomized_init': False,
+        'normalized_rl_action_space': True,
+        'constraints': CONSTRAINTS,
+        'use_constraint_penalty': True,
+        'gui': False,
+    }
+
+
+@pytest.mark.parametrize('quad_type', [2, 3])
+@pytest.mark.parametrize('dyn_integrator', ['euler', 'semi_implicit', 'rk4'])
+def test_batched_quadrotor_matches_quadrotor(quad_type, dyn_integrator):
+    config = make_config(quad_type, dyn_integrator)
+    batched = make('batched_quadrotor', num_envs=NUM_ENVS, seed=0, **config)
+    envs = [make('quadrotor', physics='dyn', seed=0, info_in_reset=True, **config) for _ in range(NUM_ENVS)]
+    rng = np.random.default_rng(0)
+    obs, info = batched.reset()
+    for i, env in enumerate(envs):
+        env_obs, env_info = env.reset()
+        np.testing.assert_allclose(obs[i], env_obs, atol=1e-10)
+        np.testing.assert_allclose(info['n'][i]['constraint_values'], env_info['constraint_values'], atol=1e-10)
+    num_dones = 0
+    for _ in range(40):
+        actions = rng.uniform(-0.3, 0.3, (NUM_ENVS,) + batched.action_space.shape)
+        obs, rew, done, info = batched.step(actions)
+        for i, env in enumerate(envs):
+            env_obs, env_rew, env_done, env_info = env.step(actions[i])
+            assert done[i] == env_done
+            assert rew[i] == pytest.approx(env_rew, abs=1e-8)
+            for key in ('constraint_values', 'constraint_violation', 'mse'):
+                np.testing.assert_allclose(info['n'][i][key], env_info[key], atol=1e-8)
+            if env_done:
+                num_dones += 1
+                np.testing.assert_allclose(info['n'][i]['terminal_observation'], env_obs, atol=1e-8)
+                env_obs, _ = env.reset()
+            np.testing.assert_allclose(obs[i], env_obs, atol=1e-8)
+    batched.close()
+    for env in envs:
+        env.close()
+    assert num_dones > 0
@@ -0,0 +1,93 @@
+import numpy as np
+
+from safe_control_gym.utils.registration import make
+from safe_control_gym.envs.constraints import ConstrainedVariableType
+
+CONSTRAINTS = [
+    {'constraint_form': 'default_constraint', 'constrained_variable': 'state'},
+    {'constraint_form': 'default_constraint', 'constrained_variable': 'input', 'strict': True},
+    {'constraint_form': 'bounded_constraint', 'constrained_variable': 'state', 'active_dims': [0, 2],
+     'lower_bounds': [-0.02, 0.98], 'upper_bounds': [0.02, 1.02], 'tolerance': [0.01, 0.01, 0.01, 0.01]},
+    {'constraint_form': 'linear_constraint', 'constrained_variable': 'state',
+     'A': [[0, 1, 0, 0, 0, 0], [0, 0, 0, 1, 1, 0]], 'b': [0.2, 0.05], 'strict': True},
+    {'constraint_form': 'quadratic_constraint', 'constrained_variable': 'state', 'active_dims': [0, 2],
+     'P': [[1.0, 0.0], [0.0, 1.0]], 'b': 1.0, 'tolerance': [0.02]},
+    {'constraint_form': 'bounded_constraint', 'constrained_variable': 'input',
+     'lower_bounds': [0.1, 0.1], 'upper_bounds': [0.2, 0.2]},
+]
+
+
+def test_stacked_constraints_match_per_constraint_evaluation():
+    env = make('quadrotor',
+               quad_type=2,
+               physics='dyn',
+               seed=5,
+               gui=False,
+               init_state={'init_z': 1.0},
+               randomized_init=False,
+               task_info={'stabilization_goal': [0, 1], 'stabilization_goal_tolerance': 0.0},
+               constraints=CONSTRAINTS)
+    constraints = env.constraints
+    assert len(constraints.stacked_constraints) > 0 and len(constraints.other_constraints) > 0
+    env.reset()
+    np.testing.assert_array_equal(constraints.get_values(env, only_state=True),
+                                  np.concatenate([con.get_value(env) for con in constraints.state_constraints]))
+    rng = np.random.default_rng(0)
+    states, inputs, values = [], [], []
+    num_violated, num_almost_active = 0, 0
+    for _ in range(30):
+        action = env.U_GOAL * rng.uniform(0.7, 1.3, 2)
+        env.step(action)
+        c_value = constraints.get_values(env)
+        np.testing.assert_array_equal(c_value, np.concatenate([con.get_value(env) for con in constraints.constraints]))
+        violations = [con.is_violated(env) for con in constraints.constraints]
+        assert constraints.get_violations(env) == violations
+        assert constraints.get_violations(env, only_state=True) == [con.is_violated(env) for con in constraints.state_constraints]
+        assert constraints.is_violated(env) == any(violations)
+        assert constraints.is_violated(env, c_value=c_value) == any(violations)
+        almost_active = any(con.is_almost_active(env) for con in constraints.constraints)
+        assert constraints.is_almost_active(env) == almost_active
+        num_violated += any(violations)
+        num_almost_active += almost_active
+        states.append(env.state.copy())
+        inputs.append(env.current_raw_input_action.copy())
+        values.append(c_value)
+    env.close()
+    # Both outcomes of the checks are covered.
+    assert 0 < num_violated < 30 and 0 < num_almost_active
+    np.testing.assert_allclose(constraints.get_values_batch(np.array(states), np.array(inputs)), np.array(values), atol=1e-8)
+
+
+def test_stacked_symbolic_model_is_cached_and_mapped():
+    env = make('quadrotor',
+               quad_type=2,
+               gui=False,
+               task_info={'stabilization_goal': [0, 1], 'stabilization_goal_tolerance': 0.0},
+               constraints=CONSTRAINTS)
+    constraints = env.constraints
+    env.reset()
+    rng = np.random.default_rng(0)
+    horizon = 5
+    X = rng.uniform(-1, 1, (env.symbolic.nx, horizon))
+    U = rng.uniform(0, 0.3, (env.symbolic.nu, horizon))
+    variants = {None: (constraints.get_all_symbolic_models(), constraints.constraints),
+                'state': (constraints.get_state_constraint_symbolic_models(), constraints.state_constraints),
+                'input': (constraints.get_input_constraint_symbolic_models(), constraints.input_constraints)}
+    for constrained_variable, (sym_funcs, cons) in variants.items():
+        sym_func = constraints.get_stacked_symbolic_model(env, constrained_variable)
+        assert constraints.get_stacked_symbolic_model(env, constrained_variable) is sym_func
+        mapped = constraints.get_stacked_symbolic_model(env, constrained_variable, horizon=horizon)
+        assert constraints.get_stacked_symbolic_model(env, constrained_variable, horizon=horizon) is mapped
+        num_constraints = sum(con.num_constraints for con in cons)
+        c_mapped = mapped(X, U).toarray()
+        assert c_mapped.shape == (num_constraints, horizon)
+        for i in range(horizon):
+            x, u = X[:, i], U[:, i]
+            expected = np.concatenate([np.atleast_1d(np.squeeze(func(u if con.constrained_variable == ConstrainedVariableType.INPUT else x)))
+                                       for func, con in zip(sym_funcs, cons)])
+            np.testing.assert_allclose(sym_func(x, u).toarray().ravel(), expected)
+            np.testing.assert_allclose(c_mapped[:, i], expected)
+    # The string and enum forms share a cache entry.
+    assert constraints.get_stacked_symbolic_model(env, ConstrainedVariableType.STATE) \
+        is constraints.get_stacked_symbolic_model(env, 'state')
+    env.close()
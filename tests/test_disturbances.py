@@ -0,0 +1,38 @@
+import numpy as np
+
+from safe_control_gym.utils.registration import make
+
+
+def rollout(block_size, num_episodes=2, num_steps=20):
+    disturbances = {'action': [{'disturbance_func': 'white_noise', 'std': 0.05}],
+                    'observation': [{'disturbance_func': 'white_noise', 'std': 0.01}]}
+    if block_size is not None:
+        for disturbance in disturbances.values():
+            disturbance[0]['block_size'] = block_size
+    env = make('quadrotor',
+               quad_type=2,
+               seed=3,
+               gui=False,
+               randomized_init=True,
+               disturbances=disturbances)
+    episodes, init_states = [], []
+    for _ in range(num_episodes):
+        observations = [env.reset()]
+        init_states.append(env.state.copy())
+        for _ in range(num_steps):
+            observations.append(env.step(np.zeros(env.action_space.shape))[0])
+        episodes.append(observations)
+    env.close()
+    return np.array(episodes), np.array(init_states)
+
+
+def test_block_size_does_not_change_env_randomization():
+    per_step = rollout(None)
+    large_blocks = rollout(1000)
+    small_blocks = rollout(7)
+    # The initial states only depend on the env's random stream (also drawn from per step without blocks).
+    np.testing.assert_array_equal(large_blocks[1][0], per_step[1][0])
+    np.testing.assert_array_equal(small_blocks[1], large_blocks[1])
+    # The disturbed observations drawn in blocks are the same for any block size, across resets.
+    np.testing.assert_array_equal(small_blocks[0], large_blocks[0])
+    assert not np.allclose(large_blocks[0], per_step[0])
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from safe_control_gym.utils.registration import make
+
+POS_INDICES = [0, 2, 4]
+
+
+def rollout(dyn_integrator, pyb_freq, num_steps=60):
+    env = make('quadrotor',
+               quad_type=3,
+               physics='dyn',
+               dyn_integrator=dyn_integrator,
+               ctrl_freq=60,
+               pyb_freq=pyb_freq,
+               gui=False,
+               randomized_init=False,
+               normalized_rl_action_space=True,
+               task_info={'stabilization_goal': [0, 0, 1], 'stabilization_goal_tolerance': 0.0})
+    env.reset()
+    # Attitude maneuvers, with body rates about all axes.
+    t = np.arange(num_steps)[:, None] / 60
+    actions = 0.1 * np.sin(2 * np.pi * t * np.array([1.0, 1.5, 2.0, 2.5]))
+    states = np.array([env.step(action)[0] for action in actions])
+    env.close()
+    return states
+
+
+@pytest.fixture(scope='module')
+def reference():
+    return rollout('rk4', 7680)
+
+
+@pytest.mark.parametrize('dyn_integrator, tolerance', [('rk4', 1e-6), ('semi_implicit', 2e-2)])
+def test_integrator_converges_to_fine_step_reference(reference, dyn_integrator, tolerance):
+    error = np.max(np.abs(rollout(dyn_integrator, 60) - reference)[:, POS_INDICES])
+    finer_error = np.max(np.abs(rollout(dyn_integrator, 240) - reference)[:, POS_INDICES])
+    assert error < tolerance
+    assert finer_error < error / 3
+
+
+def test_legacy_euler_uses_another_attitude_model(reference):
+    # rpy += dt * body_rates is not the rigid body kinematics, finer steps do not get closer to the reference.
+    error = np.max(np.abs(rollout('euler', 60) - reference)[:, POS_INDICES])
+    finer_error = np.max(np.abs(rollout('euler', 960) - reference)[:, POS_INDICES])
+    assert finer_error > 1e-3
+    assert finer_error > error / 2
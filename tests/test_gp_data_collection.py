@@ -0,0 +1,63 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from safe_control_gym.utils.registration import make
+from safe_control_gym.controllers.mpc.linear_mpc import LinearMPC
+from safe_control_gym.controllers.mpc.gp_data_collection import PriorDataCollector, make_prior_ctrl
+
+NUM_SAMPLES = 5
+CONFIG = {
+    'quad_type': 2,
+    'task': 'stabilization',
+    'cost': 'quadratic',
+    'gui': False,
+    'task_info': {
+        'stabilization_goal': [0, 1],
+        'stabilization_goal_tolerance': 0.0
+    },
+    'constraints': [{'constraint_form': 'default_constraint', 'constrained_variable': 'state'},
+                    {'constraint_form': 'default_constraint', 'constrained_variable': 'input'}],
+    'disturbances': {
+        'observation': [{'disturbance_func': 'white_noise', 'std': 0.01}]
+    }
+}
+
+
+def make_samples():
+    rng = np.random.default_rng(0)
+    keys = ['init_x', 'init_x_dot', 'init_z', 'init_z_dot', 'init_theta', 'init_theta_dot']
+    init_states = [dict(zip(keys, values)) for values in rng.uniform(-0.2, 0.2, (NUM_SAMPLES, len(keys))) + [0, 0, 1, 0, 0, 0]]
+    return init_states, rng.integers(0, 99999, NUM_SAMPLES)
+
+
+@pytest.fixture(scope='module')
+def reference():
+    # A new environment per sample, as in GPMPC.learn() before the pooled collection.
+    env_func = partial(make, 'quadrotor', **CONFIG)
+    ctrl = make_prior_ctrl(partial(LinearMPC, env_func, horizon=10))
+    x_seq, u_seq, x_next_seq = [], [], []
+    for init_state, seed in zip(*make_samples()):
+        run_env = env_func(init_state=init_state, randomized_init=False, seed=int(seed))
+        episode_results = ctrl.run(env=run_env, max_steps=1)
+        run_env.close()
+        x_seq.append(episode_results['obs'][0])
+        u_seq.append(episode_results['action'][0])
+        x_next_seq.append(episode_results['obs'][1])
+    ctrl.close()
+    return np.array(x_seq), np.array(u_seq), np.array(x_next_seq)
+
+
+@pytest.mark.parametrize('num_workers', [0, 1, 2])
+def test_collector_matches_new_environment_per_sample(reference, num_workers):
+    env_func = partial(make, 'quadrotor', randomized_init=False, fast_reset=True, **CONFIG)
+    collector = PriorDataCollector(env_func, partial(LinearMPC, partial(make, 'quadrotor', **CONFIG), horizon=10),
+                                   num_workers=num_workers)
+    try:
+        results = collector.collect(*make_samples())
+    finally:
+        collector.close()
+    for result, result_ref in zip(results, reference):
+        assert result.shape == (NUM_SAMPLES, result_ref.shape[1])
+        np.testing.assert_allclose(result, result_ref, rtol=0, atol=1e-12)
@@ -0,0 +1,55 @@
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+from safe_control_gym.utils.registration import make
+
+
+def rollout(quad_type, cost, inplace_step, num_steps=60):
+    goal = [0, 1] if quad_type == 2 else [0, 0, 1]
+    env = make('quadrotor',
+               quad_type=quad_type,
+               seed=11,
+               gui=False,
+               cost=cost,
+               episode_len_sec=0.5,
+               info_in_reset=True,
+               inplace_step=inplace_step,
+               normalized_rl_action_space=True,
+               done_on_out_of_bound=True,
+               task_info={'stabilization_goal': goal, 'stabilization_goal_tolerance': 0.0},
+               constraints=[{'constraint_form': 'default_constraint', 'constrained_variable': 'state'}])
+    rng = np.random.default_rng(0)
+    obs, info = env.reset()
+    # The in-place observation is overwritten by the next step.
+    results = [(obs.copy(), None, None, info['constraint_values'].copy())]
+    for action in rng.uniform(-0.8, 0.8, (num_steps,) + env.action_space.shape):
+        obs, rew, done, info = env.step(action)
+        results.append((obs.copy(), rew, done, deepcopy(info)))
+        if done:
+            obs, info = env.reset()
+            results.append((obs.copy(), None, None, info['constraint_values'].copy()))
+    env.close()
+    return results
+
+
+@pytest.mark.parametrize('quad_type', [2, 3])
+@pytest.mark.parametrize('cost', ['rl_reward', 'quadratic'])
+def test_inplace_step_matches_default_step(quad_type, cost):
+    reference = rollout(quad_type, cost, False)
+    results = rollout(quad_type, cost, True)
+    assert len(results) == len(reference)
+    assert len(results) > 61
+    for (obs, rew, done, info), (obs_ref, rew_ref, done_ref, info_ref) in zip(results, reference):
+        np.testing.assert_array_equal(obs, obs_ref)
+        assert done == done_ref
+        if rew is None:
+            np.testing.assert_array_equal(info, info_ref)
+            continue
+        # The in-place reward and mse sum in another order, up to rounding.
+        assert rew == pytest.approx(rew_ref, rel=1e-12)
+        assert info.keys() == info_ref.keys()
+        np.testing.assert_allclose(info.pop('mse'), info_ref.pop('mse'), rtol=1e-12)
+        for key in info:
+            np.testing.assert_array_equal(info[key], info_ref[key])
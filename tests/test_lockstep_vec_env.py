@@ -0,0 +1,51 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from safe_control_gym.utils.registration import make
+from safe_control_gym.envs.env_wrappers.vectorized_env import make_vec_envs
+
+NUM_ENVS = 4
+CONFIG = {
+    'quad_type': 3,
+    'task': 'stabilization',
+    'cost': 'rl_reward',
+    'episode_len_sec': 0.5,
+    'info_in_reset': True,
+    'normalized_rl_action_space': True,
+    'gui': False,
+    'task_info': {
+        'stabilization_goal': [0, 0, 1],
+        'stabilization_goal_tolerance': 0.0
+    }
+}
+
+
+def rollout(physics, lockstep, num_steps=50):
+    venv = make_vec_envs(partial(make, 'quadrotor', physics=physics, **CONFIG), None, NUM_ENVS, seed=5, lockstep=lockstep)
+    rng = np.random.default_rng(0)
+    obs, _ = venv.reset()
+    results = [(obs, None, None, None)]
+    for action in rng.uniform(-1, 1, (num_steps, NUM_ENVS) + venv.action_space.shape):
+        results.append(venv.step(action))
+    venv.close()
+    return results
+
+
+@pytest.mark.parametrize('physics', ['pyb', 'pyb_gnd_drag_dw', 'dyn'])
+def test_lockstep_matches_dummy_vec_env(physics):
+    reference = rollout(physics, False)
+    results = rollout(physics, True)
+    num_dones = 0
+    for (obs, rew, done, info), (obs_ref, rew_ref, done_ref, info_ref) in zip(results, reference):
+        # The worlds' bodies are placed at an offset, which rounds the positions differently.
+        np.testing.assert_allclose(obs, obs_ref, atol=1e-10)
+        if rew is None:
+            continue
+        np.testing.assert_allclose(rew, rew_ref, atol=1e-10)
+        np.testing.assert_array_equal(done, done_ref)
+        for i in np.flatnonzero(done):
+            num_dones += 1
+            np.testing.assert_allclose(info['n'][i]['terminal_observation'], info_ref['n'][i]['terminal_observation'], atol=1e-10)
+    assert num_dones > 0
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from safe_control_gym.utils.registration import make
+
+
+def make_env(quad_type, physics):
+    goal = [0, 1] if quad_type == 2 else [0, 0, 1]
+    env = make('quadrotor',
+               quad_type=quad_type,
+               physics=physics,
+               seed=7,
+               gui=False,
+               randomized_init=True,
+               normalized_rl_action_space=True,
+               task_info={'stabilization_goal': goal, 'stabilization_goal_tolerance': 0.0},
+               disturbances={'action': [{'disturbance_func': 'white_noise', 'std': 0.05}],
+                             'observation': [{'disturbance_func': 'white_noise', 'std': 0.01, 'block_size': 4}]})
+    env.reset()
+    return env
+
+
+def branch(env, actions):
+    results = []
+    for action in actions:
+        obs, rew, done, info = env.step(action)
+        results.append((obs.copy(), rew, done, info['mse']))
+    return results
+
+
+def check_same(results, reference, atol=0.0):
+    for (obs, rew, done, mse), (obs_ref, rew_ref, done_ref, mse_ref) in zip(results, reference):
+        np.testing.assert_allclose(obs, obs_ref, rtol=0, atol=atol)
+        assert rew == pytest.approx(rew_ref, rel=0, abs=atol)
+        assert done == done_ref
+        np.testing.assert_allclose(mse, mse_ref, rtol=0, atol=atol)
+
+
+@pytest.mark.parametrize('quad_type', [2, 3])
+@pytest.mark.parametrize('physics', ['pyb', 'dyn'])
+def test_taking_a_snapshot_does_not_change_the_rollout(quad_type, physics):
+    actions = np.random.default_rng(0).uniform(-0.5, 0.5, (25, quad_type * 2 - 2))
+    env = make_env(quad_type, physics)
+    reference = branch(env, actions)
+    env.close()
+    env = make_env(quad_type, physics)
+    results = branch(env, actions[:10])
+    env.get_state_snapshot()
+    results += branch(env, actions[10:])
+    env.close()
+    check_same(results, reference)
+
+
+@pytest.mark.parametrize('quad_type', [2, 3])
+@pytest.mark.parametrize('physics', ['pyb', 'dyn'])
+def test_restored_branches_are_bit_identical(quad_type, physics):
+    env = make_env(quad_type, physics)
+    rng = np.random.default_rng(0)
+    branch(env, rng.uniform(-0.5, 0.5, (10,) + env.action_space.shape))
+    snapshot = env.get_state_snapshot()
+    actions = rng.uniform(-0.5, 0.5, (15,) + env.action_space.shape)
+    first = branch(env, actions)
+    env.restore_state_snapshot(snapshot)
+    second = branch(env, actions)
+    env.restore_state_snapshot(snapshot)
+    third = branch(env, actions)
+    check_same(third, second)
+    # Bullet's cached link transforms are only read back in single precision.
+    check_same(second, first, atol=0.0 if physics == 'dyn' else 1e-6)
+    env.remove_state_snapshot(snapshot)
+    # Snapshots are tied to the episode they were taken in.
+    snapshot = env.get_state_snapshot()
+    env.reset()
+    with pytest.raises(ValueError):
+        env.restore_state_snapshot(snapshot)
+    env.close()
@@ -0,0 +1,80 @@
+from functools import partial
+
+import gym
+import numpy as np
+
+from safe_control_gym.utils.registration import make
+from safe_control_gym.envs.env_wrappers.vectorized_env import make_vec_envs
+
+CONFIG = {
+    'quad_type': 2,
+    'physics': 'dyn',
+    'task': 'stabilization',
+    'cost': 'rl_reward',
+    'episode_len_sec': 0.2,
+    'info_in_reset': True,
+    'inplace_step': True,
+    'gui': False,
+    'task_info': {
+        'stabilization_goal': [0, 1],
+        'stabilization_goal_tolerance': 0.0
+    }
+}
+SHARED_INFO = {'TimeLimit.truncated': (), 'mse': ()}
+
+
+class DropResetInfo(gym.Wrapper):
+    """Replaces the reset info (holding CasADi symbolic models, that cannot be pickled) with an empty dictionary.
+
+    """
+
+    def reset(self, **kwargs):
+        obs, _ = self.env.reset(**kwargs)
+        return obs, {}
+
+
+def make_env(**kwargs):
+    return DropResetInfo(make('quadrotor', **kwargs))
+
+
+def rollout(n_processes, shared_memory, num_steps=25):
+    venv = make_vec_envs(partial(make_env, **CONFIG), None, 2, n_processes, seed=3,
+                         shared_memory=shared_memory, shared_info=SHARED_INFO)
+    rng = np.random.default_rng(0)
+    actions = rng.uniform(venv.action_space.low, venv.action_space.high, (num_steps, 2) + venv.action_space.shape)
+    obs, _ = venv.reset()
+    results = [(obs, None, None, None)]
+    for action in actions:
+        results.append(venv.step(action))
+    venv.close()
+    return results
+
+
+def check_same(results, reference):
+    num_dones = 0
+    for (obs, rew, done, info), (obs_ref, rew_ref, done_ref, info_ref) in zip(results, reference):
+        np.testing.assert_array_equal(obs, obs_ref)
+        if rew is None:
+            continue
+        np.testing.assert_array_equal(rew, rew_ref)
+        np.testing.assert_array_equal(done, done_ref)
+        for i in np.flatnonzero(done):
+            num_dones += 1
+            np.testing.assert_array_equal(info['n'][i]['terminal_observation'], info_ref['n'][i]['terminal_observation'])
+            for key in SHARED_INFO:
+                assert info['n'][i]['terminal_info'].get(key) == info_ref['n'][i]['terminal_info'].get(key)
+    assert num_dones > 0
+
+
+def test_shared_memory_matches_dummy_vec_env():
+    reference = rollout(1, False)
+    results = rollout(2, True)
+    check_same(results, reference)
+    # The terminal observation is the last observation of the episode, not the one after the reset.
+    for obs, _, done, info in results[1:]:
+        for i in np.flatnonzero(done):
+            assert not np.array_equal(info['n'][i]['terminal_observation'], obs[i])
+
+
+def test_shared_memory_matches_pipes():
+    check_same(rollout(2, True), rollout(2, False))
@@ -0,0 +1,42 @@
+import sys
+
+import numpy as np
+import pytest
+
+from safe_control_gym.utils.video import VideoRecorder
+
+# Fake encoders, reading the raw frames from their stdin.
+COPY_CMD = [sys.executable, '-c', 'import shutil, sys; shutil.copyfileobj(sys.stdin.buffer, open(sys.argv[1], "wb"))']
+EARLY_EXIT_CMD = [sys.executable, '-c', 'import sys; sys.stdin.buffer.read(100)']
+
+
+def make_frames(num_frames, height=5, width=7):
+    rng = np.random.default_rng(0)
+    # RGBA frames, the alpha channel is dropped.
+    return rng.integers(0, 256, (num_frames, height, width, 4), dtype=np.uint8)
+
+
+def test_encoder_receives_the_frames_in_order(tmp_path):
+    frames = make_frames(50)
+    raw_path = tmp_path / 'frames.raw'
+    with VideoRecorder(str(tmp_path / 'video.mp4'), buffer_size=4, encoder_cmd=COPY_CMD + [str(raw_path)]) as recorder:
+        for frame in frames:
+            recorder.write(frame)
+        # The memory does not grow with the number of frames.
+        assert recorder.buffer.shape == (4, 5, 7, 3)
+    assert recorder.num_frames == len(frames)
+    assert raw_path.read_bytes() == frames[..., :3].tobytes()
+
+
+def test_encoder_exiting_early_raises(tmp_path):
+    with pytest.raises(RuntimeError):
+        with VideoRecorder(str(tmp_path / 'video.mp4'), buffer_size=4, encoder_cmd=EARLY_EXIT_CMD) as recorder:
+            for frame in make_frames(200, height=64, width=64):
+                recorder.write(frame)
+
+
+def test_encoder_failing_after_the_last_frame_raises(tmp_path):
+    recorder = VideoRecorder(str(tmp_path / 'video.mp4'), buffer_size=4, encoder_cmd=[sys.executable, '-c', 'import sys; sys.exit(1)'])
+    recorder.write(make_frames(1)[0])
+    with pytest.raises(RuntimeError):
+        recorder.close()